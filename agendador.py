@@ -0,0 +1,116 @@
+"""Passo fixo da simulação, independente da taxa de quadros.
+
+O ``Agendador`` acumula o tempo real de cada quadro e converte em
+instantes da simulação segundo a velocidade escolhida. Assim a tela pode
+ser redesenhada a 60 FPS enquanto a simulação anda a 2 instantes por
+segundo, ou a 100x, ou o mais rápido possível, sem que a duração do
+episódio dependa do FPS: o limite é sempre em instantes da simulação,
+como em ``run_episode``.
+
+Com um ``ambiente``, um instante roda todos os eventos (``ambiente.step()``)
+até a próxima fronteira de ``ambiente.now``, usando ``peek()``: cada
+agente age uma vez por instante (ou a cada ``periodo`` instantes), seja
+um só agente ou todos juntos. Sem ambiente (no replay), cada chamada de
+``passo`` é um instante.
+"""
+import time
+
+# Multiplicadores de velocidade; None = o máximo que couber no quadro
+VELOCIDADES = (1, 10, 100, None)
+
+# Instantes da simulação por segundo na velocidade 1x
+INSTANTES_POR_SEGUNDO = 2
+
+# Evita que um quadro lento gere uma avalanche de instantes atrasados
+MAX_INSTANTES_POR_QUADRO = 10000
+
+# Fração do quadro gasta simulando na velocidade máxima
+FRACAO_QUADRO_MAXIMA = 0.75
+
+
+class Agendador:
+    """Decide quantos instantes da simulação rodar em cada quadro"""
+
+    def __init__(self, max_instantes, ambiente=None, instantes_por_segundo=INSTANTES_POR_SEGUNDO):
+        self.max_instantes = max_instantes
+        self.ambiente = ambiente
+        self.instantes_por_segundo = instantes_por_segundo
+        # Instantes já rodados (e o próximo a rodar), para o limite do episódio
+        self.instante = 0
+        self.pausado = False
+        self.velocidade = 0  # índice em VELOCIDADES
+        self.acumulador = 0.0
+        self.instantes_pendentes = 0
+
+    @property
+    def multiplicador(self):
+        return VELOCIDADES[self.velocidade]
+
+    @property
+    def esgotado(self):
+        return self.instante >= self.max_instantes
+
+    def descricao(self):
+        """Texto curto do estado, por exemplo "10x" ou "pausado" """
+        if self.pausado:
+            return "pausado"
+        multiplicador = self.multiplicador
+        return "máx" if multiplicador is None else f"{multiplicador}x"
+
+    # Controles
+
+    def alternar_pausa(self):
+        self.pausado = not self.pausado
+        self.acumulador = 0.0
+
+    def passo_unico(self):
+        """Pausa e agenda exatamente um instante para o próximo quadro"""
+        self.pausado = True
+        self.instantes_pendentes += 1
+
+    def definir_velocidade(self, indice):
+        self.velocidade = max(0, min(len(VELOCIDADES) - 1, indice))
+        self.acumulador = 0.0
+
+    # Execução
+
+    def avancar(self, dt, passo):
+        """Roda os instantes devidos a um quadro que durou ``dt`` segundos.
+
+        ``passo`` executa um passo da simulação e retorna False quando ela
+        terminou. Retorna False se a simulação terminou ou se o limite de
+        instantes foi atingido.
+        """
+        if self.pausado:
+            quantidade = self.instantes_pendentes
+            limite_tempo = None
+        elif self.multiplicador is None:
+            quantidade = MAX_INSTANTES_POR_QUADRO
+            limite_tempo = time.perf_counter() + dt * FRACAO_QUADRO_MAXIMA
+        else:
+            self.acumulador += dt * self.instantes_por_segundo * self.multiplicador
+            quantidade = min(int(self.acumulador), MAX_INSTANTES_POR_QUADRO)
+            self.acumulador -= int(self.acumulador)
+            limite_tempo = None
+        self.instantes_pendentes = 0
+
+        for i in range(quantidade):
+            if self.esgotado:
+                break
+            # Na velocidade máxima o relógio só é consultado de tempos em tempos
+            if limite_tempo is not None and i % 16 == 0 and time.perf_counter() > limite_tempo:
+                break
+            if not self._rodar_instante(passo):
+                return False
+        return not self.esgotado
+
+    def _rodar_instante(self, passo):
+        """Roda os passos do próximo instante; False quando a simulação terminou"""
+        self.instante += 1
+        if self.ambiente is None:
+            return passo()
+        fim = self.instante - 1
+        while self.ambiente.peek() <= fim:
+            if not passo():
+                return False
+        return self.ambiente.peek() != float("inf")
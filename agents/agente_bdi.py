@@ -1,24 +1,33 @@
 import random
-from collections import deque
+from indice_sujeira import IndiceSujeira
+from ocupacao import MapaOcupacao, MapaValores
+from planejamento import Fronteira, planejar_caminho
+from rastreamento import rastro
 from .base_agent import BaseAgent
 
 class AgenteBDI(BaseAgent):
-   
+
+    __slots__ = ("crencas", "desejos", "intencao_atual", "plano")
+
+    FASES = BaseAgent.FASES + ("atualizar_crencas", "gerar_desejos", "formar_intencao",
+                               "criar_plano", "executar_intencao")
     
     def __init__(self, nome, ambiente, x, y, grid, obstacles):
         super().__init__(nome, ambiente, x, y, grid, obstacles)
         
 
         self.crencas = {
-            'mapa_conhecido': [[None for _ in range(5)] for _ in range(5)],  
-            'sujeiras_observadas': set(),  
-            'casas_visitadas': set(),
-            'obstaculos': set()
+            'mapa_conhecido': MapaValores(self.largura, self.altura),
+            # Sujeiras vistas e ainda não vistas limpas, com o valor observado
+            'sujeiras_observadas': IndiceSujeira(self.largura, self.altura),  
+            'casas_visitadas': MapaOcupacao(self.largura, self.altura),
+            'obstaculos': MapaOcupacao(self.largura, self.altura)
 
         }
+        self.crencas['fronteira'] = Fronteira(self.crencas['casas_visitadas'], self.crencas['obstaculos'])
         
        
-        self.desejos = []
+        self.desejos = self.crencas['sujeiras_observadas']
         
        
         self.intencao_atual = None 
@@ -41,43 +50,35 @@ class AgenteBDI(BaseAgent):
     def atualizar_crencas(self):
        
        
-        self.crencas['casas_visitadas'].add((self.x, self.y))
+        self.crencas['fronteira'].visitar(self.x, self.y)
         
         
         movimentos = [(0, 0), (0, 1), (0, -1), (1, 0), (-1, 0)]
         
         for dx, dy in movimentos:
             nx, ny = self.x + dx, self.y + dy
-            if 0 <= nx < 5 and 0 <= ny < 5:
+            if self.dentro_do_grid(nx, ny):
                 
-                self.crencas['mapa_conhecido'][ny][nx] = self.grid[ny][nx]
-                if (nx, ny) in self.obstacles:
-                    self.crencas['obstaculos'].add((nx, ny))
+                valor = self.grid.valor(nx, ny)
+                self.crencas['mapa_conhecido'].definir(nx, ny, valor)
+                if valor < 0:
+                    self.crencas['fronteira'].bloquear(nx, ny)
                 
-               
-                if self.grid[ny][nx] > 0:
-                    distancia = self.distancia(self.x, self.y, nx, ny)
-                    self.crencas['sujeiras_observadas'].add((nx, ny, self.grid[ny][nx] / (self.distancia(self.x, self.y, nx, ny) + 2), distancia))
-        
-       
-        self.crencas['sujeiras_observadas'] = {
-            (x, y, v, d) for (x, y, v, d) in self.crencas['sujeiras_observadas']
-            if self.grid[y][x] > 0
-        }
+                # Só as casas percebidas agora mudam: limpa (0) sai do índice
+                self.crencas['sujeiras_observadas'].atualizar(nx, ny, valor)
     
     def gerar_desejos(self):
        
-       
-        self.desejos = list(self.crencas['sujeiras_observadas'])
-        
-       
-        self.desejos.sort(key=lambda s: s[2], reverse=True)
+        # Os desejos são as sujeiras observadas; a utilidade de cada uma é
+        # calculada na consulta, a partir da posição atual do agente
+        self.desejos = self.crencas['sujeiras_observadas']
         
     
     def formar_intencao(self):
 
-        if self.grid[self.y][self.x] > 0:
-            self.intencao_atual = ('limpar_aqui', (self.x, self.y, self.grid[self.y][self.x]))
+        valor = self.grid.valor(self.x, self.y)
+        if valor > 0:
+            self.intencao_atual = ('limpar_aqui', (self.x, self.y, valor))
             self.plano = [('aspirar', None)]
             return
         
@@ -90,7 +91,8 @@ class AgenteBDI(BaseAgent):
                 x, y, valor, distancia = sujeira_alvo
                 self.intencao_atual = ('limpar_sujeira', sujeira_alvo)
                 self.plano = self.criar_plano(x, y)
-                print(f"[BDI]  Intenção: Ir limpar sujeira em ({x}, {y}) - Valor: {valor}")
+                if rastro.intencao:
+                    rastro.emitir("intencao", self, acao='limpar_sujeira', x=x, y=y, utilidade=valor)
                 return
         
        
@@ -99,7 +101,8 @@ class AgenteBDI(BaseAgent):
             x, y = casa_inexplorada
             self.intencao_atual = ('explorar', (x, y, 0))
             self.plano = self.criar_plano(x, y)
-            print(f"[BDI]  Intenção: Explorar casa ({x}, {y})")
+            if rastro.intencao:
+                rastro.emitir("intencao", self, acao='explorar', x=x, y=y)
         else:
            
             self.parar()
@@ -108,63 +111,21 @@ class AgenteBDI(BaseAgent):
        
         if not self.desejos:
             return None
-        print(self.desejos)
-        for sujeira in self.desejos:
-            if self.bateria >= (sujeira[3] + 3):
-                return sujeira
-        
-        return None
+        # Maior utilidade com bateria para ir até lá e ainda aspirar
+        return self.reivindicar(self.desejos.melhor_utilidade(self.x, self.y, self.bateria, reserva=3,
+                                                              ignorar=self.alvos_alheios))
         
     
     def encontrar_casa_inexplorada(self):
-       
-        casas = []
-        
-        for y in range(5):
-            for x in range(5):
-                if ((x, y) not in self.crencas['casas_visitadas'] and 
-                    (x, y) not in self.crencas['obstaculos']):
-                    dist = self.distancia(self.x, self.y, x, y)
-                    casas.append((x, y, dist))
-        
-        if casas:
-            casas.sort(key=lambda c: c[2] , reverse=False)
-            if self.bateria >= casas[0][2] + 3:
-                return (casas[0][0], casas[0][1])
-        
-        return None
-    
+        # Casa da fronteira mais próxima com bateria para chegar e ainda aspirar
+        casa = self.crencas['fronteira'].mais_proxima(self.x, self.y, limite=self.bateria - 3)
+        return casa[:2] if casa else None
+
     def criar_plano(self, x_destino, y_destino):
        
-        inicio = (self.x, self.y)
-        destino = (x_destino, y_destino)
-        
-       
-        visitados = set()
-        fila = deque()
-        fila.append((inicio, []))
-        
-        while fila:
-            (x, y), caminho = fila.popleft()
-            
-            if (x, y) == destino:
-                return [('mover', direcao) for direcao in caminho]
-            
-            if (x, y) in visitados:
-                continue
-            
-            visitados.add((x, y))
-            
-           
-            for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < 5 and 0 <= ny < 5 and 
-                    (nx, ny) not in self.crencas['obstaculos'] and 
-                    (nx, ny) not in visitados):
-                    fila.append(((nx, ny), caminho + [(dx, dy)]))
-        
-       
-        return []
+        caminho = planejar_caminho(self.largura, self.altura, self.crencas['obstaculos'],
+                                   (self.x, self.y), (x_destino, y_destino))
+        return [('mover', direcao) for direcao in caminho]
     
     def executar_intencao(self):
 
@@ -177,21 +138,27 @@ class AgenteBDI(BaseAgent):
         acao, parametro = self.plano.pop(0)
         
         if acao == 'aspirar':
-            if self.aspirar():
-                print(f"[BDI]  Limpou sujeira em ({self.x}, {self.y})")
+            self.aspirar()
             self.intencao_atual = None
             
         elif acao == 'mover':
             dx, dy = parametro
             sucesso = self.mover(dx, dy)
             
-            if not sucesso:
+            if not sucesso and self.piso is not None and self.piso.tomada(self.x + dx, self.y + dy):
+                # Outro agente no caminho: sai da frente e refaz o plano no próximo passo
+                self.desviar()
+                self.plano = []
+            elif not sucesso:
                
                 if self.intencao_atual:
-                    tipo, (x, y, v) = self.intencao_atual
+                    tipo, alvo = self.intencao_atual
+                    x, y = alvo[0], alvo[1]
                     self.plano = self.criar_plano(x, y)
                     if tipo == 'limpar_sujeira':
                         self.plano.append(('aspirar', None))
+                    if rastro.replanejar:
+                        rastro.emitir("replanejar", self, x=x, y=y, passos=len(self.plano))
     
     def get_cor(self):
         return (255, 0, 255)  
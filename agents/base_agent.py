@@ -1,10 +1,29 @@
-import pygame
 import random
 import math
+import sys
 from abc import ABC, abstractmethod
+from collections import deque
+
+import numpy as np
+
+from ocupacao import HistoricoPosicoes
+from rastreamento import rastro
 
 class BaseAgent(ABC):
     """Classe base para todos os agentes"""
+
+    __slots__ = ("nome", "ambiente", "x", "y", "grid", "obstacles", "largura", "altura", "bateria",
+                 "pontuacao", "executando", "historico_posicoes", "gravador", "periodo", "piso",
+                 "alvos_alheios")
+
+    # Métodos cronometrados quando o perfil (perfil.py) está ligado
+    FASES = ("agir",)
+
+    # Posições guardadas no histórico (as mais recentes); None guarda o trajeto inteiro
+    LIMITE_HISTORICO = 1024
+
+    # Atributos que apontam para objetos de todo o episódio, fora da conta de ``memoria``
+    COMPARTILHADOS = ("ambiente", "grid", "obstacles", "gravador", "piso", "alvos_alheios")
     
     def __init__(self, nome, ambiente, x, y, grid, obstacles):
         self.nome = nome
@@ -13,10 +32,21 @@ class BaseAgent(ABC):
         self.y = y
         self.grid = grid
         self.obstacles = obstacles
+        # Dimensões vêm do próprio grid
+        self.largura = grid.largura
+        self.altura = grid.altura
         self.bateria = 30
         self.pontuacao = 0
         self.executando = True
-        self.historico_posicoes = [(x, y)]
+        self.historico_posicoes = HistoricoPosicoes([(x, y)], self.LIMITE_HISTORICO,
+                                                    max(self.largura, self.altura))
+        # GravadorReplay que recebe as ações, se o episódio estiver sendo gravado
+        self.gravador = None
+        # Unidades de tempo entre duas ações; agentes mais lentos usam um período maior
+        self.periodo = 1
+        # Piso compartilhado com outros agentes (piso.py) e as sujeiras que eles reivindicaram
+        self.piso = None
+        self.alvos_alheios = None
         
      
         self.ambiente.process(self.executar())
@@ -27,12 +57,19 @@ class BaseAgent(ABC):
         
             self.agir()
          
-            yield self.ambiente.timeout(1)
+            yield self.ambiente.timeout(self.periodo)
+
+        # Parado ou sem bateria, não ocupa mais o piso dos outros agentes
+        if self.piso is not None:
+            self.piso.remover(self)
     
     def parar(self):
        
         self.executando = False
-        print(f"Agente {self.nome} foi parado por falta de ações")
+        if self.gravador is not None:
+            self.gravador.parar(self)
+        if rastro.parar:
+            rastro.emitir("parar", self, x=self.x, y=self.y, bateria=self.bateria)
             
     
     @abstractmethod
@@ -46,38 +83,52 @@ class BaseAgent(ABC):
         novo_y = self.y + dy
         
       
-        if 0 <= novo_x < 5 and 0 <= novo_y < 5:
+        if self.dentro_do_grid(novo_x, novo_y):
          
-            if (novo_x, novo_y) not in self.obstacles:
+            if not self.grid.eh_obstaculo(novo_x, novo_y):
+                if self.piso is not None and not self.piso.mover(self, novo_x, novo_y):
+                    return False
                 self.x = novo_x
                 self.y = novo_y
                 self.historico_posicoes.append((self.x, self.y))
                 self.bateria -= 1
+                if self.gravador is not None:
+                    self.gravador.mover(self, dx, dy)
+                if rastro.mover:
+                    rastro.emitir("mover", self, x=self.x, y=self.y)
                 return True
         return False
     
     def aspirar(self, model_grid = None):
       
-        if self.grid[self.y][self.x] > 0:
+        if self.grid.valor(self.x, self.y) > 0:
             if self.bateria > 2:
-                valor_sujeira = self.grid[self.y][self.x]
+                valor_sujeira = self.grid.limpar(self.x, self.y)
                 self.pontuacao += valor_sujeira
-                self.grid[self.y][self.x] = 0
                 self.bateria -= 2
+                if self.piso is not None:
+                    self.piso.limpou(self.x, self.y)
+                if self.gravador is not None:
+                    self.gravador.aspirar(self, valor_sujeira)
+                if rastro.aspirar:
+                    rastro.emitir("aspirar", self, x=self.x, y=self.y, valor=valor_sujeira)
                 return True
             else:
                 self.parar()
         return False
     
-    def desenhar(self, tela, margem=0):
+    def desenhar(self, tela, margem=0, cell_size=None):
       
+        import pygame
         import constantes
+        from renderizacao import texto
         
    
         cor = self.get_cor()
         
     
-        cell_size = constantes.CELL_SIZE
+        if cell_size is None:
+            cell_size = constantes.CELL_SIZE
         raio_agente = int(cell_size * 0.20)
         tamanho_fonte = int(cell_size * 0.20)
         
@@ -94,10 +145,12 @@ class BaseAgent(ABC):
     
         pygame.draw.circle(tela, (230, 230, 230), (centro_x, centro_y), raio_agente, 3)
         
+        # Em mapas grandes a célula é pequena demais para a letra
+        if tamanho_fonte < 8:
+            return
      
-        fonte = pygame.font.SysFont("arial", tamanho_fonte, bold=True)
-        texto = fonte.render(self.get_letra(), True, (255, 255, 255))
-        tela.blit(texto, (centro_x - texto.get_width() // 2, centro_y - texto.get_height() // 2))
+        letra = texto(self.get_letra(), tamanho_fonte, (255, 255, 255), bold=True)
+        tela.blit(letra, (centro_x - letra.get_width() // 2, centro_y - letra.get_height() // 2))
     
     @abstractmethod
     def get_cor(self):
@@ -108,23 +161,40 @@ class BaseAgent(ABC):
     def get_letra(self):
         pass
     
+    def dentro_do_grid(self, x, y):
+        return self.grid.dentro(x, y)
+    
     def distancia(self, x1, y1, x2, y2):
         return abs(x1 - x2) + abs(y1 - y2)
     
     def encontrar_sujeira_mais_proxima(self):
-        sujeiras = []
-        for y in range(5):
-            for x in range(5):
-                if self.grid[y][x] > 0:
-                    distancia = self.distancia(self.x, self.y, x, y)
-                    sujeiras.append((x, y, self.grid[y][x], distancia))
-        
-        if sujeiras:
-            sujeiras.sort(key=lambda s: s[3])
-           
-            return sujeiras[0]
-        return None
-    
+        return self.grid.sujeira_mais_proxima(self.x, self.y)
+    
+    def memoria(self):
+        """Bytes aproximados do estado próprio do agente (modelos, crenças, histórico)"""
+        vistos = {id(getattr(self, nome, None)) for nome in self.COMPARTILHADOS}
+        total = sys.getsizeof(self)
+        for classe in type(self).__mro__:
+            for nome in getattr(classe, "__slots__", ()):
+                if nome not in self.COMPARTILHADOS and hasattr(self, nome):
+                    total += _tamanho(getattr(self, nome), vistos)
+        return total
+
+    def desviar(self):
+        """Passo para qualquer casa vizinha livre, para sair do caminho de outro agente"""
+        movimentos = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        random.shuffle(movimentos)
+        for dx, dy in movimentos:
+            if self.mover(dx, dy):
+                return True
+        return False
+
+    def reivindicar(self, sujeira):
+        """Reivindica a sujeira escolhida como alvo, se houver outros agentes no piso"""
+        if sujeira and self.piso is not None:
+            self.piso.reivindicar(self, sujeira[0], sujeira[1])
+        return sujeira
+
     def caminho_para_posicao(self, x_destino, y_destino):
      
         if self.x < x_destino:
@@ -137,3 +207,27 @@ class BaseAgent(ABC):
             return (0, -1) 
         else:
             return (0, 0)  
+
+
+def _tamanho(objeto, vistos):
+    """``sys.getsizeof`` somado ao dos objetos alcançáveis, sem contar nada duas vezes"""
+    if id(objeto) in vistos or isinstance(objeto, type):
+        return 0
+    vistos.add(id(objeto))
+    if isinstance(objeto, np.ndarray):
+        # Inclui os dados quando o array é dono deles; uma view só conta o cabeçalho
+        return sys.getsizeof(objeto)
+    total = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        total += sum(_tamanho(k, vistos) + _tamanho(v, vistos) for k, v in objeto.items())
+    elif isinstance(objeto, (list, tuple, set, frozenset, deque)):
+        total += sum(_tamanho(item, vistos) for item in objeto)
+    elif not isinstance(objeto, (str, bytes, bytearray, int, float)):
+        if hasattr(objeto, "__dict__"):
+            total += _tamanho(vars(objeto), vistos)
+        for classe in type(objeto).__mro__:
+            for nome in getattr(classe, "__slots__", ()):
+                if hasattr(objeto, nome):
+                    total += _tamanho(getattr(objeto, nome), vistos)
+    return total
+
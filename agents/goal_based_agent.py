@@ -1,19 +1,29 @@
 import random
+
+from grid import Grid
+from ocupacao import MapaOcupacao
+from planejamento import Fronteira
 from .base_agent import BaseAgent
 
 class GoalBasedAgent(BaseAgent):
     """Agente baseado em objetivos - define metas e planeja como alcançá-las"""
+
+    __slots__ = ("modelo_grid", "modelo_obstacles", "ultima_acao", "casas_visitadas", "fronteira")
+
+    FASES = BaseAgent.FASES + ("atualizar_modelo", "encontrar_sujeira_mais_proxima",
+                               "encontrar_casa_nao_visitada")
     
     def __init__(self, nome, ambiente, x, y, grid, obstacles):
         super().__init__(nome, ambiente, x, y, grid, obstacles)
 
-        self.modelo_grid = [[0 for _ in range(5)] for _ in range(5)]
-        self.modelo_obstacles = []
+        self.modelo_grid = Grid(self.largura, self.altura)
+        self.modelo_obstacles = MapaOcupacao(self.largura, self.altura)
         self.obstacles = obstacles
         self.ultima_acao = None
       
-        self.casas_visitadas = set()
-        self.casas_visitadas.add((x, y))  
+        self.casas_visitadas = MapaOcupacao(self.largura, self.altura)
+        self.fronteira = Fronteira(self.casas_visitadas, self.modelo_obstacles)
+        self.fronteira.visitar(x, y)
     
     def agir(self):
       
@@ -21,7 +31,7 @@ class GoalBasedAgent(BaseAgent):
         self.atualizar_modelo()
         
       
-        self.casas_visitadas.add((self.x, self.y))
+        self.fronteira.visitar(self.x, self.y)
         
        
         if self.aspirar():
@@ -57,52 +67,28 @@ class GoalBasedAgent(BaseAgent):
     def atualizar_modelo(self):
         """Atualiza o modelo interno com informações atuais"""
 
-        self.modelo_grid[self.y][self.x] = self.grid[self.y][self.x]
+        self.modelo_grid.definir(self.x, self.y, self.grid.valor(self.x, self.y))
         
       
         movimentos_vizinhos = [(0, 1), (0, -1), (1, 0), (-1, 0)]  
         for dx, dy in movimentos_vizinhos:
             novo_x = self.x + dx
             novo_y = self.y + dy
-            if (novo_x, novo_y) in self.obstacles:
-                self.modelo_obstacles.append((novo_x, novo_y))
-            if 0 <= novo_x < 5 and 0 <= novo_y < 5:
-                self.modelo_grid[novo_y][novo_x] = self.grid[novo_y][novo_x]
+            if self.dentro_do_grid(novo_x, novo_y):
+                if self.grid.eh_obstaculo(novo_x, novo_y):
+                    self.fronteira.bloquear(novo_x, novo_y)
+                self.modelo_grid.definir(novo_x, novo_y, self.grid.valor(novo_x, novo_y))
     
     def encontrar_sujeira_mais_proxima(self):
       
-        sujeiras = []
-        for y in range(5):
-            for x in range(5):
-                if self.modelo_grid[y][x] > 0:
-                    distancia = self.distancia(self.x, self.y, x, y)
-                    sujeiras.append((x, y, self.modelo_grid[y][x], distancia))
-        if sujeiras:
-            if len(sujeiras) > 1:
-                sujeiras.sort(key=lambda s: s[2], reverse=True)
-                return sujeiras[0]
-            return sujeiras[0]
-        return None
+        # Sujeira de maior valor (empate: primeira em ordem de linha)
+        return self.reivindicar(self.modelo_grid.sujeira_mais_valiosa(self.x, self.y, self.alvos_alheios))
     
     def encontrar_casa_nao_visitada(self):
-       
-        casas_nao_visitadas = []
-        
-      
-        for y in range(5):
-            for x in range(5):
-                if (x, y) not in self.casas_visitadas and (x, y) not in self.modelo_obstacles:
-                    distancia = self.distancia(self.x, self.y, x, y)
-                    casas_nao_visitadas.append((x, y, distancia))
-        
-        if casas_nao_visitadas:
-           
-            casas_nao_visitadas.sort(key=lambda casa: casa[2])
-            return (casas_nao_visitadas[0][0], casas_nao_visitadas[0][1])
-        
-        return None
-    
-    
+        # Casa da fronteira mais próxima por um caminho já conhecido
+        casa = self.fronteira.mais_proxima(self.x, self.y)
+        return casa[:2] if casa else None
+
     def get_cor(self):
         return (255, 165, 0)  
     
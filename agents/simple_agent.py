@@ -3,6 +3,10 @@ from .base_agent import BaseAgent
 
 class SimpleAgent(BaseAgent):
     """Agente reativo simples"""
+
+    __slots__ = ()
+
+    FASES = BaseAgent.FASES + ("perceber_sujeira",)
     
     def agir(self):
         
@@ -34,7 +38,7 @@ class SimpleAgent(BaseAgent):
       
         movimentos = [(0, 1), (0, -1), (1, 0), (-1, 0)]
         for dx, dy in movimentos:
-            if 0 <= self.x + dx < 5 and 0 <= self.y + dy < 5:
-                if self.grid[self.y + dy][self.x + dx] > 0:
+            if self.dentro_do_grid(self.x + dx, self.y + dy):
+                if self.grid.valor(self.x + dx, self.y + dy) > 0:
                     return (dx, dy)
         return None
\ No newline at end of file
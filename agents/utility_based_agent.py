@@ -1,19 +1,30 @@
 import random
+
+from grid import Grid
+from ocupacao import MapaOcupacao
+from planejamento import Fronteira, planejar_caminho
+from rastreamento import rastro
 from .base_agent import BaseAgent
 
 class UtilityBasedAgent(BaseAgent):
     """Agente baseado em utilidade - avalia diferentes ações e escolhe a de maior utilidade"""
+
+    __slots__ = ("modelo_grid", "modelo_obstacles", "casas_visitadas", "fronteira")
+
+    FASES = BaseAgent.FASES + ("atualizar_modelo", "encontrar_sujeira_mais_proxima",
+                               "encontrar_casa_nao_visitada", "mover_para")
     
     def __init__(self, nome, ambiente, x, y, grid, obstacles):
         super().__init__(nome, ambiente, x, y, grid, obstacles)
         # Modelo interno do ambiente
-        self.modelo_grid = [[0 for _ in range(5)] for _ in range(5)]
-        self.modelo_obstacles = []
+        self.modelo_grid = Grid(self.largura, self.altura)
+        self.modelo_obstacles = MapaOcupacao(self.largura, self.altura)
         self.obstacles = obstacles
        
        
-        self.casas_visitadas = set()
-        self.casas_visitadas.add((x, y))  
+        self.casas_visitadas = MapaOcupacao(self.largura, self.altura)
+        self.fronteira = Fronteira(self.casas_visitadas, self.modelo_obstacles)
+        self.fronteira.visitar(x, y)
     
     def agir(self):
        
@@ -21,7 +32,7 @@ class UtilityBasedAgent(BaseAgent):
         self.atualizar_modelo()
   
        
-        self.casas_visitadas.add((self.x, self.y))
+        self.fronteira.visitar(self.x, self.y)
         
        
         if self.aspirar():
@@ -32,9 +43,8 @@ class UtilityBasedAgent(BaseAgent):
         sujeira_proxima = self.encontrar_sujeira_mais_proxima()
         if sujeira_proxima:
             x_dest, y_dest, _, _ = sujeira_proxima
-            dx, dy = self.caminho_para_posicao(x_dest, y_dest)
             
-            if self.mover(dx, dy):
+            if self.mover_para(x_dest, y_dest):
                
                 return
         
@@ -42,106 +52,59 @@ class UtilityBasedAgent(BaseAgent):
         casa_nao_visitada = self.encontrar_casa_nao_visitada()
         if casa_nao_visitada:
             x_dest, y_dest = casa_nao_visitada
-            dx, dy = self.caminho_para_posicao(x_dest, y_dest)
-            if self.mover(dx, dy):
+            if self.mover_para(x_dest, y_dest):
               
                 return
 
+        # Caminho tomado por outro agente: sai da frente em vez de desistir
+        if self.piso is not None and self.piso.vizinho_tomado(self):
+            self.desviar()
+            return
+
         self.parar()
     
 
-    def mover(self, dx, dy):
-       
-        from collections import deque
-
-        destino_x = self.x + dx
-        destino_y = self.y + dy
-
+    def mover_para(self, x_destino, y_destino):
        
-        if not (0 <= destino_x < 5 and 0 <= destino_y < 5):
-            return False
-        if (destino_x, destino_y) in self.modelo_obstacles:
-
-            visitados = set()
-            fila = deque()
-            fila.append((self.x, self.y, []))  
-
-            while fila:
-                x_atual, y_atual, caminho = fila.popleft()
-                if (x_atual, y_atual) == (destino_x, destino_y):
-                  
-                    if caminho:
-                        proximo = caminho[0]
-                        return super().mover(proximo[0] - self.x, proximo[1] - self.y)
-                    else:
-                        return False 
-                for dx_, dy_ in [(-1,0),(1,0),(0,-1),(0,1)]:
-                    nx, ny = x_atual + dx_, y_atual + dy_
-                    if (0 <= nx < 5 and 0 <= ny < 5 and
-                        (nx, ny) not in self.modelo_obstacles and
-                        (nx, ny) not in visitados):
-                        visitados.add((nx, ny))
-                        fila.append((nx, ny, caminho + [(nx, ny)]))
-            return False  
-        else:
-            
-            return super().mover(dx, dy)
+        dx, dy = self.caminho_para_posicao(x_destino, y_destino)
+        if (self.x + dx, self.y + dy) in self.modelo_obstacles:
+            # Passo direto bloqueado: segue o caminho mais curto até o destino
+            caminho = planejar_caminho(self.largura, self.altura, self.modelo_obstacles,
+                                       (self.x, self.y), (x_destino, y_destino))
+            if not caminho:
+                return False
+            dx, dy = caminho[0]
+        return self.mover(dx, dy)
     
     def atualizar_modelo(self):
      
-        self.modelo_grid[self.y][self.x] = self.grid[self.y][self.x]
+        self.modelo_grid.definir(self.x, self.y, self.grid.valor(self.x, self.y))
         
         movimentos_vizinhos = [(0, 1), (0, -1), (1, 0), (-1, 0)]  
         for dx, dy in movimentos_vizinhos:
             novo_x = self.x + dx
             novo_y = self.y + dy
-            if (novo_x, novo_y) in self.obstacles:
-                self.modelo_obstacles.append((novo_x, novo_y))
-            if 0 <= novo_x < 5 and 0 <= novo_y < 5:
-                self.modelo_grid[novo_y][novo_x] = self.grid[novo_y][novo_x]
+            if self.dentro_do_grid(novo_x, novo_y):
+                if self.grid.eh_obstaculo(novo_x, novo_y):
+                    self.fronteira.bloquear(novo_x, novo_y)
+                self.modelo_grid.definir(novo_x, novo_y, self.grid.valor(novo_x, novo_y))
     
     def encontrar_sujeira_mais_proxima(self):
      
-        sujeiras = []
-        for y in range(5):
-            for x in range(5):
-                if self.modelo_grid[y][x] > 0:
-                    distancia = self.distancia(self.x, self.y, x, y) 
-        
-                    sujeiras.append((x, y, self.modelo_grid[y][x]/( distancia + 2), distancia))
-
-        if sujeiras:
-                sujeiras.sort(key=lambda s: s[2], reverse=True) #maior utilidade primeiro
-                for index, sujeira in enumerate(sujeiras):
-                    if self.bateria >= sujeiras[index][3] + 2:
-                        print("sujeira mais proxima", sujeiras[index], "posicao", self.x, self.y)
-                        return sujeiras[index]
+        # Maior utilidade entre as sujeiras que a bateria alcança
+        sujeira = self.reivindicar(self.modelo_grid.sujeira_de_maior_utilidade(
+            self.x, self.y, self.bateria, self.alvos_alheios))
+        if sujeira:
+            if rastro.alvo:
+                rastro.emitir("alvo", self, alvo=sujeira[:2], utilidade=sujeira[2], x=self.x, y=self.y)
+            return sujeira
         return None
     
     def encontrar_casa_nao_visitada(self):
-     
-        casas_nao_visitadas = []
-        
-      
-        for y in range(5):
-            for x in range(5):
-             
-                if (x, y) not in self.casas_visitadas and (x, y) not in self.modelo_obstacles:
-                   
-                    distancia = self.distancia(self.x, self.y, x, y)
-                    casas_nao_visitadas.append((x, y, distancia))
-        
-        if casas_nao_visitadas:
-            casas_nao_visitadas.sort(key=lambda casa: casa[2], reverse=False) 
-           
-            if self.bateria >= (casas_nao_visitadas[0][2] + 3):
-               
-                return (casas_nao_visitadas[0][0], casas_nao_visitadas[0][1])
-        
-        return None
-    
-    
-    
+        # Casa da fronteira mais próxima com bateria para chegar e ainda aspirar
+        casa = self.fronteira.mais_proxima(self.x, self.y, limite=self.bateria - 3)
+        return casa[:2] if casa else None
+
     def get_cor(self):
         return (128, 0, 128)  # Roxo
     
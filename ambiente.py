@@ -0,0 +1,121 @@
+import random
+from collections import deque
+
+import numpy as np
+
+import constantes
+from grid import Grid
+from ocupacao import MapaOcupacao
+
+# Proporções do mapa 5x5 original: 3 obstáculos e 8-12 sujeiras a cada 25 casas
+DENSIDADE_OBSTACULOS = 3 / 25
+DENSIDADE_SUJEIRA = (8 / 25, 12 / 25)
+TIPOS_SUJEIRA = (1, 2, 3)
+
+# Com ``conectado``, a região do início precisa ter ao menos esta fração das casas livres
+FRACAO_MINIMA_CONECTADA = 0.5
+MAX_TENTATIVAS_CONEXAO = 100
+
+
+def criar_gerador(semente=None, rng=None):
+    """Gerador NumPy a partir de uma semente, de um ``random.Random`` ou de outro gerador"""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    if isinstance(rng, random.Random):
+        return np.random.default_rng(rng.getrandbits(64))
+    return np.random.default_rng(semente)
+
+
+def gerar_ambiente(largura=None, altura=None, semente=None, rng=None,
+                   densidade_obstaculos=DENSIDADE_OBSTACULOS, densidade_sujeira=DENSIDADE_SUJEIRA,
+                   conectado=False):
+    """Gera o ambiente com sujeiras e obstáculos.
+
+    A mesma ``semente`` gera sempre o mesmo mapa, em qualquer processo;
+    sem semente nem ``rng`` o mapa é aleatório. ``densidade_sujeira`` é a
+    faixa (mínimo, máximo) da fração de casas sujas. As casas são
+    sorteadas sem reposição, sem tentativas repetidas, e a posição inicial
+    nunca recebe obstáculo.
+
+    Com ``conectado``, as casas livres que o início não alcança viram
+    obstáculos, então toda sujeira é alcançável; se a região do início
+    ficar pequena demais, os obstáculos são sorteados de novo.
+    """
+    largura = largura or constantes.GRID_WIDTH
+    altura = altura or constantes.GRID_HEIGHT
+    gerador = criar_gerador(semente, rng)
+    grid = Grid(largura, altura)
+    area = largura * altura
+    x0, y0 = posicao_inicial(grid)
+    inicio = y0 * largura + x0
+
+    num_obstacles = min(area - 1, round(area * densidade_obstaculos))
+    minimo, maximo = densidade_sujeira
+    total_sujeiras = int(gerador.integers(round(area * minimo), round(area * maximo) + 1))
+
+    for _ in range(MAX_TENTATIVAS_CONEXAO):
+        # Obstáculos: sorteio entre as casas menos a inicial
+        sorteadas = gerador.choice(area - 1, num_obstacles, replace=False)
+        sorteadas[sorteadas >= inicio] += 1
+        mascara = np.zeros(area, dtype=bool)
+        mascara[sorteadas] = True
+        if not conectado:
+            break
+        alcancaveis = casas_alcancaveis(mascara, largura, altura, inicio)
+        if alcancaveis.sum() >= FRACAO_MINIMA_CONECTADA * (area - num_obstacles):
+            break
+    if conectado:
+        mascara = ~alcancaveis
+    grid.obstaculos[:] = mascara.reshape(altura, largura)
+
+    # Sujeiras: sorteio entre as casas livres restantes
+    if conectado:
+        livres = np.flatnonzero(~mascara)
+        total_sujeiras = min(total_sujeiras, len(livres))
+        casas = livres[gerador.choice(len(livres), total_sujeiras, replace=False)]
+    else:
+        total_sujeiras = min(total_sujeiras, area - num_obstacles)
+        casas = _livres_por_posicao(gerador.choice(area - num_obstacles, total_sujeiras, replace=False),
+                                    np.sort(sorteadas))
+    grid.sujeira.ravel()[casas] = gerador.choice(TIPOS_SUJEIRA, total_sujeiras)
+
+    return grid, MapaOcupacao.de_mascara(grid.obstaculos)
+
+def _livres_por_posicao(posicoes, ocupadas):
+    """Converte posições entre as casas livres em índices do mapa.
+
+    ``ocupadas`` são os índices ocupados, em ordem. A casa livre de posição
+    ``p`` é ``p + k``, onde ``k`` é quantas ocupadas vêm antes dela.
+    """
+    # ocupadas[j] - j = quantas casas livres vêm antes da j-ésima ocupada
+    livres_antes = ocupadas - np.arange(len(ocupadas))
+    # Consultas em ordem deixam o searchsorted bem mais rápido em mapas grandes
+    posicoes = np.sort(posicoes)
+    return posicoes + np.searchsorted(livres_antes, posicoes, side="right")
+
+def casas_alcancaveis(obstaculos, largura, altura, inicio):
+    """Máscara achatada das casas que ``inicio`` alcança sem passar por obstáculos"""
+    bloqueado = bytearray(obstaculos.astype(np.uint8).tobytes())
+    visitado = bytearray(largura * altura)
+    visitado[inicio] = 1
+    fila = deque([inicio])
+    while fila:
+        indice = fila.popleft()
+        x = indice % largura
+        for vizinho, valido in ((indice - 1, x > 0), (indice + 1, x < largura - 1),
+                                (indice - largura, indice >= largura),
+                                (indice + largura, indice < (altura - 1) * largura)):
+            if valido and not visitado[vizinho] and not bloqueado[vizinho]:
+                visitado[vizinho] = 1
+                fila.append(vizinho)
+    return np.frombuffer(bytes(visitado), dtype=np.uint8).astype(bool)
+
+def posicao_inicial(grid):
+    """Posição inicial dos agentes: o centro do mapa"""
+    return grid.largura // 2, grid.altura // 2
+
+def copiar_grid(grid):
+    """Cria uma cópia profunda do grid (aceita também o formato de listas)"""
+    if isinstance(grid, list):
+        return Grid.de_listas(grid)
+    return grid.copiar()
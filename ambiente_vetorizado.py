@@ -0,0 +1,203 @@
+"""Ambiente vetorizado: B mundos independentes avançando em lockstep.
+
+Todos os mundos ficam empilhados em arrays NumPy (grids, posições,
+baterias e pontuações) e cada chamada de ``step`` avança todos de uma vez,
+com as mesmas regras de ``BaseAgent.mover`` e ``BaseAgent.aspirar``:
+mover custa 1 de bateria, aspirar custa 2 e só é feito com bateria > 2.
+
+As casas sujas de todos os mundos ficam num índice de coordenadas (uma
+entrada por sujeira inicial, agrupadas por mundo), então a sujeira mais
+próxima de cada agente é buscada só entre elas, sem varrer os grids.
+
+As políticas ficam em ``politicas_vetorizadas``, compartilhadas com o
+``Enxame``.
+
+Uso pela linha de comando (mede passos de agente por segundo):
+
+    python ambiente_vetorizado.py --mundos 10000 --politica gulosa
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ambiente import gerar_ambiente, posicao_inicial
+from politicas_vetorizadas import ACAO_ASPIRAR, MOVIMENTOS, POLITICAS
+
+BATERIA_INICIAL = 30
+
+
+class AmbienteVetorizado:
+    """B mundos do mesmo tamanho, cada um com um agente"""
+
+    def __init__(self, sujeira, obstaculos, x, y, bateria=BATERIA_INICIAL):
+        self.sujeira = np.ascontiguousarray(sujeira, dtype=np.uint8)
+        self.obstaculos = np.ascontiguousarray(obstaculos, dtype=bool)
+        self.mundos, self.altura, self.largura = self.sujeira.shape
+        self.indices = np.arange(self.mundos)
+
+        self.x = np.array(x, dtype=np.int64)
+        self.y = np.array(y, dtype=np.int64)
+        self.bateria = np.full(self.mundos, bateria, dtype=np.int64)
+        self.pontuacao = np.zeros(self.mundos, dtype=np.int64)
+        self.ativo = np.ones(self.mundos, dtype=bool)
+        self.passos = 0
+        self.passos_agente = 0
+        self._indexar_sujeira()
+
+    def _indexar_sujeira(self):
+        """Coordenadas das casas sujas, em ordem de mundo e depois de linha"""
+        mundo, y, x = np.nonzero(self.sujeira)
+        self.sujas_x = x.astype(np.int64)
+        self.sujas_y = y.astype(np.int64)
+        self.sujas_mundo = mundo.astype(np.int64)
+        self.sujas_casa = self.sujas_y * self.largura + self.sujas_x
+        # Chave ordenada para achar a entrada de uma casa com searchsorted
+        self.sujas_chave = self.sujas_mundo * (self.altura * self.largura) + self.sujas_casa
+        self.sujas_ativa = np.ones(len(self.sujas_chave), dtype=bool)
+        self.sujas_limpas = 0
+        contagem = np.bincount(self.sujas_mundo, minlength=self.mundos)
+        self.sujas_inicio = np.concatenate(([0], np.cumsum(contagem)[:-1]))
+        self.sujas_tem = contagem > 0
+
+    @classmethod
+    def de_grids(cls, grids, bateria=BATERIA_INICIAL):
+        """Empilha uma lista de ``Grid`` (todos do mesmo tamanho)"""
+        sujeira = np.stack([grid.sujeira for grid in grids])
+        obstaculos = np.stack([grid.obstaculos for grid in grids])
+        inicio_x, inicio_y = posicao_inicial(grids[0])
+        n = len(grids)
+        return cls(sujeira, obstaculos, np.full(n, inicio_x), np.full(n, inicio_y), bateria)
+
+    @classmethod
+    def gerar(cls, mundos, largura=None, altura=None, semente=0, bateria=BATERIA_INICIAL):
+        """Gera ``mundos`` mapas com ``gerar_ambiente``, um por semente"""
+        grids = []
+        for i in range(mundos):
+            grid, _ = gerar_ambiente(largura, altura, semente=semente + i)
+            grids.append(grid)
+        return cls.de_grids(grids, bateria)
+
+    def sujeira_atual(self):
+        """Valor da sujeira sob cada agente"""
+        return self.sujeira[self.indices, self.y, self.x]
+
+    def _vizinhos(self):
+        """Coordenadas (B, 4) das casas vizinhas, presas à borda, e a máscara das que existem"""
+        nx = self.x[:, None] + MOVIMENTOS[:, 0]
+        ny = self.y[:, None] + MOVIMENTOS[:, 1]
+        dentro = (nx >= 0) & (nx < self.largura) & (ny >= 0) & (ny < self.altura)
+        return np.clip(nx, 0, self.largura - 1), np.clip(ny, 0, self.altura - 1), dentro
+
+    def movimentos_validos(self):
+        """Máscara (B, 4) dos movimentos possíveis a partir de cada posição"""
+        nx, ny, dentro = self._vizinhos()
+        return dentro & ~self.obstaculos[self.indices[:, None], ny, nx]
+
+    def sujeira_vizinha(self):
+        """Sujeira (B, 4) das casas vizinhas (presas à borda)"""
+        nx, ny, _ = self._vizinhos()
+        return self.sujeira[self.indices[:, None], ny, nx]
+
+    def step(self, acoes):
+        """Aplica uma ação por mundo e retorna a máscara de ações bem-sucedidas"""
+        acoes = np.asarray(acoes)
+        self.passos_agente += int(np.count_nonzero(self.ativo))
+        sucesso = np.zeros(self.mundos, dtype=bool)
+
+        # Mover
+        mover = self.ativo & (acoes < ACAO_ASPIRAR)
+        if mover.any():
+            direcao = np.where(mover, acoes, 0)
+            validos = self.movimentos_validos()[self.indices, direcao] & mover
+            self.x += np.where(validos, MOVIMENTOS[direcao, 0], 0)
+            self.y += np.where(validos, MOVIMENTOS[direcao, 1], 0)
+            self.bateria -= validos
+            sucesso |= validos
+
+        # Aspirar
+        aspirar = self.ativo & (acoes == ACAO_ASPIRAR)
+        if aspirar.any():
+            valores = self.sujeira_atual()
+            sujo = aspirar & (valores > 0)
+            limpou = sujo & (self.bateria > 2)
+            self.pontuacao += np.where(limpou, valores, 0)
+            self.sujeira[self.indices[limpou], self.y[limpou], self.x[limpou]] = 0
+            chaves = (self.indices[limpou] * self.altura + self.y[limpou]) * self.largura + self.x[limpou]
+            self.sujas_ativa[np.searchsorted(self.sujas_chave, chaves)] = False
+            self.sujas_limpas += len(chaves)
+            # Com metade do índice já limpa, refaz só com as sujeiras restantes
+            if 2 * self.sujas_limpas > len(self.sujas_chave):
+                self._indexar_sujeira()
+            self.bateria -= 2 * limpou
+            # Sem bateria para aspirar o agente para, como em BaseAgent.aspirar
+            self.ativo &= ~(sujo & ~limpou)
+            sucesso |= limpou
+
+        self.ativo &= self.bateria > 0
+        self.passos += 1
+        return sucesso
+
+    def executar(self, politica, max_passos, rng=None):
+        """Roda a política até todos pararem ou acabar o orçamento de passos"""
+        rng = rng if rng is not None else np.random.default_rng()
+        while self.passos < max_passos and self.ativo.any():
+            self.step(politica(self, rng))
+        return self.pontuacao
+
+    def sujeira_mais_proxima(self):
+        """Sujeira mais próxima (Manhattan) de cada agente: ``(tem_alvo, alvo_x, alvo_y)``.
+
+        Empate: a primeira em ordem de linha, como um ``argmin`` no grid.
+        """
+        area = self.altura * self.largura
+        distancias = (np.abs(self.sujas_x - self.x[self.sujas_mundo])
+                      + np.abs(self.sujas_y - self.y[self.sujas_mundo]))
+        # Distância e posição numa só chave, para o mínimo já desempatar
+        chaves = np.where(self.sujas_ativa, distancias * area + self.sujas_casa, np.iinfo(np.int64).max)
+
+        melhor = np.full(self.mundos, np.iinfo(np.int64).max)
+        if self.sujas_tem.any():
+            melhor[self.sujas_tem] = np.minimum.reduceat(chaves, self.sujas_inicio[self.sujas_tem])
+        tem_alvo = melhor != np.iinfo(np.int64).max
+        alvo_y, alvo_x = np.divmod(np.where(tem_alvo, melhor % area, 0), self.largura)
+        return tem_alvo, alvo_x, alvo_y
+
+    def direcao_gulosa(self, validos):
+        """Passo em direção à sujeira mais próxima (Manhattan), como ``caminho_para_posicao``"""
+        tem_alvo, alvo_x, alvo_y = self.sujeira_mais_proxima()
+        # Mesma ordem de caminho_para_posicao: primeiro x, depois y
+        direcao = np.select(
+            [self.x < alvo_x, self.x > alvo_x, self.y < alvo_y],
+            [2, 3, 0],
+            default=1,
+        )
+        return direcao, tem_alvo & validos[self.indices, direcao]
+
+
+def main(argv=None):
+    """Linha de comando: mede a vazão do ambiente vetorizado"""
+    parser = argparse.ArgumentParser(description="Ambiente vetorizado do robô aspirador")
+    parser.add_argument("--mundos", type=int, default=10000)
+    parser.add_argument("--politica", choices=list(POLITICAS), default="reativa")
+    parser.add_argument("--passos", type=int, default=240)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--largura", type=int, default=None)
+    parser.add_argument("--altura", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    ambiente = AmbienteVetorizado.gerar(args.mundos, args.largura, args.altura, args.semente)
+    rng = np.random.default_rng(args.semente)
+
+    inicio = time.perf_counter()
+    pontuacao = ambiente.executar(POLITICAS[args.politica], args.passos, rng)
+    duracao = time.perf_counter() - inicio
+
+    passos_agente = ambiente.passos_agente
+    print(f"{passos_agente} passos de agente em {duracao:.3f}s "
+          f"({passos_agente / max(duracao, 1e-9):,.0f} passos/s)")
+    print(f"Pontuação média: {pontuacao.mean():.2f}")
+
+
+if __name__ == "__main__":
+    main()
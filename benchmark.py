@@ -0,0 +1,394 @@
+"""Benchmarks de agentes, planejamento, geração de mapas e desenho.
+
+Todos os casos usam sementes fixas, então duas execuções medem exatamente
+o mesmo trabalho e podem ser comparadas. Cada caso é preparado fora do
+cronômetro (mapas, agentes, janela) e medido ``--repeticoes`` vezes; o
+resultado é o tempo mediano por operação (um ``agir()``, um plano, um
+mapa ou um quadro). A seção ``memoria`` guarda os bytes de estado próprio
+de um agente de cada classe ao fim de um episódio (``BaseAgent.memoria``).
+
+Uso pela linha de comando:
+
+    python benchmark.py --saida base.json
+    python benchmark.py --comparar base.json --saida atual.json
+    python benchmark.py --filtro agir/AgenteBDI planejar explorar
+
+Com ``--comparar``, os casos que ficaram mais lentos (ou maiores, na
+memória) que a base além da ``--tolerancia`` são marcados como regressão e
+o programa sai com status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import constantes
+from ambiente import copiar_grid, gerar_ambiente, posicao_inicial
+from planejamento import cache_campos
+from simulacao import AGENTES, PASSOS_PADRAO, criar_agentes
+from simulador_tempo import SimuladorTempo
+
+VERSAO_FORMATO = 1
+SEMENTE = 2024
+REPETICOES = 5
+# Diferenças menores que isso entre duas execuções são ruído de medição
+TOLERANCIA = 0.15
+
+TAMANHOS_AGIR = ((5, 5), (20, 20), (64, 64))
+EPISODIOS_AGIR = 20
+TAMANHOS_PLANO = ((20, 20), (64, 64), (256, 256))
+CONSULTAS_PLANO = 50
+# Região já explorada (distância de Manhattan até o início) nos casos de exploração
+RAIO_EXPLORADO = 12
+# Mapas gerados por repetição em cada tamanho
+TAMANHOS_GERACAO = {(5, 5): 500, (100, 100): 50, (1000, 1000): 3}
+TAMANHOS_DESENHO = ((5, 5), (20, 20), (64, 64))
+QUADROS_INICIAIS = 10
+
+
+# Casos: cada um é ``(nome, preparar)``; ``preparar()`` devolve a função medida,
+# que retorna quantas operações fez
+
+def _casos_agir():
+    """Custo de um ``agir()`` de cada classe, do início do episódio até a bateria acabar"""
+    for nome_classe in AGENTES:
+        for largura, altura in TAMANHOS_AGIR:
+            yield f"agir/{nome_classe}/{largura}x{altura}", _preparar_agir(nome_classe, largura, altura)
+
+
+def _preparar_agir(nome_classe, largura, altura):
+    def preparar():
+        agentes = []
+        for i in range(EPISODIOS_AGIR):
+            grid, obstacles = gerar_ambiente(largura, altura, semente=SEMENTE + i)
+            grid = copiar_grid(grid)
+            x, y = posicao_inicial(grid)
+            agentes.extend(criar_agentes([nome_classe], SimuladorTempo(), x, y, grid, obstacles))
+
+        def medir():
+            random.seed(SEMENTE)
+            operacoes = 0
+            for agente in agentes:
+                for _ in range(PASSOS_PADRAO):
+                    if not (agente.executando and agente.bateria > 0):
+                        break
+                    agente.agir()
+                    operacoes += 1
+            return operacoes
+        return medir
+    return preparar
+
+
+def medir_memoria(filtros=None):
+    """Bytes de estado de um agente de cada classe depois de um episódio em cada tamanho"""
+    memoria = {}
+    for nome_classe in AGENTES:
+        for largura, altura in TAMANHOS_AGIR:
+            nome = f"memoria/{nome_classe}/{largura}x{altura}"
+            if filtros and not any(nome.startswith(filtro) for filtro in filtros):
+                continue
+            grid, obstacles = gerar_ambiente(largura, altura, semente=SEMENTE)
+            grid = copiar_grid(grid)
+            x, y = posicao_inicial(grid)
+            random.seed(SEMENTE)
+            agente, = criar_agentes([nome_classe], SimuladorTempo(), x, y, grid, obstacles)
+            for _ in range(PASSOS_PADRAO):
+                if not (agente.executando and agente.bateria > 0):
+                    break
+                agente.agir()
+            memoria[nome] = agente.memoria()
+    return memoria
+
+
+def _casos_planejar():
+    """Planos sem cache: ``AgenteBDI.criar_plano`` e o desvio de ``UtilityBasedAgent.mover_para``"""
+    for largura, altura in TAMANHOS_PLANO:
+        yield f"planejar/AgenteBDI/{largura}x{altura}", _preparar_plano_bdi(largura, altura)
+        yield f"planejar/UtilityBasedAgent/{largura}x{altura}", _preparar_desvio(largura, altura)
+
+
+def _casos_explorar():
+    """Escolha da próxima casa a explorar com a mesma região explorada em mapas cada vez maiores"""
+    for largura, altura in TAMANHOS_PLANO:
+        yield f"explorar/GoalBasedAgent/{largura}x{altura}", _preparar_exploracao("GoalBasedAgent", largura, altura)
+        yield f"explorar/AgenteBDI/{largura}x{altura}", _preparar_exploracao("AgenteBDI", largura, altura)
+
+
+def _preparar_exploracao(nome_classe, largura, altura):
+    def preparar():
+        grid, obstacles = gerar_ambiente(largura, altura, semente=SEMENTE, conectado=True)
+        x, y = posicao_inicial(grid)
+        agente, = criar_agentes([nome_classe], SimuladorTempo(), x, y, copiar_grid(grid), obstacles)
+        fronteira = agente.crencas['fronteira'] if nome_classe == "AgenteBDI" else agente.fronteira
+        for yy in range(max(0, y - RAIO_EXPLORADO), min(altura, y + RAIO_EXPLORADO + 1)):
+            for xx in range(max(0, x - RAIO_EXPLORADO), min(largura, x + RAIO_EXPLORADO + 1)):
+                if abs(xx - x) + abs(yy - y) <= RAIO_EXPLORADO:
+                    if grid.eh_obstaculo(xx, yy):
+                        fronteira.bloquear(xx, yy)
+                    else:
+                        fronteira.visitar(xx, yy)
+        visitadas = list(fronteira.visitadas)
+        rng = np.random.default_rng(SEMENTE)
+        origens = [visitadas[i] for i in rng.choice(len(visitadas), CONSULTAS_PLANO)]
+        buscar = (agente.encontrar_casa_inexplorada if nome_classe == "AgenteBDI"
+                  else agente.encontrar_casa_nao_visitada)
+
+        def medir():
+            for agente.x, agente.y in origens:
+                agente.bateria = largura * altura
+                buscar()
+            return len(origens)
+        return medir
+    return preparar
+
+
+def _mapa_conhecido(nome_classe, largura, altura):
+    """Agente no centro de um mapa conectado, já conhecendo todos os obstáculos"""
+    grid, obstacles = gerar_ambiente(largura, altura, semente=SEMENTE, conectado=True)
+    x, y = posicao_inicial(grid)
+    agente, = criar_agentes([nome_classe], SimuladorTempo(), x, y, copiar_grid(grid), obstacles)
+    fronteira = agente.crencas['fronteira'] if nome_classe == "AgenteBDI" else agente.fronteira
+    for x, y in obstacles:
+        fronteira.bloquear(x, y)
+    livres = np.argwhere(~grid.obstaculos)
+    return agente, grid, livres
+
+
+def _preparar_plano_bdi(largura, altura):
+    def preparar():
+        agente, _, livres = _mapa_conhecido("AgenteBDI", largura, altura)
+        rng = np.random.default_rng(SEMENTE)
+        destinos = [(int(x), int(y)) for y, x in livres[rng.choice(len(livres), CONSULTAS_PLANO)]]
+
+        def medir():
+            for x, y in destinos:
+                cache_campos.limpar()
+                agente.criar_plano(x, y)
+            return len(destinos)
+        return medir
+    return preparar
+
+
+def _preparar_desvio(largura, altura):
+    def preparar():
+        agente, grid, livres = _mapa_conhecido("UtilityBasedAgent", largura, altura)
+        rng = np.random.default_rng(SEMENTE)
+        # Pares em que o passo direto está bloqueado, então mover_para busca o caminho
+        pares = []
+        while len(pares) < CONSULTAS_PLANO:
+            (y0, x0), (y1, x1) = livres[rng.choice(len(livres), 2)].tolist()
+            agente.x, agente.y = x0, y0
+            dx, dy = agente.caminho_para_posicao(x1, y1)
+            if (x0 + dx, y0 + dy) in agente.modelo_obstacles:
+                pares.append(((x0, y0), (x1, y1)))
+
+        def medir():
+            for (x0, y0), (x1, y1) in pares:
+                cache_campos.limpar()
+                agente.x, agente.y, agente.bateria = x0, y0, largura * altura
+                agente.mover_para(x1, y1)
+            return len(pares)
+        return medir
+    return preparar
+
+
+def _casos_gerar():
+    """Mapas gerados por segundo em cada tamanho"""
+    for (largura, altura), mapas in TAMANHOS_GERACAO.items():
+        yield f"gerar_ambiente/{largura}x{altura}", _preparar_gerar(largura, altura, mapas)
+
+
+def _preparar_gerar(largura, altura, mapas):
+    def preparar():
+        def medir():
+            for i in range(mapas):
+                gerar_ambiente(largura, altura, semente=SEMENTE + i)
+            return mapas
+        return medir
+    return preparar
+
+
+def _casos_desenhar():
+    """Tempo de quadro do ``Renderizador`` com o driver de vídeo ``dummy`` do SDL"""
+    for largura, altura in TAMANHOS_DESENHO:
+        yield f"desenhar/inicial/{largura}x{altura}", _preparar_desenho(largura, altura, True)
+        yield f"desenhar/quadro/{largura}x{altura}", _preparar_desenho(largura, altura, False)
+
+
+def _tela():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    # Mesma janela do simulador
+    constantes.WINDOW_WIDTH = 900
+    constantes.WINDOW_HEIGHT = 600
+    constantes.CELL_SIZE = 110
+    pygame.init()
+    return pygame.display.set_mode((constantes.WINDOW_WIDTH, constantes.WINDOW_HEIGHT))
+
+
+def _preparar_desenho(largura, altura, inicial):
+    """Com ``inicial``, mede o fundo e o primeiro quadro; senão, os quadros de um episódio"""
+    def preparar():
+        from renderizacao import Renderizador
+
+        tela = _tela()
+        grid, obstacles = gerar_ambiente(largura, altura, semente=SEMENTE)
+        grid = copiar_grid(grid)
+        x, y = posicao_inicial(grid)
+        random.seed(SEMENTE)
+        ambiente = SimuladorTempo()
+        agentes = criar_agentes(list(AGENTES), ambiente, x, y, grid, obstacles)
+
+        if inicial:
+            def medir():
+                for _ in range(QUADROS_INICIAIS):
+                    Renderizador(tela, grid, agentes).desenhar()
+                return QUADROS_INICIAIS
+            return medir
+
+        renderizador = Renderizador(tela, grid, agentes)
+        renderizador.desenhar()
+
+        def medir():
+            quadros = 0
+            for _ in range(PASSOS_PADRAO):
+                if not any(agente.executando and agente.bateria > 0 for agente in agentes):
+                    break
+                ambiente.step()
+                renderizador.desenhar()
+                quadros += 1
+            return max(quadros, 1)
+        return medir
+    return preparar
+
+
+GRUPOS = (_casos_agir, _casos_planejar, _casos_explorar, _casos_gerar, _casos_desenhar)
+
+
+def casos(filtros=None):
+    """Casos cujo nome começa com algum dos ``filtros`` (todos, sem filtros)"""
+    for grupo in GRUPOS:
+        for nome, preparar in grupo():
+            if not filtros or any(nome.startswith(filtro) for filtro in filtros):
+                yield nome, preparar
+
+
+def medir_caso(preparar, repeticoes=REPETICOES):
+    """Tempos por operação de cada repetição e o número de operações.
+
+    Uma repetição extra, descartada, aquece caches e importações.
+    """
+    preparar()()
+    tempos = []
+    operacoes = 0
+    for _ in range(repeticoes):
+        medir = preparar()
+        inicio = time.perf_counter()
+        operacoes = medir()
+        tempos.append((time.perf_counter() - inicio) / operacoes)
+    return tempos, operacoes
+
+
+def executar(filtros=None, repeticoes=REPETICOES, eco=True):
+    """Roda os casos e devolve o documento gravado em JSON"""
+    resultados = {}
+    for nome, preparar in casos(filtros):
+        tempos, operacoes = medir_caso(preparar, repeticoes)
+        resultados[nome] = {
+            'segundos': statistics.median(tempos),
+            'minimo': min(tempos),
+            'maximo': max(tempos),
+            'operacoes': operacoes,
+            'repeticoes': repeticoes,
+        }
+        if eco:
+            print(f"{nome:<40} {_formatar(resultados[nome]['segundos']):>12}/op ({operacoes} ops)")
+    memoria = medir_memoria(filtros)
+    if eco:
+        for nome, tamanho in memoria.items():
+            print(f"{nome:<40} {tamanho / 1024:>9.1f} KiB")
+    return {
+        'versao': VERSAO_FORMATO,
+        'data': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'semente': SEMENTE,
+        'resultados': resultados,
+        'memoria': memoria,
+    }
+
+
+def comparar(atual, base, tolerancia=TOLERANCIA):
+    """Lista ``(nome, razao, regressao)`` dos casos presentes nas duas execuções.
+
+    ``razao`` é o melhor tempo atual / melhor tempo da base (o mínimo sofre
+    menos com a carga da máquina que a mediana), ou a razão entre os bytes
+    na seção de memória; acima de ``1 + tolerancia`` é regressão.
+    """
+    if base.get('versao') != VERSAO_FORMATO:
+        raise ValueError(f"versão de resultados não suportada: {base.get('versao')}")
+    comparacao = []
+    for nome, resultado in atual['resultados'].items():
+        anterior = base['resultados'].get(nome)
+        if anterior is None:
+            continue
+        razao = resultado['minimo'] / anterior['minimo']
+        comparacao.append((nome, razao, razao > 1 + tolerancia))
+    for nome, tamanho in atual.get('memoria', {}).items():
+        anterior = base.get('memoria', {}).get(nome)
+        if anterior:
+            razao = tamanho / anterior
+            comparacao.append((nome, razao, razao > 1 + tolerancia))
+    return comparacao
+
+
+def _formatar(segundos):
+    for unidade, escala in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if segundos >= escala:
+            return f"{segundos / escala:.2f} {unidade}"
+    return f"{segundos / 1e-9:.0f} ns"
+
+
+def main(argv=None):
+    """Linha de comando dos benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmarks do simulador")
+    parser.add_argument("--filtro", nargs="+", default=None,
+                        help="roda só os casos cujo nome começa com um destes prefixos")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--saida", default=None, help="grava os resultados neste arquivo JSON")
+    parser.add_argument("--comparar", default=None, help="arquivo JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="lentidão relativa aceita antes de acusar regressão (padrão: %(default)s)")
+    args = parser.parse_args(argv)
+
+    atual = executar(args.filtro, args.repeticoes)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(atual, arquivo, indent=2)
+            arquivo.write("\n")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        comparacao = comparar(atual, base, args.tolerancia)
+        print(f"\n=== COMPARAÇÃO COM {args.comparar} ===")
+        for nome, razao, regressao in comparacao:
+            marca = "REGRESSÃO" if regressao else "melhora" if razao < 1 - args.tolerancia else ""
+            print(f"{nome:<40} {razao:>6.2f}x {marca}")
+        regressoes = sum(regressao for _, _, regressao in comparacao)
+        print(f"\n{regressoes} regressões em {len(comparacao)} casos comparados")
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
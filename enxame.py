@@ -0,0 +1,218 @@
+"""Enxame: milhares de robôs iguais no mesmo mapa, em arrays contíguos.
+
+Ao contrário de ``AmbienteVetorizado`` (um agente por mundo), aqui todos
+os robôs dividem um único grid. Posições, baterias, pontuações e o estado
+de cada robô são arrays NumPy, então a memória por robô é fixa (alguns
+bytes, veja ``bytes_por_robo``) e cada passo é uma única passada
+vetorizada, com as mesmas regras de ``BaseAgent``: mover custa 1 de
+bateria, aspirar custa 2 e só é feito com bateria > 2.
+
+Políticas (as de ``politicas_vetorizadas``, as mesmas do ambiente vetorizado):
+
+- ``reativa``: a regra do ``SimpleAgent`` (aspira, vai para um vizinho
+  sujo ou anda ao acaso);
+- ``gulosa``: a do agente baseado em modelo, com um modelo compartilhado.
+  Cada robô vê a própria casa e as quatro vizinhas, e o que todos viram
+  vai para um único mapa de sujeiras conhecidas. Um campo de distâncias
+  de Manhattan até a sujeira conhecida mais próxima é calculado para o
+  mapa inteiro (duas varreduras separáveis) e cada robô desce por ele
+  (``direcao_gulosa``).
+
+Robôs podem dividir uma casa; se vários aspiram a mesma casa no mesmo
+passo, só o de menor índice leva a sujeira.
+
+Uso pela linha de comando:
+
+    python enxame.py --robos 10000 --largura 1000 --altura 1000 --politica gulosa
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ambiente import gerar_ambiente, posicao_inicial
+from ambiente_vetorizado import BATERIA_INICIAL
+from politicas_vetorizadas import ACAO_ASPIRAR, MOVIMENTOS, POLITICAS
+
+
+class Enxame:
+    """N robôs homogêneos num único mapa"""
+
+    def __init__(self, sujeira, obstaculos, x, y, bateria=BATERIA_INICIAL):
+        self.sujeira = np.array(sujeira, dtype=np.uint8)
+        self.obstaculos = np.ascontiguousarray(obstaculos, dtype=bool)
+        self.altura, self.largura = self.sujeira.shape
+        self.robos = len(x)
+
+        self.x = np.array(x, dtype=np.int32)
+        self.y = np.array(y, dtype=np.int32)
+        self.bateria = np.full(self.robos, bateria, dtype=np.int16)
+        self.pontuacao = np.zeros(self.robos, dtype=np.int32)
+        self.ativo = np.ones(self.robos, dtype=bool)
+
+        # Modelo compartilhado: sujeiras que algum robô já viu
+        self.conhecida = np.zeros_like(self.sujeira)
+        self._distancias = None
+        self.passos = 0
+        self.passos_robo = 0
+
+    @classmethod
+    def gerar(cls, robos, largura=None, altura=None, semente=0, bateria=BATERIA_INICIAL, espalhados=True):
+        """Gera o mapa com ``gerar_ambiente``; os robôs começam em casas livres sorteadas
+        ou, sem ``espalhados``, todos na posição inicial dos agentes"""
+        grid, _ = gerar_ambiente(largura, altura, semente=semente)
+        if espalhados:
+            livres = np.flatnonzero(~grid.obstaculos)
+            casas = livres[np.random.default_rng(semente).integers(len(livres), size=robos)]
+            y, x = np.divmod(casas, grid.largura)
+        else:
+            inicio_x, inicio_y = posicao_inicial(grid)
+            x, y = np.full(robos, inicio_x), np.full(robos, inicio_y)
+        return cls(grid.sujeira, grid.obstaculos, x, y, bateria)
+
+    def bytes_por_robo(self):
+        return sum(a.itemsize for a in (self.x, self.y, self.bateria, self.pontuacao, self.ativo))
+
+    def sujeira_atual(self):
+        """Valor da sujeira sob cada robô"""
+        return self.sujeira[self.y, self.x]
+
+    def _vizinhos(self):
+        """Coordenadas (N, 4) das casas vizinhas, presas à borda, e a máscara das que existem"""
+        nx = self.x[:, None] + MOVIMENTOS[:, 0]
+        ny = self.y[:, None] + MOVIMENTOS[:, 1]
+        dentro = (nx >= 0) & (nx < self.largura) & (ny >= 0) & (ny < self.altura)
+        return np.clip(nx, 0, self.largura - 1), np.clip(ny, 0, self.altura - 1), dentro
+
+    def movimentos_validos(self):
+        """Máscara (N, 4) dos movimentos possíveis a partir de cada posição"""
+        nx, ny, dentro = self._vizinhos()
+        return dentro & ~self.obstaculos[ny, nx]
+
+    def sujeira_vizinha(self):
+        """Sujeira (N, 4) das casas vizinhas (presas à borda)"""
+        nx, ny, _ = self._vizinhos()
+        return self.sujeira[ny, nx]
+
+    def perceber(self):
+        """Cada robô ativo anota no modelo compartilhado a própria casa e as vizinhas"""
+        nx, ny, _ = self._vizinhos()
+        xs = np.concatenate([self.x[self.ativo], nx[self.ativo].ravel()])
+        ys = np.concatenate([self.y[self.ativo], ny[self.ativo].ravel()])
+        vistas = self.sujeira[ys, xs]
+        if np.any(self.conhecida[ys, xs] != vistas):
+            self.conhecida[ys, xs] = vistas
+            self._distancias = None
+
+    def distancias(self):
+        """Distância de Manhattan de cada casa até a sujeira conhecida mais próxima.
+
+        Ignora obstáculos. Casas sem nenhuma sujeira conhecida ficam com
+        ``largura + altura``. Só é recalculado depois que o modelo muda.
+        """
+        if self._distancias is None:
+            infinito = self.largura + self.altura
+            campo = np.where(self.conhecida > 0, 0, infinito).astype(np.int32)
+            campo = _transformada_1d(_transformada_1d(campo, 0), 1)
+            self._distancias = np.minimum(campo, infinito)
+        return self._distancias
+
+    def direcao_gulosa(self, validos):
+        """Vizinho que mais desce o campo de distâncias; só vale se estiver mais perto que a casa atual"""
+        self.perceber()
+        distancias = self.distancias()
+        nx, ny, _ = self._vizinhos()
+        vizinhas = np.where(validos, distancias[ny, nx], np.iinfo(np.int32).max)
+        melhor = np.argmin(vizinhas, axis=1)
+        aproxima = vizinhas[np.arange(self.robos), melhor] < distancias[self.y, self.x]
+        return melhor, aproxima
+
+    def step(self, acoes):
+        """Aplica uma ação por robô e retorna a máscara de ações bem-sucedidas"""
+        acoes = np.asarray(acoes)
+        self.passos_robo += int(np.count_nonzero(self.ativo))
+        sucesso = np.zeros(self.robos, dtype=bool)
+
+        # Mover
+        mover = self.ativo & (acoes < ACAO_ASPIRAR)
+        if mover.any():
+            direcao = np.where(mover, acoes, 0)
+            validos = self.movimentos_validos()[np.arange(self.robos), direcao] & mover
+            self.x += np.where(validos, MOVIMENTOS[direcao, 0], 0).astype(np.int32)
+            self.y += np.where(validos, MOVIMENTOS[direcao, 1], 0).astype(np.int32)
+            self.bateria -= validos
+            sucesso |= validos
+
+        # Aspirar: de vários robôs na mesma casa suja, só o primeiro leva
+        aspirar = self.ativo & (acoes == ACAO_ASPIRAR)
+        if aspirar.any():
+            valores = self.sujeira_atual()
+            sujo = aspirar & (valores > 0)
+            # Sem bateria para aspirar o robô para, como em BaseAgent.aspirar
+            self.ativo &= ~(sujo & (self.bateria <= 2))
+            candidatos = np.flatnonzero(sujo & (self.bateria > 2))
+            casas = self.y[candidatos].astype(np.int64) * self.largura + self.x[candidatos]
+            _, primeiros = np.unique(casas, return_index=True)
+            limparam = candidatos[primeiros]
+            self.pontuacao[limparam] += valores[limparam]
+            self.bateria[limparam] -= 2
+            self.sujeira[self.y[limparam], self.x[limparam]] = 0
+            if np.any(self.conhecida[self.y[limparam], self.x[limparam]]):
+                self.conhecida[self.y[limparam], self.x[limparam]] = 0
+                self._distancias = None
+            sucesso[limparam] = True
+
+        self.ativo &= self.bateria > 0
+        self.passos += 1
+        return sucesso
+
+    def executar(self, politica, max_passos, rng=None):
+        """Roda a política até todos pararem ou acabar o orçamento de passos"""
+        rng = rng if rng is not None else np.random.default_rng()
+        while self.passos < max_passos and self.ativo.any():
+            self.step(politica(self, rng))
+        return self.pontuacao
+
+
+def _transformada_1d(campo, eixo):
+    """``min_j campo[j] + |i - j|`` ao longo de ``eixo``, em duas varreduras acumuladas"""
+    forma = [1, 1]
+    forma[eixo] = campo.shape[eixo]
+    i = np.arange(campo.shape[eixo], dtype=np.int32).reshape(forma)
+    frente = np.minimum.accumulate(campo - i, axis=eixo) + i
+    invertido = np.flip(campo + i, axis=eixo)
+    tras = np.flip(np.minimum.accumulate(invertido, axis=eixo), axis=eixo) - i
+    return np.minimum(frente, tras)
+
+
+def main(argv=None):
+    """Linha de comando: mede passos por segundo do enxame"""
+    parser = argparse.ArgumentParser(description="Enxame de robôs aspiradores num único mapa")
+    parser.add_argument("--robos", type=int, default=10000)
+    parser.add_argument("--politica", choices=list(POLITICAS), default="gulosa")
+    parser.add_argument("--passos", type=int, default=100)
+    parser.add_argument("--bateria", type=int, default=BATERIA_INICIAL)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--largura", type=int, default=1000)
+    parser.add_argument("--altura", type=int, default=1000)
+    parser.add_argument("--centro", action="store_true",
+                        help="todos começam na posição inicial dos agentes em vez de espalhados")
+    args = parser.parse_args(argv)
+
+    enxame = Enxame.gerar(args.robos, args.largura, args.altura, args.semente, args.bateria,
+                          espalhados=not args.centro)
+    rng = np.random.default_rng(args.semente)
+
+    inicio = time.perf_counter()
+    pontuacao = enxame.executar(POLITICAS[args.politica], args.passos, rng)
+    duracao = time.perf_counter() - inicio
+
+    print(f"{enxame.passos} passos com {enxame.robos} robôs em {duracao:.3f}s "
+          f"({enxame.passos / max(duracao, 1e-9):.1f} passos/s, "
+          f"{enxame.passos_robo / max(duracao, 1e-9):,.0f} passos de robô/s)")
+    print(f"Memória por robô: {enxame.bytes_por_robo()} bytes")
+    print(f"Pontuação total: {int(pontuacao.sum())} (média {pontuacao.mean():.2f})")
+
+
+if __name__ == "__main__":
+    main()
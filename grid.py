@@ -0,0 +1,154 @@
+import numpy as np
+
+from indice_sujeira import IndiceSujeira
+
+
+class Grid:
+    """Mundo do robô aspirador guardado em arrays NumPy.
+
+    ``sujeira`` (uint8) guarda o valor da sujeira de cada casa e
+    ``obstaculos`` (bool) é a máscara de obstáculos. Os índices seguem a
+    convenção do grid antigo: ``[y, x]``.
+
+    As buscas de sujeira por agente usam um ``IndiceSujeira`` criado na
+    primeira consulta e mantido por ``definir`` e ``limpar``; por isso as
+    mudanças de sujeira devem passar por esses métodos.
+    """
+
+    __slots__ = ("sujeira", "obstaculos", "_indice")
+
+    def __init__(self, largura, altura):
+        self.sujeira = np.zeros((altura, largura), dtype=np.uint8)
+        self.obstaculos = np.zeros((altura, largura), dtype=bool)
+        self._indice = None
+
+    @classmethod
+    def de_arrays(cls, sujeira, obstaculos):
+        """Usa os arrays recebidos sem copiar (podem ser ``np.memmap`` somente leitura)"""
+        grid = cls.__new__(cls)
+        grid.sujeira = sujeira
+        grid.obstaculos = obstaculos
+        grid._indice = None
+        return grid
+
+    @classmethod
+    def de_listas(cls, linhas, obstacles=()):
+        """Cria o grid a partir do formato antigo (lista de listas, -1 = obstáculo)"""
+        grid = cls(len(linhas[0]), len(linhas))
+        valores = np.array(linhas, dtype=np.int16)
+        grid.obstaculos[valores < 0] = True
+        grid.sujeira[valores > 0] = valores[valores > 0]
+        for x, y in obstacles:
+            grid.obstaculos[y, x] = True
+        return grid
+
+    def para_listas(self):
+        """Converte para o formato antigo (lista de listas, -1 = obstáculo)"""
+        valores = self.sujeira.astype(np.int16)
+        valores[self.obstaculos] = -1
+        return valores.tolist()
+
+    def copiar(self):
+        """Cópia independente e alterável do grid (também de um grid mapeado em arquivo)"""
+        return Grid.de_arrays(np.array(self.sujeira), np.array(self.obstaculos))
+
+    @property
+    def largura(self):
+        return self.sujeira.shape[1]
+
+    @property
+    def altura(self):
+        return self.sujeira.shape[0]
+
+    # Acesso a uma casa
+
+    def dentro(self, x, y):
+        return 0 <= x < self.sujeira.shape[1] and 0 <= y < self.sujeira.shape[0]
+
+    def eh_obstaculo(self, x, y):
+        return self.obstaculos.item(y, x)
+
+    def livre(self, x, y):
+        """Casa dentro do mapa e sem obstáculo"""
+        return self.dentro(x, y) and not self.obstaculos.item(y, x)
+
+    def valor(self, x, y):
+        """Valor da casa como no grid antigo: -1 obstáculo, 0 limpa, >0 sujeira"""
+        if self.obstaculos.item(y, x):
+            return -1
+        return self.sujeira.item(y, x)
+
+    def definir(self, x, y, valor):
+        """Grava um valor no formato antigo (-1 marca obstáculo)"""
+        if valor < 0:
+            self.obstaculos[y, x] = True
+            self.sujeira[y, x] = 0
+        else:
+            self.obstaculos[y, x] = False
+            self.sujeira[y, x] = valor
+        if self._indice is not None:
+            self._indice.atualizar(x, y, valor)
+
+    def limpar(self, x, y):
+        """Remove a sujeira da casa e retorna o valor que havia nela"""
+        valor = self.sujeira.item(y, x)
+        self.sujeira[y, x] = 0
+        if self._indice is not None:
+            self._indice.atualizar(x, y, 0)
+        return valor
+
+    def definir_sujeira(self, valores):
+        """Substitui toda a sujeira do grid (o índice é refeito na próxima consulta)"""
+        np.copyto(self.sujeira, valores)
+        self._indice = None
+
+    @property
+    def indice(self):
+        """Índice incremental das sujeiras (criado na primeira consulta)"""
+        if self._indice is None:
+            self._indice = IndiceSujeira.de_array(self.sujeira)
+        return self._indice
+
+    # Consultas vetorizadas
+
+    def sujeiras(self):
+        """Todas as casas sujas: arrays (xs, ys, valores) em ordem de linha"""
+        ys, xs = np.nonzero(self.sujeira)
+        return xs, ys, self.sujeira[ys, xs]
+
+    def total_sujeira(self):
+        """Soma dos valores de sujeira restantes"""
+        return int(self.sujeira.sum(dtype=np.int64))
+
+    def sujeira_mais_proxima(self, x, y, ignorar=None):
+        """Sujeira mais próxima pela distância de Manhattan.
+
+        Retorna ``(x, y, valor, distancia)`` ou None. Empates ficam com a
+        primeira casa em ordem de linha, como na busca antiga. Casas em
+        ``ignorar`` não são consideradas.
+        """
+        return self.indice.mais_proxima(x, y, ignorar)
+
+    def sujeira_mais_valiosa(self, x, y, ignorar=None):
+        """Sujeira de maior valor: ``(x, y, valor, distancia)`` ou None"""
+        return self.indice.mais_valiosa(x, y, ignorar)
+
+    def sujeira_de_maior_utilidade(self, x, y, bateria, ignorar=None):
+        """Maior ``valor / (distancia + 2)`` que a bateria alcança.
+
+        Retorna ``(x, y, utilidade, distancia)`` ou None.
+        """
+        return self.indice.melhor_utilidade(x, y, bateria, ignorar=ignorar)
+
+    def celulas_no_raio(self, x, y, r):
+        """Casas livres a até ``r`` passos (Manhattan) de (x, y): arrays (xs, ys)"""
+        x0, x1 = max(0, x - r), min(self.largura, x + r + 1)
+        y0, y1 = max(0, y - r), min(self.altura, y + r + 1)
+        ys, xs = np.mgrid[y0:y1, x0:x1]
+        dentro = (np.abs(xs - x) + np.abs(ys - y) <= r) & ~self.obstaculos[y0:y1, x0:x1]
+        return xs[dentro], ys[dentro]
+
+    def lista_obstaculos(self):
+        """Obstáculos como lista de tuplas (x, y)"""
+        ys, xs = np.nonzero(self.obstaculos)
+        return list(zip(xs.tolist(), ys.tolist()))
@@ -0,0 +1,174 @@
+"""Histórico de simulações persistido em SQLite.
+
+Cada simulação guarda data, hash do mapa, dimensões, semente e passos, e
+cada agente dela vira uma linha em ``resultados``. As médias por agente
+ficam na tabela ``estatisticas``, mantida por gatilhos a cada resultado
+inserido, então a tela de histórico não precisa percorrer os resultados.
+
+As simulações só são apagadas todas de uma vez (``limpar``), por isso os
+ids são contíguos: a simulação na posição ``i`` a partir da mais recente
+tem id ``max(id) - i``, e uma página é uma busca por intervalo de ids em
+vez de um ``OFFSET`` que percorreria as linhas anteriores.
+"""
+import hashlib
+import os
+import sqlite3
+from array import array
+
+import numpy as np
+
+CAMINHO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "historico.db")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS simulacoes (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    hash_mapa TEXT,
+    largura INTEGER,
+    altura INTEGER,
+    semente INTEGER,
+    passos INTEGER,
+    n_agentes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    simulacao_id INTEGER NOT NULL REFERENCES simulacoes(id),
+    agente TEXT NOT NULL,
+    pontuacao INTEGER NOT NULL,
+    bateria INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resultados_simulacao ON resultados(simulacao_id);
+CREATE INDEX IF NOT EXISTS resultados_agente ON resultados(agente, pontuacao);
+CREATE INDEX IF NOT EXISTS simulacoes_mapa ON simulacoes(hash_mapa);
+CREATE TABLE IF NOT EXISTS estatisticas (
+    agente TEXT PRIMARY KEY,
+    simulacoes INTEGER NOT NULL,
+    total_pontos INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS resultados_estatisticas AFTER INSERT ON resultados BEGIN
+    INSERT INTO estatisticas (agente, simulacoes, total_pontos) VALUES (NEW.agente, 1, NEW.pontuacao)
+    ON CONFLICT (agente) DO UPDATE SET simulacoes = simulacoes + 1,
+                                       total_pontos = total_pontos + NEW.pontuacao;
+END;
+"""
+
+
+def hash_mapa(grid):
+    """Identificador curto do mapa (dimensões, sujeira e obstáculos)"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(np.array(grid.sujeira.shape, dtype=np.uint32).tobytes())
+    h.update(grid.sujeira.tobytes())
+    h.update(np.packbits(grid.obstaculos, axis=None).tobytes())
+    return h.hexdigest()
+
+
+def descrever_mapa(grid):
+    """``(hash_mapa, largura, altura)`` do grid, o que o histórico guarda do mapa"""
+    return hash_mapa(grid), grid.largura, grid.altura
+
+
+class Historico:
+    """Histórico de simulações num banco SQLite"""
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode = WAL")
+        self.conexao.execute("PRAGMA synchronous = NORMAL")
+        self.conexao.executescript(_ESQUEMA)
+        # Agentes por simulação em ordem de id, carregado na primeira consulta
+        self._n_agentes = None
+
+    def fechar(self):
+        self.conexao.close()
+
+    # Escrita
+
+    def registrar(self, resultado, grid=None, semente=None):
+        """Grava uma simulação no formato de ``montar_resultado`` e retorna o id"""
+        with self.conexao:
+            return self._inserir(resultado, descrever_mapa(grid) if grid is not None else None, semente)
+
+    def registrar_lote(self, registros):
+        """Grava vários ``(resultado, descrever_mapa(grid), semente)`` numa única transação.
+
+        O lote guarda só a descrição do mapa, não o grid, para não manter
+        mapas grandes vivos até a gravação.
+        """
+        with self.conexao:
+            for resultado, mapa, semente in registros:
+                self._inserir(resultado, mapa, semente)
+
+    def _inserir(self, resultado, mapa, semente):
+        hash_, largura, altura = mapa if mapa is not None else (None, None, None)
+        cursor = self.conexao.execute(
+            "INSERT INTO simulacoes (timestamp, hash_mapa, largura, altura, semente, passos, n_agentes)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (resultado['timestamp'],
+             hash_,
+             largura,
+             altura,
+             semente,
+             resultado.get('passos'),
+             len(resultado['resultados'])))
+        simulacao_id = cursor.lastrowid
+        if self._n_agentes is not None:
+            self._n_agentes.append(len(resultado['resultados']))
+        self.conexao.executemany(
+            "INSERT INTO resultados (simulacao_id, agente, pontuacao, bateria) VALUES (?, ?, ?, ?)",
+            [(simulacao_id, r['nome'], r['pontuacao'], r['bateria']) for r in resultado['resultados']])
+        return simulacao_id
+
+    def limpar(self):
+        with self.conexao:
+            self.conexao.execute("DELETE FROM resultados")
+            self.conexao.execute("DELETE FROM simulacoes")
+            self.conexao.execute("DELETE FROM estatisticas")
+        self._n_agentes = array("H")
+
+    # Consultas
+
+    def __len__(self):
+        """Número de simulações (ids são contíguos a partir de 1)"""
+        return self.conexao.execute("SELECT COALESCE(MAX(id), 0) FROM simulacoes").fetchone()[0]
+
+    def estatisticas(self):
+        """Lista de ``(agente, simulacoes, media)`` do maior total de pontos para o menor"""
+        linhas = self.conexao.execute(
+            "SELECT agente, simulacoes, total_pontos FROM estatisticas ORDER BY total_pontos DESC")
+        return [(agente, simulacoes, total / simulacoes) for agente, simulacoes, total in linhas]
+
+    def n_agentes(self):
+        """Array com o número de agentes de cada simulação, da mais antiga para a mais recente.
+
+        Fica em memória e cresce a cada ``registrar``; só é relido do banco
+        se outro processo tiver gravado simulações nesse meio tempo.
+        """
+        if self._n_agentes is None or len(self._n_agentes) != len(self):
+            linhas = self.conexao.execute("SELECT n_agentes FROM simulacoes ORDER BY id")
+            self._n_agentes = array("H", (n for n, in linhas))
+        # Cópia: uma view impediria o array de crescer
+        return np.frombuffer(self._n_agentes, dtype=np.uint16).copy()
+
+    def pagina(self, inicio, limite):
+        """Simulações da posição ``inicio`` em diante, da mais recente para a mais antiga.
+
+        Cada uma é um dicionário com ``id``, ``timestamp`` e ``resultados``,
+        como os de ``montar_resultado``.
+        """
+        ultimo = len(self) - inicio
+        primeiro = max(1, ultimo - limite + 1)
+        if ultimo < 1:
+            return []
+        simulacoes = {}
+        linhas = self.conexao.execute(
+            "SELECT s.id, s.timestamp, r.agente, r.pontuacao, r.bateria"
+            " FROM simulacoes s LEFT JOIN resultados r ON r.simulacao_id = s.id"
+            " WHERE s.id BETWEEN ? AND ? ORDER BY s.id DESC, r.rowid", (primeiro, ultimo))
+        for simulacao_id, timestamp, agente, pontuacao, bateria in linhas:
+            simulacao = simulacoes.get(simulacao_id)
+            if simulacao is None:
+                simulacao = simulacoes[simulacao_id] = {
+                    'id': simulacao_id, 'timestamp': timestamp, 'resultados': []}
+            if agente is not None:
+                simulacao['resultados'].append({'nome': agente, 'pontuacao': pontuacao, 'bateria': bateria})
+        return list(simulacoes.values())
@@ -0,0 +1,212 @@
+"""Índice de sujeiras mantido incrementalmente.
+
+As sujeiras ficam em baldes espaciais (blocos de ``TAMANHO_BALDE`` casas
+de lado), separados por valor. A busca pela mais próxima percorre anéis
+de baldes a partir da posição do agente, só com baldes dentro do mapa, e
+para assim que nenhum anel mais distante pode ter algo melhor ou todas as
+casas do valor já foram vistas (mesmo que todas estejam em ``ignorar``),
+então o custo não cresce com a área do mapa. Para o maior valor há um heap por valor com remoção preguiçosa.
+
+Os empates seguem a ordem de linha (menor y, depois menor x), a mesma da
+varredura completa que o índice substitui. As buscas aceitam ``ignorar``,
+um contêiner de casas (x, y) que não podem ser escolhidas (as sujeiras
+reivindicadas por outros agentes, veja ``piso.py``).
+"""
+import heapq
+
+import numpy as np
+
+TAMANHO_BALDE = 8
+
+
+class _BaldesValor:
+    """Casas com um mesmo valor de sujeira, agrupadas em baldes"""
+
+    __slots__ = ("tamanho", "baldes_x", "baldes_y", "baldes", "heap", "quantidade")
+
+    def __init__(self, tamanho, baldes_x, baldes_y):
+        self.tamanho = tamanho
+        # Baldes por linha e por coluna do mapa
+        self.baldes_x = baldes_x
+        self.baldes_y = baldes_y
+        self.baldes = {}
+        # (y, x) em ordem de linha; entradas já removidas são descartadas no topo
+        self.heap = []
+        self.quantidade = 0
+
+    def adicionar(self, x, y):
+        chave = (x // self.tamanho, y // self.tamanho)
+        balde = self.baldes.get(chave)
+        if balde is None:
+            balde = self.baldes[chave] = set()
+        balde.add((x, y))
+        heapq.heappush(self.heap, (y, x))
+        self.quantidade += 1
+
+    def remover(self, x, y):
+        chave = (x // self.tamanho, y // self.tamanho)
+        balde = self.baldes[chave]
+        balde.discard((x, y))
+        if not balde:
+            del self.baldes[chave]
+        self.quantidade -= 1
+
+    def contem(self, x, y):
+        balde = self.baldes.get((x // self.tamanho, y // self.tamanho))
+        return balde is not None and (x, y) in balde
+
+    def primeira(self, ignorar=None):
+        """Primeira casa em ordem de linha fora de ``ignorar``, ou None"""
+        heap = self.heap
+        puladas = []
+        casa = None
+        while heap:
+            y, x = heap[0]
+            if not self.contem(x, y):
+                heapq.heappop(heap)
+            elif ignorar is not None and (x, y) in ignorar:
+                puladas.append(heapq.heappop(heap))
+            else:
+                casa = x, y
+                break
+        for entrada in puladas:
+            heapq.heappush(heap, entrada)
+        return casa
+
+    def mais_proxima(self, x, y, ignorar=None):
+        """(distância, y, x) da casa mais próxima fora de ``ignorar``, ou None"""
+        if not self.quantidade:
+            return None
+        t = self.tamanho
+        bx, by = x // t, y // t
+        melhor = None
+        vistas = 0
+        # Anel a partir do qual todos os baldes estão fora do mapa
+        fim = max(bx + 1, self.baldes_x - bx, by + 1, self.baldes_y - by)
+        for anel in range(fim):
+            # Nenhuma casa de um anel pode estar a menos que este limite
+            if melhor is not None and anel > 0 and (anel - 1) * t + 1 > melhor[0]:
+                break
+            # Todas as casas do valor já foram olhadas
+            if vistas >= self.quantidade:
+                break
+            for chave in _anel(bx, by, anel, self.baldes_x, self.baldes_y):
+                balde = self.baldes.get(chave)
+                if not balde:
+                    continue
+                vistas += len(balde)
+                for cx, cy in balde:
+                    if ignorar is not None and (cx, cy) in ignorar:
+                        continue
+                    candidato = (abs(cx - x) + abs(cy - y), cy, cx)
+                    if melhor is None or candidato < melhor:
+                        melhor = candidato
+        return melhor
+
+
+def _anel(bx, by, anel, baldes_x, baldes_y):
+    """Baldes à distância de Chebyshev ``anel`` de (bx, by) dentro de ``baldes_x`` x ``baldes_y``"""
+    if anel == 0:
+        yield bx, by
+        return
+    x0, x1 = max(bx - anel, 0), min(bx + anel, baldes_x - 1)
+    y0, y1 = max(by - anel + 1, 0), min(by + anel - 1, baldes_y - 1)
+    # Lados de cima e de baixo, com os cantos
+    for y in (by - anel, by + anel):
+        if 0 <= y < baldes_y:
+            for x in range(x0, x1 + 1):
+                yield x, y
+    # Lados esquerdo e direito, sem os cantos
+    for x in (bx - anel, bx + anel):
+        if 0 <= x < baldes_x:
+            for y in range(y0, y1 + 1):
+                yield x, y
+
+
+class IndiceSujeira:
+    """Índice das casas sujas de um grid, atualizado a cada mudança"""
+
+    __slots__ = ("tamanho_balde", "baldes_x", "baldes_y", "valores", "por_valor")
+
+    def __init__(self, largura, altura, tamanho_balde=TAMANHO_BALDE):
+        self.tamanho_balde = tamanho_balde
+        self.baldes_x = -(-largura // tamanho_balde)
+        self.baldes_y = -(-altura // tamanho_balde)
+        self.valores = {}
+        self.por_valor = {}
+
+    @classmethod
+    def de_array(cls, sujeira, tamanho_balde=TAMANHO_BALDE):
+        """Constrói o índice a partir do array de sujeira (altura, largura)"""
+        indice = cls(sujeira.shape[1], sujeira.shape[0], tamanho_balde)
+        ys, xs = np.nonzero(sujeira)
+        for x, y, valor in zip(xs.tolist(), ys.tolist(), sujeira[ys, xs].tolist()):
+            indice.atualizar(x, y, valor)
+        return indice
+
+    def __len__(self):
+        return len(self.valores)
+
+    def total(self):
+        return sum(self.valores.values())
+
+    def atualizar(self, x, y, valor):
+        """Registra o novo valor da casa (0 ou negativo remove do índice)"""
+        anterior = self.valores.get((x, y), 0)
+        if valor == anterior or (valor <= 0 and anterior == 0):
+            return
+        if anterior:
+            self.por_valor[anterior].remover(x, y)
+            del self.valores[(x, y)]
+        if valor > 0:
+            baldes = self.por_valor.get(valor)
+            if baldes is None:
+                baldes = _BaldesValor(self.tamanho_balde, self.baldes_x, self.baldes_y)
+                self.por_valor[valor] = baldes
+            baldes.adicionar(x, y)
+            self.valores[(x, y)] = valor
+
+    def mais_proxima(self, x, y, ignorar=None):
+        """Sujeira mais próxima: ``(x, y, valor, distancia)`` ou None"""
+        melhor = None
+        melhor_valor = None
+        for valor, baldes in self.por_valor.items():
+            candidato = baldes.mais_proxima(x, y, ignorar)
+            if candidato is not None and (melhor is None or candidato < melhor):
+                melhor, melhor_valor = candidato, valor
+        if melhor is None:
+            return None
+        distancia, cy, cx = melhor
+        return cx, cy, melhor_valor, distancia
+
+    def mais_valiosa(self, x, y, ignorar=None):
+        """Sujeira de maior valor: ``(x, y, valor, distancia)`` ou None"""
+        for valor in sorted(self.por_valor, reverse=True):
+            casa = self.por_valor[valor].primeira(ignorar)
+            if casa is not None:
+                cx, cy = casa
+                return cx, cy, valor, abs(cx - x) + abs(cy - y)
+        return None
+
+    def melhor_utilidade(self, x, y, bateria, reserva=2, ignorar=None):
+        """Maior ``valor / (distancia + 2)`` entre as sujeiras alcançáveis.
+
+        Alcançável quer dizer ``bateria >= distancia + reserva``. Retorna
+        ``(x, y, utilidade, distancia)`` ou None. Para cada valor, a melhor
+        candidata é a mais próxima, então basta uma busca por valor.
+        """
+        melhor = None
+        for valor, baldes in self.por_valor.items():
+            candidato = baldes.mais_proxima(x, y, ignorar)
+            if candidato is None:
+                continue
+            distancia, cy, cx = candidato
+            if bateria < distancia + reserva:
+                continue
+            chave = (-(valor / (distancia + 2)), cy, cx, distancia)
+            if melhor is None or chave < melhor:
+                melhor = chave
+        if melhor is None:
+            return None
+        utilidade, cy, cx, distancia = melhor
+        return cx, cy, -utilidade, distancia
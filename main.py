@@ -1,57 +1,36 @@
+import sys
+from collections import OrderedDict
+from time import perf_counter_ns
+
+import numpy as np
 import pygame
-import random
-import simpy
 import constantes
-from datetime import datetime
 
-from agents.simple_agent import SimpleAgent
-from agents.model_based_agent import ModelBasedAgent
-from agents.goal_based_agent import GoalBasedAgent
-from agents.utility_based_agent import UtilityBasedAgent
-from agents.agente_bdi import AgenteBDI
+from ambiente import gerar_ambiente, copiar_grid, posicao_inicial
+from agendador import Agendador
+from historico import Historico
+from mapas import carregar_mapa
+from perfil import perfil
+from simulacao import AGENDA_VAZIA, AGENTES, PASSOS_PADRAO, criar_agentes, criar_ambiente, montar_resultado
+from rastreamento import INFO, rastro
+from renderizacao import Renderizador, fonte, texto
 
-# Histórico global de simulações
-historico_simulacoes = []
+# Histórico de simulações (banco SQLite aberto em main)
+historico = None
 
-def gerar_ambiente():
-    """Gera o ambiente 5x5 com sujeiras e obstáculos"""
-    grid = [[0 for _ in range(5)] for _ in range(5)]
-    obstacles = []
-    
-    # Gera obstáculos (3-5 móveis)
-    # num_obstacles = random.randint(3, 4)
-    num_obstacles = 3
-    for _ in range(num_obstacles):
-        while True:
-            x = random.randint(0, 4)
-            y = random.randint(0, 4)
-            # Não coloca obstáculos nas bordas para facilitar movimento
-            if (x, y) not in obstacles and (x != 2 or y != 2):
-                obstacles.append((x, y))
-                grid[y][x] = -1
-                break
-   
+# Simulações buscadas no banco de cada vez pela tela de histórico
+SIMULACOES_POR_PAGINA = 50
 
-    # Gera sujeiras (8-12 no total)
-    tipos_sujeira = [1, 2, 3]  # Mais poeira, menos detritos
-    total_sujeiras = random.randint(8, 12)
-    
-    for _ in range(total_sujeiras):
-        while True:
-            x = random.randint(0, 4)
-            y = random.randint(0, 4)
-            if grid[y][x] == 0 and (x, y) not in obstacles:
-                grid[y][x] = random.choice(tipos_sujeira)
-                break
-    # grid[2][3] = 3
-    # grid[3][2] = 2
-    return grid, obstacles
+# Perfil por fase (tecla P): arquivo gravado ao fim de cada simulação e
+# intervalo, em segundos, entre atualizações da sobreposição
+CAMINHO_PERFIL = "perfil.json"
+ATUALIZACAO_PERFIL = 0.25
 
 def mostrar_tela_selecao_agente(tela):
     """Tela de seleção de agente"""
-    fonte_titulo = pygame.font.SysFont("times", 32)
-    fonte_botao = pygame.font.SysFont("arial", 18)
-    fonte_info = pygame.font.SysFont("arial", 14)
+    fonte_titulo = fonte(32, nome="times")
+    fonte_botao = fonte(18)
+    fonte_info = fonte(14)
     
     titulo = fonte_titulo.render("Selecione o Agente para Simulação", True, (255, 255, 255))
     
@@ -90,7 +69,7 @@ def mostrar_tela_selecao_agente(tela):
             pygame.draw.circle(tela, (0, 0, 0), (rect.x + 30, rect.centery), 15, 2)
             
             # Letra do agente
-            fonte_letra = pygame.font.SysFont("arial", 12, bold=True)
+            fonte_letra = fonte(12, bold=True)
             texto_letra = fonte_letra.render(agente["letra"], True, (255, 255, 255))
             tela.blit(texto_letra, (rect.x + 30 - texto_letra.get_width()//2, rect.centery - texto_letra.get_height()//2))
             
@@ -112,101 +91,158 @@ def mostrar_tela_selecao_agente(tela):
     
     return selecionado
 
+class ListaHistorico:
+    """Lista virtualizada das simulações da tela de histórico.
+
+    As posições verticais de todas as simulações são calculadas uma vez, a
+    partir do número de agentes de cada uma; a cada quadro só as
+    simulações visíveis são buscadas no banco (em páginas) e desenhadas, a
+    partir de superfícies renderizadas uma única vez.
+    """
+    
+    ALTURA_CABECALHO_SIM = 40
+    ALTURA_RESULTADO = 26
+    ESPACO_ENTRE_SIMS = 12
+    MAX_SUPERFICIES = 256
+    MAX_PAGINAS = 16
+    
+    def __init__(self, historico):
+        self.historico = historico
+        self.total = len(historico)
+        self.cabecalho = self._desenhar_estatisticas(historico.estatisticas())
+        
+        # Alturas das simulações da mais recente para a mais antiga
+        n_agentes = historico.n_agentes()[::-1].astype(np.int64)
+        alturas = self.ALTURA_CABECALHO_SIM + self.ALTURA_RESULTADO * n_agentes + self.ESPACO_ENTRE_SIMS
+        self.inicios = np.empty(self.total + 1, dtype=np.int64)
+        self.inicios[0] = self.cabecalho.get_height()
+        np.cumsum(alturas, out=self.inicios[1:])
+        self.inicios[1:] += self.cabecalho.get_height()
+        self.altura_total = int(self.inicios[-1])
+        
+        self.superficies = OrderedDict()
+        self.paginas = OrderedDict()
+    
+    def _desenhar_estatisticas(self, estatisticas):
+        """Estatísticas gerais e título da lista numa única superfície"""
+        fonte_secao = fonte(20, bold=True)
+        fonte_texto = fonte(18)
+        superficie = pygame.Surface((760, 35 + 28 * len(estatisticas) + 25 + 35))
+        superficie.fill((40, 40, 60))
+        superficie.blit(fonte_secao.render("=== ESTATÍSTICAS GERAIS ===", True, (255, 255, 100)), (10, 0))
+        y_pos = 35
+        for nome, n_simulacoes, media in estatisticas:
+            linha = fonte_texto.render(
+                f"{nome}: {n_simulacoes} simulações | Média: {media:.1f} pts",
+                True, (200, 255, 200)
+            )
+            superficie.blit(linha, (30, y_pos))
+            y_pos += 28
+        y_pos += 25
+        superficie.blit(fonte_secao.render("=== SIMULAÇÕES INDIVIDUAIS ===", True, (255, 255, 100)), (10, y_pos))
+        return superficie
+    
+    def simulacao(self, i):
+        """i-ésima simulação a partir da mais recente (busca a página dela no banco)"""
+        numero = i // SIMULACOES_POR_PAGINA
+        pagina = self.paginas.get(numero)
+        if pagina is None:
+            pagina = self.paginas[numero] = self.historico.pagina(numero * SIMULACOES_POR_PAGINA,
+                                                                  SIMULACOES_POR_PAGINA)
+            if len(self.paginas) > self.MAX_PAGINAS:
+                self.paginas.popitem(last=False)
+        else:
+            self.paginas.move_to_end(numero)
+        return pagina[i % SIMULACOES_POR_PAGINA]
+    
+    def superficie(self, i):
+        """Bloco da i-ésima simulação, renderizado só na primeira vez que aparece"""
+        superficie = self.superficies.get(i)
+        if superficie is not None:
+            self.superficies.move_to_end(i)
+            return superficie
+        
+        sim = self.simulacao(i)
+        altura = int(self.inicios[i + 1] - self.inicios[i])
+        superficie = pygame.Surface((760, altura))
+        superficie.fill((40, 40, 60))
+        
+        # Cabeçalho da simulação
+        pygame.draw.rect(superficie, (60, 60, 90), (0, 0, 760, 35))
+        titulo = fonte(17, bold=True).render(
+            f"Simulação #{sim['id']} - {sim['timestamp']}",
+            True, (255, 255, 255)
+        )
+        superficie.blit(titulo, (10, 8))
+        
+        # Resultados dos agentes
+        fonte_texto = fonte(18)
+        y_pos = self.ALTURA_CABECALHO_SIM
+        for resultado in sim['resultados']:
+            linha = fonte_texto.render(
+                f"   {resultado['nome']}: {resultado['pontuacao']} pts (Bateria: {resultado['bateria']})",
+                True, (200, 200, 200)
+            )
+            superficie.blit(linha, (30, y_pos))
+            y_pos += self.ALTURA_RESULTADO
+        
+        self.superficies[i] = superficie
+        if len(self.superficies) > self.MAX_SUPERFICIES:
+            self.superficies.popitem(last=False)
+        return superficie
+    
+    def desenhar(self, tela, area, scroll_offset):
+        """Desenha a parte da lista que aparece em ``area`` (um pygame.Rect)"""
+        tela.set_clip(area)
+        if scroll_offset < self.cabecalho.get_height():
+            tela.blit(self.cabecalho, (area.x, area.y - scroll_offset))
+        
+        # Primeira simulação visível por busca binária nas posições
+        i = max(0, int(np.searchsorted(self.inicios, scroll_offset, side="right")) - 1)
+        fim = scroll_offset + area.height
+        while i < self.total and self.inicios[i] < fim:
+            tela.blit(self.superficie(i), (area.x, area.y + int(self.inicios[i]) - scroll_offset))
+            i += 1
+        tela.set_clip(None)
+
 def mostrar_historico(tela):
     """Mostra o histórico de todas as simulações"""
-    fonte_titulo = pygame.font.SysFont("arial", 32, bold=True)
-    fonte_texto = pygame.font.SysFont("arial", 18)
-    fonte_botao = pygame.font.SysFont("arial", 20)
+    relogio = pygame.time.Clock()
     
     botao_voltar = pygame.Rect(constantes.WINDOW_WIDTH // 2 - 100, constantes.WINDOW_HEIGHT - 80, 200, 50)
     botao_limpar = pygame.Rect(20, constantes.WINDOW_HEIGHT - 80, 150, 50)
     
+    # Área visível da lista (entre título e botões) e barra de rolagem
+    area = pygame.Rect(20, 70, 760, constantes.WINDOW_HEIGHT - 170)
+    trilho = pygame.Rect(constantes.WINDOW_WIDTH - 30, area.y, 12, area.height)
+    arrastando = False
+    
+    lista = ListaHistorico(historico)
     scroll_offset = 0
-    max_scroll = 0
     
     esperando = True
     while esperando:
+        max_scroll = max(0, lista.altura_total - area.height)
+        scroll_offset = max(0, min(scroll_offset, max_scroll))
         tela.fill((40, 40, 60))
         
         # Título
-        titulo = fonte_titulo.render(f"Histórico de Simulações ({len(historico_simulacoes)} total)", True, (255, 255, 255))
+        titulo = texto(f"Histórico de Simulações ({lista.total} total)", 32, (255, 255, 255), bold=True)
         tela.blit(titulo, (constantes.WINDOW_WIDTH // 2 - titulo.get_width() // 2, 20))
         
-        if not historico_simulacoes:
-            texto = fonte_texto.render("Nenhuma simulação realizada ainda", True, (200, 200, 200))
-            tela.blit(texto, (constantes.WINDOW_WIDTH // 2 - texto.get_width() // 2, 200))
+        if not lista.total:
+            aviso = texto("Nenhuma simulação realizada ainda", 18, (200, 200, 200))
+            tela.blit(aviso, (constantes.WINDOW_WIDTH // 2 - aviso.get_width() // 2, 200))
         else:
-            # Define área visível (entre título e botões)
-            area_topo = 70  # Abaixo do título
-            area_fundo = constantes.WINDOW_HEIGHT - 100  # Acima dos botões
-            
-            # Área de scroll
-            y_pos = area_topo - scroll_offset
-            
-            # Calcula estatísticas gerais
-            stats_por_agente = {}
-            for sim in historico_simulacoes:
-                for resultado in sim['resultados']:
-                    nome = resultado['nome']
-                    if nome not in stats_por_agente:
-                        stats_por_agente[nome] = {'total_pontos': 0, 'simulacoes': 0}
-                    stats_por_agente[nome]['total_pontos'] += resultado['pontuacao']
-                    stats_por_agente[nome]['simulacoes'] += 1
-                    
-            
-            # Mostra estatísticas gerais (só se estiver visível)
-            fonte_secao = pygame.font.SysFont("arial", 20, bold=True)
-            texto = fonte_secao.render("=== ESTATÍSTICAS GERAIS ===", True, (255, 255, 100))
-            if area_topo <= y_pos <= area_fundo:
-                tela.blit(texto, (30, y_pos))
-            y_pos += 35
-            
-            for nome, stats in sorted(stats_por_agente.items(), key=lambda x: x[1]['total_pontos'], reverse=True):
-                media = stats['total_pontos'] / stats['simulacoes']
+            lista.desenhar(tela, area, scroll_offset)
             
-                texto = fonte_texto.render(
-                    f"{nome}: {stats['simulacoes']} simulações | Média: {media:.1f} pts",
-                    True, (200, 255, 200)
-                )
-                if area_topo <= y_pos <= area_fundo:
-                    tela.blit(texto, (50, y_pos))
-                y_pos += 28
-            
-            y_pos += 25
-            
-            # Lista simulações individuais
-            texto = fonte_secao.render("=== SIMULAÇÕES INDIVIDUAIS ===", True, (255, 255, 100))
-            if area_topo <= y_pos <= area_fundo:
-                tela.blit(texto, (30, y_pos))
-            y_pos += 35
-            
-            for i, sim in enumerate(reversed(historico_simulacoes)):
-                # Cabeçalho da simulação
-                if area_topo - 35 <= y_pos <= area_fundo:
-                    pygame.draw.rect(tela, (60, 60, 90), (20, y_pos, 760, 35))
-                    fonte_sim = pygame.font.SysFont("arial", 17, bold=True)
-                    texto = fonte_sim.render(
-                        f"Simulação #{len(historico_simulacoes) - i} - {sim['timestamp']}",
-                        True, (255, 255, 255)
-                    )
-                    tela.blit(texto, (30, y_pos + 8))
-                y_pos += 40
-                
-                # Resultados dos agentes
-                for resultado in sim['resultados']:
-                    cor = (200, 200, 200)
-                    simbolo = "   "
-                    texto = fonte_texto.render(
-                        f"{simbolo}{resultado['nome']}: {resultado['pontuacao']} pts (Bateria: {resultado['bateria']})",
-                        True, cor
-                    )
-                    if area_topo <= y_pos <= area_fundo:
-                        tela.blit(texto, (50, y_pos))
-                    y_pos += 26
-                
-                y_pos += 12
-            
-            max_scroll = max(0, y_pos - area_fundo)
+            # Barra de rolagem proporcional à lista inteira
+            if max_scroll:
+                pygame.draw.rect(tela, (60, 60, 90), trilho, border_radius=6)
+                altura_polegar = max(20, trilho.height * area.height // lista.altura_total)
+                y_polegar = trilho.y + (trilho.height - altura_polegar) * scroll_offset // max_scroll
+                pygame.draw.rect(tela, (120, 120, 170), (trilho.x, y_polegar, trilho.width, altura_polegar),
+                                 border_radius=6)
         
         # Botões
         mouse_pos = pygame.mouse.get_pos()
@@ -214,14 +250,14 @@ def mostrar_historico(tela):
         # Botão Voltar
         cor_voltar = (90, 160, 200) if botao_voltar.collidepoint(mouse_pos) else (70, 130, 180)
         pygame.draw.rect(tela, cor_voltar, botao_voltar, border_radius=10)
-        texto_voltar = fonte_botao.render("Voltar", True, (255, 255, 255))
+        texto_voltar = texto("Voltar", 20, (255, 255, 255))
         tela.blit(texto_voltar, (botao_voltar.centerx - texto_voltar.get_width() // 2, botao_voltar.y + 15))
         
         # Botão Limpar Histórico
-        if historico_simulacoes:
+        if lista.total:
             cor_limpar = (180, 60, 60) if botao_limpar.collidepoint(mouse_pos) else (150, 50, 50)
             pygame.draw.rect(tela, cor_limpar, botao_limpar, border_radius=10)
-            texto_limpar = fonte_botao.render("Limpar", True, (255, 255, 255))
+            texto_limpar = texto("Limpar", 20, (255, 255, 255))
             tela.blit(texto_limpar, (botao_limpar.centerx - texto_limpar.get_width() // 2, botao_limpar.y + 15))
         
         pygame.display.update()
@@ -230,21 +266,42 @@ def mostrar_historico(tela):
             if evento.type == pygame.QUIT:
                 pygame.quit()
                 exit()
-            elif evento.type == pygame.MOUSEBUTTONDOWN:
+            elif evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1:
                 if botao_voltar.collidepoint(evento.pos):
                     esperando = False
-                elif botao_limpar.collidepoint(evento.pos) and historico_simulacoes:
-                    historico_simulacoes.clear()
+                elif botao_limpar.collidepoint(evento.pos) and lista.total:
+                    historico.limpar()
+                    lista = ListaHistorico(historico)
+                    scroll_offset = 0
                     print("Histórico limpo!")
+                elif trilho.inflate(10, 0).collidepoint(evento.pos):
+                    arrastando = True
+            elif evento.type == pygame.MOUSEBUTTONUP and evento.button == 1:
+                arrastando = False
             elif evento.type == pygame.MOUSEWHEEL:
                 scroll_offset -= evento.y * 20
-                scroll_offset = max(0, min(scroll_offset, max_scroll))
+            elif evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_PAGEDOWN:
+                    scroll_offset += area.height
+                elif evento.key == pygame.K_PAGEUP:
+                    scroll_offset -= area.height
+                elif evento.key == pygame.K_HOME:
+                    scroll_offset = 0
+                elif evento.key == pygame.K_END:
+                    scroll_offset = max_scroll
+            
+            # Clicar ou arrastar na barra leva direto àquela parte da lista
+            if arrastando and evento.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                fracao = (evento.pos[1] - trilho.y) / trilho.height
+                scroll_offset = int(max(0.0, min(1.0, fracao)) * max_scroll)
+        
+        relogio.tick(60)
 
 def mostrar_tela_resultado(tela, agentes, grid_atual, obstacles_atuais):
     """Tela de resultados finais"""
-    fonte_titulo = pygame.font.SysFont("arial", 32)
-    fonte_resultado = pygame.font.SysFont("arial", 24)
-    fonte_botao = pygame.font.SysFont("arial", 18)
+    fonte_titulo = fonte(32)
+    fonte_resultado = fonte(24)
+    fonte_botao = fonte(18)
     
     titulo = fonte_titulo.render("Resultados da Simulação", True, (255, 255, 255))
     
@@ -335,262 +392,168 @@ def parar_agente(agente):
     """Para um agente específico"""
     agente.parar()
 
-def desenhar_ambiente(tela, grid, obstacles, agentes):
-    """Desenha o ambiente completo"""
-    # Fundo
-    tela.fill((240, 240, 240))  # Cinza claro
-    
-    # Margem para centralizar o grid
-    margem = 10
-    
-    # Grade com sombra para profundidade
-    for x in range(5):
-        for y in range(5):
-            # Sombra
-            shadow_rect = pygame.Rect(margem + x * constantes.CELL_SIZE + 2, 
-                                     margem + y * constantes.CELL_SIZE + 2, 
-                                     constantes.CELL_SIZE, constantes.CELL_SIZE)
-            pygame.draw.rect(tela, (180, 180, 180), shadow_rect)
-            
-            # Célula principal
-            rect = pygame.Rect(margem + x * constantes.CELL_SIZE, 
-                             margem + y * constantes.CELL_SIZE, 
-                             constantes.CELL_SIZE, constantes.CELL_SIZE)
-            pygame.draw.rect(tela, (255, 255, 255), rect)
-            pygame.draw.rect(tela, (150, 150, 150), rect, 2)
-    
-    # Obstáculos com degradê
-    for x, y in obstacles:
-        rect = pygame.Rect(margem + x * constantes.CELL_SIZE, 
-                          margem + y * constantes.CELL_SIZE, 
-                          constantes.CELL_SIZE, constantes.CELL_SIZE)
-        pygame.draw.rect(tela, (80, 80, 80), rect)
-        pygame.draw.rect(tela, (50, 50, 50), rect, 3)
-    
-    # Sujeiras com estilo melhorado
-    fonte_sujeira = pygame.font.SysFont("arial", 16, bold=True)
-    for y in range(5):
-        for x in range(5):
-            if grid[y][x] > 0:
-                cor = {
-                    1: (220, 220, 220),   # Poeira - cinza claro
-                    2: (100, 150, 255),   # Líquido - azul  
-                    3: (160, 82, 45)      # Detritos - marrom
-                }.get(grid[y][x], (0, 0, 0))
-                
-                centro_x = margem + x * constantes.CELL_SIZE + constantes.CELL_SIZE // 2
-                centro_y = margem + y * constantes.CELL_SIZE + constantes.CELL_SIZE // 2
-                
-                # Sujeira com borda
-                pygame.draw.circle(tela, cor, (centro_x, centro_y), 12)
-                pygame.draw.circle(tela, (0, 0, 0), (centro_x, centro_y), 12, 2)
-                
-                # Valor da sujeira centralizado
-                texto = fonte_sujeira.render(str(grid[y][x]), True, (0, 0, 0))
-                texto_x = centro_x - texto.get_width() // 2
-                texto_y = centro_y - texto.get_height() // 2
-                tela.blit(texto, (texto_x, texto_y))
-    
-    # Agentes
-    for agente in agentes:
-        agente.desenhar(tela, margem)
-    
-    # Painel de informações
-    desenhar_painel_info(tela, agentes)
-
-def desenhar_painel_info(tela, agentes):
-    """Desenha painel lateral compacto e elegante"""
-    # Painel lateral mais estreito
-    painel_x = 5 * constantes.CELL_SIZE + 30
-    painel_width = constantes.WINDOW_WIDTH - painel_x - 10
-    
-    # Fundo do painel com degradê simulado
-    painel_rect = pygame.Rect(painel_x, 10, painel_width, constantes.WINDOW_HEIGHT - 20)
-    pygame.draw.rect(tela, (45, 52, 70), painel_rect, border_radius=15)
-    pygame.draw.rect(tela, (80, 90, 120), painel_rect, 3, border_radius=15)
-    
-    # Título estilizado
-    fonte_titulo = pygame.font.SysFont("arial", 26, bold=True)
-    titulo = fonte_titulo.render("STATUS", True, (255, 255, 255))
-    titulo_x = painel_x + painel_width // 2 - titulo.get_width() // 2
-    tela.blit(titulo, (titulo_x, 25))
-    
-    # Linha separadora
-    pygame.draw.line(tela, (100, 110, 140), 
-                     (painel_x + 15, 60), 
-                     (painel_x + painel_width - 15, 60), 3)
-    
-    # Informações dos agentes de forma compacta
-    fonte_nome = pygame.font.SysFont("arial", 18, bold=True)
-    fonte_info = pygame.font.SysFont("arial", 15)
-    
-    y_inicial = 75
-    espacamento = 105
-    
-    for i, agente in enumerate(agentes):
-        y_pos = y_inicial + i * espacamento
-        
-        # Cor do agente
-        cor_agente = {
-            'SimpleAgent': constantes.BLUE,
-            'ModelBasedAgent': constantes.GREEN, 
-            'GoalBasedAgent': constantes.ORANGE,
-            'UtilityBasedAgent': constantes.PURPLE,
-            'AgenteBDI': (255, 0, 255)
-        }.get(agente.__class__.__name__, (255, 255, 255))
-        
-        # Container do agente
-        container_rect = pygame.Rect(painel_x + 10, y_pos - 5, painel_width - 20, 95)
-        pygame.draw.rect(tela, (55, 62, 80), container_rect, border_radius=8)
-        
-        # Círculo colorido do agente
-        circulo_x = painel_x + 32
-        circulo_y = y_pos + 22
-        pygame.draw.circle(tela, cor_agente, (circulo_x, circulo_y), 18)
-        pygame.draw.circle(tela, (255, 255, 255), (circulo_x, circulo_y), 18, 3)
-        
-        # Letra do agente no círculo
-        fonte_letra = pygame.font.SysFont("arial", 14, bold=True)
-        letra = fonte_letra.render(agente.get_letra(), True, (255, 255, 255))
-        tela.blit(letra, (circulo_x - letra.get_width()//2, circulo_y - letra.get_height()//2))
-        
-        # Nome do agente
-        nome = fonte_nome.render(agente.nome, True, (255, 255, 255))
-        tela.blit(nome, (painel_x + 58, y_pos))
-        
-        # Informações compactas
-        info_y = y_pos + 26
-        
-        # Pontos
-        pts_icon = "⭐"
-        pts_texto = f"{pts_icon} {agente.pontuacao}"
-        texto_pts = fonte_info.render(pts_texto, True, (255, 215, 0))
-        tela.blit(texto_pts, (painel_x + 58, info_y))
-        
-        # Bateria com cor dinâmica
-        bat_icon = "🔋"
-        bat_cor = (0, 255, 0) if agente.bateria > 15 else (255, 100, 0) if agente.bateria > 5 else (255, 0, 0)
-        bat_texto = f"{bat_icon} {agente.bateria}"
-        texto_bat = fonte_info.render(bat_texto, True, bat_cor)
-        tela.blit(texto_bat, (painel_x + 58, info_y + 22))
-        
-        # Posição
-        pos_icon = "📍"
-        pos_texto = f"{pos_icon} ({agente.x},{agente.y})"
-        texto_pos = fonte_info.render(pos_texto, True, (200, 200, 255))
-        tela.blit(texto_pos, (painel_x + 58, info_y + 44))
+def tratar_tecla(agendador, tecla):
+    """Controles de velocidade durante a simulação"""
+    if tecla == pygame.K_SPACE:
+        agendador.alternar_pausa()
+    elif tecla in (pygame.K_RIGHT, pygame.K_PERIOD):
+        agendador.passo_unico()
+    elif pygame.K_1 <= tecla <= pygame.K_4:
+        agendador.definir_velocidade(tecla - pygame.K_1)
+        agendador.pausado = False
 
-def copiar_grid(grid):
-    """Cria uma cópia profunda do grid"""
-    return [linha[:] for linha in grid]
+def alternar_perfil(renderizador, agentes):
+    """Liga ou desliga o perfil por fase e a sobreposição no painel"""
+    if perfil.ativo:
+        perfil.configurar(False)
+        renderizador.definir_sobreposicao(None)
+        return
+    perfil.limpar()
+    classes = list(dict.fromkeys(type(agente) for agente in agentes)) + [Renderizador]
+    perfil.configurar(True, classes)
+    renderizador.definir_sobreposicao(["perfil ligado"])
 
 def executar_simulacao(tela, tipo_agente, grid, obstacles):
     """Executa uma simulação com o agente selecionado"""
     relogio = pygame.time.Clock()
-    ambiente = simpy.Environment()
+    ambiente = criar_ambiente()
     
     # Cria uma cópia do grid para não afetar o original
     grid_simulacao = copiar_grid(grid)
     
-    # Criação dos agentes (todos começam na posição 2,2 - centro)
-    pos_inicial_x, pos_inicial_y = 2, 2
-    
-    agentes = []
-    
-    if tipo_agente == "SimpleAgent":
-        agentes.append(SimpleAgent("Simples", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-    elif tipo_agente == "ModelBasedAgent":
-        agentes.append(ModelBasedAgent("Modelo", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-    elif tipo_agente == "GoalBasedAgent":
-        agentes.append(GoalBasedAgent("Objetivo", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-    elif tipo_agente == "UtilityBasedAgent":
-        agentes.append(UtilityBasedAgent("Utilidade", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-    elif tipo_agente == "AgenteBDI":
-        agentes.append(AgenteBDI("BDI", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-    elif tipo_agente == "Todos":
-        agentes.append(SimpleAgent("Simples", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-        agentes.append(ModelBasedAgent("Modelo", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-        agentes.append(GoalBasedAgent("Objetivo", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-        agentes.append(UtilityBasedAgent("Utilidade", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
-        agentes.append(AgenteBDI("BDI", ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles))
+    # Criação dos agentes (todos começam no centro do mapa)
+    pos_inicial_x, pos_inicial_y = posicao_inicial(grid_simulacao)
+    
+    if tipo_agente == "Todos":
+        classes = list(AGENTES)
+    else:
+        classes = [tipo_agente]
+    agentes = criar_agentes(classes, ambiente, pos_inicial_x, pos_inicial_y, grid_simulacao, obstacles)
     
     # Configurações da simulação
-    rodando = True
-    passos = 0
-    TEMPO_SIMULACAO = 120  # segundos
     DELAY_INICIAL = 2  # Segundos de pausa antes de começar
+    # O limite é em instantes da simulação, o mesmo do modo sem janela
+    agendador = Agendador(PASSOS_PADRAO, ambiente)
     
     print("\n" + "="*50)
     print("Iniciando simulação...")
     print(f"Agentes: {[agente.nome for agente in agentes]}")
-    print(f"Obstáculos: {obstacles}")
-    print(f"Sujeiras totais: {sum(sum(max(0, valor) for valor in linha) for linha in grid_simulacao)}")
+    print(f"Obstáculos: {len(obstacles)}")
+    print(f"Sujeiras totais: {grid_simulacao.total_sujeira()}")
+    print("Controles: espaço pausa, → avança um instante, 1-4 velocidade (1x, 10x, 100x, máx), P perfil")
     print("="*50 + "\n")
     
+    # Só as partes da tela que mudaram são redesenhadas a cada quadro
+    renderizador = Renderizador(tela, grid_simulacao, agentes)
+    if perfil.ativo:
+        perfil.limpar()
+        renderizador.definir_sobreposicao(["perfil ligado"])
+    
     # Mostra o estado inicial por alguns frames antes de começar
     for _ in range(constantes.FPS * DELAY_INICIAL):
         for evento in pygame.event.get():
             if evento.type == pygame.QUIT:
-                rodando = False
                 return None
+            elif evento.type == pygame.KEYDOWN and evento.key == pygame.K_p:
+                alternar_perfil(renderizador, agentes)
+            elif evento.type == pygame.KEYDOWN:
+                tratar_tecla(agendador, evento.key)
         
         # Desenha ambiente inicial (sem executar ações)
-        desenhar_ambiente(tela, grid_simulacao, obstacles, agentes)
-        pygame.display.update()
+        pygame.display.update(renderizador.desenhar())
         relogio.tick(constantes.FPS)
     
-    while rodando and passos < constantes.FPS * TEMPO_SIMULACAO:
+    def passo():
+        """Um passo da simulação; False quando todos os agentes pararam"""
+        if perfil.ativo:
+            inicio = perf_counter_ns()
+        try:
+            ambiente.step()
+        except AGENDA_VAZIA:
+            return False
+        finally:
+            if perfil.ativo:
+                perfil.registrar("ambiente.step", perf_counter_ns() - inicio)
+        return any(agente.executando and agente.bateria > 0 for agente in agentes)
+    
+    rodando = True
+    descricao = None
+    desde_atualizacao = 0.0
+    while rodando:
+        # Lido uma vez: a tecla P pode mudar o perfil no meio do quadro
+        medir = perfil.ativo
+        if medir:
+            inicio = perf_counter_ns()
         for evento in pygame.event.get():
             if evento.type == pygame.QUIT:
-                rodando = False
                 return None  # Sinaliza que o usuário quer sair
-        
-        # Executa um passo da simulação
-        ambiente.step()
-        
-        # Desenha ambiente
-        desenhar_ambiente(tela, grid_simulacao, obstacles, agentes)
-        
-        # Verifica se todos os agentes pararam (bateria zerada)
-        agentes_ativos = [agente for agente in agentes if agente.executando and agente.bateria > 0]
-        if not agentes_ativos:
-            print("Todos os agentes pararam!")
-            rodando = False
-        
-        pygame.display.update()
-        passos += 1
-        relogio.tick(constantes.FPS)
+            elif evento.type == pygame.KEYDOWN and evento.key == pygame.K_p:
+                alternar_perfil(renderizador, agentes)
+            elif evento.type == pygame.KEYDOWN:
+                tratar_tecla(agendador, evento.key)
+        if medir:
+            perfil.registrar("quadro.eventos", perf_counter_ns() - inicio)
+        
+        # Velocidade atual no título da janela
+        if agendador.descricao() != descricao:
+            descricao = agendador.descricao()
+            pygame.display.set_caption(f"Simulador - Robô Aspirador Inteligente [{descricao}]")
+        
+        # Roda os passos que cabem neste quadro (zero, um ou vários)
+        dt = min(relogio.tick(constantes.FPS) / 1000, 0.25)
+        if medir:
+            inicio = perf_counter_ns()
+        rodando = agendador.avancar(dt, passo)
+        if medir:
+            perfil.registrar("quadro.passos", perf_counter_ns() - inicio)
+        
+        # Sobreposição do perfil atualizada algumas vezes por segundo
+        desde_atualizacao += dt
+        if perfil.ativo and desde_atualizacao >= ATUALIZACAO_PERFIL:
+            desde_atualizacao = 0.0
+            renderizador.definir_sobreposicao(perfil.linhas(8))
+        
+        # Desenha só o que mudou
+        retangulos = renderizador.desenhar()
+        if medir:
+            inicio = perf_counter_ns()
+        pygame.display.update(retangulos)
+        if medir:
+            perfil.registrar("quadro.display_update", perf_counter_ns() - inicio)
+    
+    if perfil.ativo:
+        perfil.salvar(CAMINHO_PERFIL)
+        print(f"Perfil por fase gravado em {CAMINHO_PERFIL}")
+    
+    if not any(agente.executando and agente.bateria > 0 for agente in agentes):
+        print("Todos os agentes pararam!")
+    print(f"Instantes da simulação: {agendador.instante}")
     
     # Salva no histórico
     if agentes:
-        timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        pontuacao_max = max(agente.pontuacao for agente in agentes)
-        
-        resultados = []
-        for agente in agentes:
-            resultados.append({
-                'nome': agente.nome,
-                'pontuacao': agente.pontuacao,
-                'bateria': agente.bateria,
-            })
-        
-        historico_simulacoes.append({
-            'timestamp': timestamp,
-            'resultados': resultados
-        })
+        historico.registrar(montar_resultado(agentes, agendador.instante), grid)
         
-        print(f"\n Simulação salva no histórico ({len(historico_simulacoes)} total)")
+        print(f"\n Simulação salva no histórico ({len(historico)} total)")
     
     return agentes
 
-def main():
-    """Função principal da simulação"""
+def main(caminho_mapa=None):
+    """Função principal da simulação (opcionalmente começando num mapa de arquivo)"""
+    global historico
+    historico = Historico()
+    
     pygame.init()
     tela = pygame.display.set_mode((constantes.WINDOW_WIDTH, constantes.WINDOW_HEIGHT))
     pygame.display.set_caption("Simulador - Robô Aspirador Inteligente")
     
-    # Gera o primeiro ambiente
-    grid_original, obstacles_original = gerar_ambiente()
+    # Mostra no terminal as intenções e paradas dos agentes
+    rastro.configurar(INFO, eco=True)
+    
+    # Gera o primeiro ambiente, ou lê o mapa pedido
+    if caminho_mapa:
+        grid_original, obstacles_original = carregar_mapa(caminho_mapa)
+    else:
+        grid_original, obstacles_original = gerar_ambiente()
     
     continuar = True
     while continuar:
@@ -617,6 +580,7 @@ def main():
             else:
                 print("\n  Usando o mesmo mapa\n")
     
+    historico.fechar()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -624,7 +588,7 @@ if __name__ == "__main__":
     constantes.WINDOW_WIDTH = 900
     constantes.WINDOW_HEIGHT = 600
     constantes.CELL_SIZE = 110
-    constantes.FPS = 2  # Mais lento para visualização
+    constantes.FPS = 60  # Só a taxa de quadros; a velocidade da simulação fica no agendador
     
     # Cores dos agentes
     constantes.BLUE = (0, 0, 255)
@@ -632,4 +596,5 @@ if __name__ == "__main__":
     constantes.ORANGE = (255, 165, 0)
     constantes.PURPLE = (128, 0, 128)
     
-    main()
\ No newline at end of file
+    # python main.py [arquivo de mapa]
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""Arquivos de mapa: texto para mapas pequenos, binário mapeado em memória para os grandes.
+
+Formato texto (extensão ``.txt``), uma linha por linha do mapa:
+
+    ; comentários começam com ponto e vírgula
+    1#3.#
+    #3321
+    ..
+
+``#`` é obstáculo, ``.`` é casa limpa e ``1``-``9`` é o valor da sujeira.
+
+Formato binário (qualquer outra extensão, por exemplo ``.mapa``): um
+cabeçalho de ``TAMANHO_CABECALHO`` bytes (magica, versão, largura, altura)
+seguido da sujeira (uint8, altura x largura) e da máscara de obstáculos
+(um byte por casa). ``carregar_mapa`` abre os dois arrays com
+``np.memmap`` somente leitura: abrir o arquivo não lê os dados, e vários
+processos que abrem o mesmo mapa compartilham as mesmas páginas do cache
+do sistema. O conjunto de obstáculos devolvido é uma ``VisaoOcupacao``
+sobre a mesma máscara, também sem cópia. Quem vai alterar o mapa trabalha
+numa cópia feita por ``copiar_grid``, como qualquer simulação já faz.
+
+Uso pela linha de comando:
+
+    python mapas.py grande.mapa --largura 4000 --altura 4000 --semente 7
+    python simulacao.py --mapa grande.mapa
+"""
+import argparse
+import os
+import struct
+
+import numpy as np
+
+from grid import Grid
+from ocupacao import MapaOcupacao, VisaoOcupacao
+
+MAGICA = b"MAPA"
+VERSAO = 1
+TAMANHO_CABECALHO = 64
+_CABECALHO = struct.Struct("<4sBxxxII")
+
+OBSTACULO = "#"
+LIMPA = "."
+COMENTARIO = ";"
+
+
+def eh_texto(caminho):
+    return os.path.splitext(caminho)[1].lower() == ".txt"
+
+
+def salvar_mapa(caminho, grid):
+    """Grava o grid em texto (``.txt``) ou no formato binário"""
+    if eh_texto(caminho):
+        if grid.sujeira.max(initial=0) > 9:
+            raise ValueError("o formato texto só guarda sujeiras de 1 a 9")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for linha in grid.para_listas():
+                arquivo.write("".join(OBSTACULO if v < 0 else LIMPA if v == 0 else str(v) for v in linha))
+                arquivo.write("\n")
+        return
+
+    with open(caminho, "wb") as arquivo:
+        cabecalho = _CABECALHO.pack(MAGICA, VERSAO, grid.largura, grid.altura)
+        arquivo.write(cabecalho.ljust(TAMANHO_CABECALHO, b"\0"))
+        arquivo.write(np.ascontiguousarray(grid.sujeira, dtype=np.uint8).tobytes())
+        arquivo.write(np.ascontiguousarray(grid.obstaculos, dtype=np.uint8).tobytes())
+
+
+def carregar_mapa(caminho):
+    """Lê um mapa e retorna ``(grid, obstacles)``, como ``gerar_ambiente``.
+
+    O grid de um arquivo binário é somente leitura e fica mapeado no
+    arquivo, e os obstáculos são uma visão da máscara mapeada; use
+    ``copiar_grid`` para ter uma cópia alterável.
+    """
+    if eh_texto(caminho):
+        grid = _ler_texto(caminho)
+        return grid, MapaOcupacao.de_mascara(grid.obstaculos)
+    grid = _mapear_binario(caminho)
+    return grid, VisaoOcupacao(grid.obstaculos)
+
+
+def _ler_texto(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        linhas = [linha.rstrip("\r\n") for linha in arquivo
+                  if linha.strip() and not linha.startswith(COMENTARIO)]
+    if not linhas or any(len(linha) != len(linhas[0]) for linha in linhas):
+        raise ValueError(f"{caminho}: todas as linhas do mapa precisam ter o mesmo tamanho")
+
+    valores = []
+    for y, linha in enumerate(linhas):
+        valores.append([])
+        for x, caractere in enumerate(linha):
+            if caractere == OBSTACULO:
+                valores[-1].append(-1)
+            elif caractere == LIMPA:
+                valores[-1].append(0)
+            elif caractere.isdigit():
+                valores[-1].append(int(caractere))
+            else:
+                raise ValueError(f"{caminho}: caractere inválido {caractere!r} em ({x}, {y})")
+    return Grid.de_listas(valores)
+
+
+def _mapear_binario(caminho):
+    with open(caminho, "rb") as arquivo:
+        magica, versao, largura, altura = _CABECALHO.unpack(arquivo.read(_CABECALHO.size))
+    if magica != MAGICA:
+        raise ValueError(f"{caminho} não é um arquivo de mapa")
+    if versao != VERSAO:
+        raise ValueError(f"versão de mapa não suportada: {versao}")
+
+    forma = (altura, largura)
+    sujeira = np.memmap(caminho, dtype=np.uint8, mode="r", offset=TAMANHO_CABECALHO, shape=forma)
+    obstaculos = np.memmap(caminho, dtype=np.bool_, mode="r",
+                           offset=TAMANHO_CABECALHO + largura * altura, shape=forma)
+    return Grid.de_arrays(sujeira, obstaculos)
+
+
+def main(argv=None):
+    """Gera um mapa com ``gerar_ambiente`` e grava em arquivo"""
+    from ambiente import gerar_ambiente
+
+    parser = argparse.ArgumentParser(description="Gera e grava um mapa")
+    parser.add_argument("arquivo", help="destino (.txt para texto, outra extensão para binário)")
+    parser.add_argument("--largura", type=int, default=None)
+    parser.add_argument("--altura", type=int, default=None)
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--conectado", action="store_true")
+    args = parser.parse_args(argv)
+
+    grid, _ = gerar_ambiente(args.largura, args.altura, semente=args.semente, conectado=args.conectado)
+    salvar_mapa(args.arquivo, grid)
+    print(f"Mapa {grid.largura}x{grid.altura} gravado em {args.arquivo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+from array import array
+
+
+class MapaOcupacao:
+    """Conjunto de casas (x, y) guardado num bytearray de largura x altura.
+
+    Tem a mesma interface usada dos ``set`` que substitui (``in``, ``add``,
+    ``discard``, ``len`` e iteração), mas sem duplicatas, com pertinência
+    O(1) e memória fixa de um byte por casa. Casas fora do mapa nunca
+    pertencem ao conjunto.
+    """
+
+    __slots__ = ("largura", "altura", "dados", "quantidade", "_impressao")
+
+    def __init__(self, largura, altura, casas=()):
+        self.largura = largura
+        self.altura = altura
+        self.dados = bytearray(largura * altura)
+        self.quantidade = 0
+        self._impressao = None
+        for casa in casas:
+            self.add(casa)
+
+    @classmethod
+    def de_mascara(cls, mascara):
+        """Conjunto das casas marcadas numa máscara NumPy (altura, largura)"""
+        altura, largura = mascara.shape
+        mapa = cls(largura, altura)
+        mapa.dados[:] = mascara.astype(bool).tobytes()
+        mapa.quantidade = int(mascara.sum())
+        return mapa
+
+    def __contains__(self, casa):
+        x, y = casa
+        return 0 <= x < self.largura and 0 <= y < self.altura and self.dados[y * self.largura + x] == 1
+
+    def add(self, casa):
+        """Adiciona a casa; retorna True se ela ainda não estava no conjunto"""
+        x, y = casa
+        indice = y * self.largura + x
+        if self.dados[indice]:
+            return False
+        self.dados[indice] = 1
+        self.quantidade += 1
+        self._impressao = None
+        return True
+
+    def discard(self, casa):
+        x, y = casa
+        indice = y * self.largura + x
+        if self.dados[indice]:
+            self.dados[indice] = 0
+            self.quantidade -= 1
+            self._impressao = None
+
+    def __len__(self):
+        return self.quantidade
+
+    def __iter__(self):
+        largura = self.largura
+        indice = self.dados.find(1)
+        while indice >= 0:
+            yield indice % largura, indice // largura
+            indice = self.dados.find(1, indice + 1)
+
+    def __repr__(self):
+        return f"MapaOcupacao({list(self)})"
+
+    def copy(self):
+        copia = MapaOcupacao(self.largura, self.altura)
+        copia.dados[:] = self.dados
+        copia.quantidade = len(self)
+        return copia
+
+    def impressao(self):
+        """Cópia imutável do conteúdo, usada como chave de cache.
+
+        Só é recalculada depois de uma mudança no conjunto.
+        """
+        if self._impressao is None:
+            self._impressao = bytes(self.dados)
+        return self._impressao
+
+
+class VisaoOcupacao(MapaOcupacao):
+    """``MapaOcupacao`` somente leitura sobre uma máscara NumPy já existente.
+
+    Não copia a máscara: as consultas leem direto dela, então uma máscara
+    num ``np.memmap`` continua compartilhada entre processos. A contagem só
+    é feita quando pedida. ``copy`` devolve um ``MapaOcupacao`` alterável.
+    """
+
+    __slots__ = ("mascara",)
+
+    def __init__(self, mascara):
+        self.altura, self.largura = mascara.shape
+        self.mascara = mascara
+        self.dados = memoryview(mascara.reshape(-1)).cast("B")
+        self.quantidade = None
+        self._impressao = None
+
+    def add(self, casa):
+        raise TypeError("mapa de ocupação somente leitura")
+
+    discard = add
+
+    def __len__(self):
+        if self.quantidade is None:
+            self.quantidade = int(self.mascara.sum())
+        return self.quantidade
+
+    def __iter__(self):
+        largura = self.largura
+        for indice in self.mascara.reshape(-1).nonzero()[0].tolist():
+            yield indice % largura, indice // largura
+
+    def __repr__(self):
+        return f"VisaoOcupacao({list(self)})"
+
+
+class MapaValores:
+    """Valor conhecido de cada casa (-1 obstáculo, 0 limpa, 1-254 sujeira) num bytearray.
+
+    Substitui a lista de listas com ``None`` para casas ainda não vistas:
+    um byte por casa, com ``DESCONHECIDO`` no lugar de ``None``.
+    """
+
+    __slots__ = ("largura", "altura", "dados")
+
+    DESCONHECIDO = 255
+    _OBSTACULO = 254
+
+    def __init__(self, largura, altura):
+        self.largura = largura
+        self.altura = altura
+        self.dados = bytearray([self.DESCONHECIDO]) * (largura * altura)
+
+    def valor(self, x, y):
+        """Valor da casa, ou None se ela ainda não foi vista"""
+        byte = self.dados[y * self.largura + x]
+        if byte == self.DESCONHECIDO:
+            return None
+        return -1 if byte == self._OBSTACULO else byte
+
+    def definir(self, x, y, valor):
+        self.dados[y * self.largura + x] = self._OBSTACULO if valor < 0 else valor
+
+    def conhecidas(self):
+        """Quantas casas já foram vistas"""
+        return len(self.dados) - self.dados.count(self.DESCONHECIDO)
+
+
+class HistoricoPosicoes:
+    """Posições (x, y) por onde o agente passou, com x e y intercalados num ``array``.
+
+    Sem ``limite`` guarda o trajeto inteiro; com ``limite`` vira um buffer
+    circular com só as últimas ``limite`` posições. ``total`` conta todas
+    as posições já registradas. Indexação e iteração devolvem tuplas, da
+    mais antiga para a mais recente.
+    """
+
+    __slots__ = ("dados", "limite", "inicio", "total")
+
+    def __init__(self, posicoes=(), limite=None, maximo_coordenada=0xFFFF):
+        self.dados = array("H" if maximo_coordenada <= 0xFFFF else "I")
+        self.limite = limite
+        # Posição mais antiga dentro do buffer circular cheio
+        self.inicio = 0
+        self.total = 0
+        for posicao in posicoes:
+            self.append(posicao)
+
+    def append(self, posicao):
+        x, y = posicao
+        self.total += 1
+        if self.limite is None or len(self.dados) < 2 * self.limite:
+            self.dados.append(x)
+            self.dados.append(y)
+            return
+        self.dados[2 * self.inicio] = x
+        self.dados[2 * self.inicio + 1] = y
+        self.inicio = (self.inicio + 1) % self.limite
+
+    def __len__(self):
+        return len(self.dados) // 2
+
+    def __getitem__(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("posição fora do histórico")
+        j = 2 * ((self.inicio + i) % n)
+        return self.dados[j], self.dados[j + 1]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"HistoricoPosicoes({list(self)})"
@@ -0,0 +1,155 @@
+"""Perfil de tempo por fase da simulação.
+
+Cada fase (um método de agente, ou uma parte do quadro em ``main.py``)
+tem um histograma com baldes de potências de 2 nanossegundos: registrar
+uma medida é só somar em três contadores e num balde, sem guardar as
+medidas.
+
+Os métodos medidos são os listados em ``FASES`` de cada classe. Ligar o
+perfil troca esses métodos, na classe, por versões cronometradas, e
+desligar devolve os originais; desligado, o perfil não custa nada para
+os agentes. Partes de código que não são métodos seguem o padrão do
+rastreamento:
+
+    if perfil.ativo:
+        inicio = perf_counter_ns()
+    ...
+    if perfil.ativo:
+        perfil.registrar("quadro.eventos", perf_counter_ns() - inicio)
+"""
+import functools
+import json
+from array import array
+from time import perf_counter_ns
+
+BALDES = 64
+
+
+class Histograma:
+    """Distribuição de durações em nanossegundos, em baldes de potências de 2"""
+
+    __slots__ = ("contagem", "total", "maximo", "baldes")
+
+    def __init__(self):
+        self.baldes = array("Q", bytes(8 * BALDES))
+        self.zerar()
+
+    def zerar(self):
+        self.contagem = 0
+        self.total = 0
+        self.maximo = 0
+        for i in range(BALDES):
+            self.baldes[i] = 0
+
+    def registrar(self, duracao):
+        self.contagem += 1
+        self.total += duracao
+        if duracao > self.maximo:
+            self.maximo = duracao
+        self.baldes[min(duracao.bit_length(), BALDES - 1)] += 1
+
+    def percentil(self, fracao):
+        """Limite superior (ns) do balde onde cai o percentil ``fracao`` (0 a 1)"""
+        alvo = fracao * self.contagem
+        acumulado = 0
+        for i, quantidade in enumerate(self.baldes):
+            acumulado += quantidade
+            if quantidade and acumulado >= alvo:
+                return min(1 << i, self.maximo)
+        return self.maximo
+
+    def resumo(self):
+        """Dicionário com contagem, média, p50, p99 e máximo (em microssegundos) e os baldes"""
+        return {
+            'contagem': self.contagem,
+            'total_ms': self.total / 1e6,
+            'media_us': self.total / self.contagem / 1e3 if self.contagem else 0.0,
+            'p50_us': self.percentil(0.5) / 1e3,
+            'p99_us': self.percentil(0.99) / 1e3,
+            'maximo_us': self.maximo / 1e3,
+            # Balde i: durações de 2**(i-1) até 2**i - 1 ns
+            'baldes': {i: quantidade for i, quantidade in enumerate(self.baldes) if quantidade},
+        }
+
+
+class Perfilador:
+    """Histogramas por fase; desligado por padrão"""
+
+    __slots__ = ("ativo", "histogramas", "_trocados")
+
+    def __init__(self):
+        self.ativo = False
+        self.histogramas = {}
+        # (classe, método, original ou None se o método era herdado)
+        self._trocados = []
+
+    def configurar(self, ativo=False, classes=()):
+        """Liga ou desliga o perfil; ligado, cronometra as ``FASES`` de ``classes``"""
+        self._restaurar()
+        self.ativo = ativo
+        if ativo:
+            for classe in classes:
+                self._instrumentar(classe)
+
+    def histograma(self, fase):
+        histograma = self.histogramas.get(fase)
+        if histograma is None:
+            histograma = self.histogramas[fase] = Histograma()
+        return histograma
+
+    def registrar(self, fase, duracao):
+        """Registra ``duracao`` (ns) na fase (quem chama já conferiu ``ativo``)"""
+        self.histograma(fase).registrar(duracao)
+
+    def _instrumentar(self, classe):
+        for metodo in getattr(classe, "FASES", ()):
+            if any(c is classe and m == metodo for c, m, _ in self._trocados):
+                continue
+            funcao = getattr(classe, metodo)
+            self._trocados.append((classe, metodo, classe.__dict__.get(metodo)))
+            setattr(classe, metodo, self._cronometrado(f"{classe.__name__}.{metodo.lstrip('_')}", funcao))
+
+    def _cronometrado(self, fase, funcao):
+        registrar = self.histograma(fase).registrar
+
+        @functools.wraps(funcao)
+        def medido(*args, **kwargs):
+            inicio = perf_counter_ns()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar(perf_counter_ns() - inicio)
+        return medido
+
+    def _restaurar(self):
+        for classe, metodo, original in reversed(self._trocados):
+            if original is None:
+                delattr(classe, metodo)
+            else:
+                setattr(classe, metodo, original)
+        self._trocados.clear()
+
+    def resumo(self):
+        """Resumo de cada fase com medidas, da que mais tempo consumiu para a que menos"""
+        fases = sorted((h for h in self.histogramas.items() if h[1].contagem), key=lambda h: -h[1].total)
+        return {fase: histograma.resumo() for fase, histograma in fases}
+
+    def linhas(self, limite=None):
+        """Texto curto por fase, para a sobreposição na tela"""
+        return [f"{fase}: {r['media_us']:.0f}µs p99 {r['p99_us']:.0f}µs ({r['contagem']})"
+                for fase, r in list(self.resumo().items())[:limite]]
+
+    def salvar(self, caminho):
+        """Grava o resumo em JSON"""
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.resumo(), arquivo, indent=2, ensure_ascii=False)
+            arquivo.write("\n")
+
+    def limpar(self):
+        # Zera no lugar: os métodos cronometrados guardam os histogramas
+        for histograma in self.histogramas.values():
+            histograma.zerar()
+
+
+# Perfilador compartilhado pelo processo
+perfil = Perfilador()
@@ -0,0 +1,129 @@
+"""Ocupação do piso quando vários agentes dividem o mesmo mapa.
+
+Três estruturas, todas com consulta O(1), para que centenas ou milhares
+de robôs andem sem comparar posições par a par:
+
+- hash espacial: índice da casa -> quantos agentes estão nela. Um agente
+  não entra numa casa ocupada por outro (no início todos dividem a casa
+  inicial e vão se espalhando);
+- tabela de reservas: índice da casa -> instante em que algum agente
+  entrou nela ou saiu dela. Uma casa mexida num instante fica reservada
+  até o instante seguinte, então dois robôs nunca trocam de lugar nem
+  entram em fila na mesma casa durante um passo. Os agentes agem sempre
+  na mesma ordem em cada instante, então o primeiro a pedir a casa a
+  leva, sempre o mesmo em execuções iguais;
+- reivindicações de sujeira: cada agente reivindica a sujeira que
+  escolheu como alvo, e os outros a ignoram ao escolher as suas (veja o
+  argumento ``ignorar`` das buscas de ``Grid`` e ``IndiceSujeira``).
+
+Um agente que para (ou fica sem bateria) sai do piso e solta seu alvo,
+para não bloquear os outros para sempre. Com um único agente nada disso é
+criado, e o episódio é idêntico ao de antes.
+"""
+
+
+class _AlvosAlheios:
+    """Casas reivindicadas por outros agentes, para o ``ignorar`` das buscas"""
+
+    __slots__ = ("alvos", "agente")
+
+    def __init__(self, alvos, agente):
+        self.alvos = alvos
+        self.agente = agente
+
+    def __contains__(self, casa):
+        dono = self.alvos.get(casa)
+        return dono is not None and dono is not self.agente
+
+
+class Piso:
+    """Posições, reservas e alvos dos agentes que compartilham um mapa"""
+
+    __slots__ = ("largura", "ambiente", "ocupacao", "reservas", "alvos", "alvo_de")
+
+    def __init__(self, largura, altura, ambiente):
+        self.largura = largura
+        self.ambiente = ambiente
+        self.ocupacao = {}
+        self.reservas = {}
+        # Sujeira (x, y) -> agente que a reivindicou, e o inverso
+        self.alvos = {}
+        self.alvo_de = {}
+
+    def adicionar(self, agente):
+        """Registra o agente na posição atual e liga o piso a ele"""
+        indice = agente.y * self.largura + agente.x
+        self.ocupacao[indice] = self.ocupacao.get(indice, 0) + 1
+        agente.piso = self
+        agente.alvos_alheios = _AlvosAlheios(self.alvos, agente)
+
+    def remover(self, agente):
+        """Tira do piso um agente que parou"""
+        indice = agente.y * self.largura + agente.x
+        restantes = self.ocupacao[indice] - 1
+        if restantes:
+            self.ocupacao[indice] = restantes
+        else:
+            del self.ocupacao[indice]
+        self.liberar(agente)
+        agente.piso = None
+        agente.alvos_alheios = None
+
+    def tomada(self, x, y):
+        """A casa tem algum agente ou foi mexida por um agente neste instante?"""
+        indice = y * self.largura + x
+        return indice in self.ocupacao or self.reservas.get(indice) == self.ambiente.now
+
+    def mover(self, agente, x, y):
+        """Reserva a casa (x, y) para o agente, que está numa casa vizinha.
+
+        Retorna False, sem mudar nada, se a casa tem outro agente ou foi
+        mexida por outro agente neste instante.
+        """
+        if self.tomada(x, y):
+            return False
+        destino = y * self.largura + x
+        agora = self.ambiente.now
+        origem = agente.y * self.largura + agente.x
+        restantes = self.ocupacao[origem] - 1
+        if restantes:
+            self.ocupacao[origem] = restantes
+        else:
+            del self.ocupacao[origem]
+        self.ocupacao[destino] = 1
+        self.reservas[origem] = agora
+        self.reservas[destino] = agora
+        return True
+
+    def vizinho_tomado(self, agente):
+        """Alguma casa vizinha sem obstáculo está com outro agente ou reservada agora?"""
+        for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            x, y = agente.x + dx, agente.y + dy
+            if agente.dentro_do_grid(x, y) and not agente.grid.eh_obstaculo(x, y) and self.tomada(x, y):
+                return True
+        return False
+
+    def reivindicar(self, agente, x, y):
+        """Marca a sujeira como alvo do agente (e solta o alvo anterior dele).
+
+        Retorna False se outro agente já a reivindicou.
+        """
+        dono = self.alvos.get((x, y))
+        if dono is not None and dono is not agente:
+            return False
+        self.liberar(agente)
+        self.alvos[(x, y)] = agente
+        self.alvo_de[agente] = (x, y)
+        return True
+
+    def liberar(self, agente):
+        """Solta a sujeira reivindicada pelo agente, se houver"""
+        casa = self.alvo_de.pop(agente, None)
+        if casa is not None:
+            del self.alvos[casa]
+
+    def limpou(self, x, y):
+        """A casa foi aspirada: quem a reivindicava fica sem alvo"""
+        dono = self.alvos.get((x, y))
+        if dono is not None:
+            self.liberar(dono)
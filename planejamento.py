@@ -0,0 +1,406 @@
+"""Planejamento de caminhos compartilhado entre os agentes.
+
+Para mapas pequenos, um campo de distâncias guarda, para um destino, a
+distância BFS de cada casa até ele e o próximo passo a dar. Os campos
+ficam num cache LRU
+indexado por (dimensões, impressão do mapa de obstáculos, destino):
+enquanto o conjunto de obstáculos em que o agente acredita não muda, as
+consultas repetidas ao mesmo destino não refazem a busca. O cache é
+limitado em bytes e esvaziado a cada episódio (``criar_agentes``).
+
+Calcular o campo inteiro custa caro demais para uma única consulta, e a
+maioria dos destinos é pedida uma vez só. ``planejar_caminho`` usa um A*
+com heurística de Manhattan, cujos arrays são reaproveitados entre as
+chamadas, e só calcula o campo quando o mesmo destino já foi pedido
+``CONSULTAS_PARA_CAMPO`` vezes com o mesmo mapa de obstáculos (e o mapa
+não passa de ``AREA_MAXIMA_CAMPO``).
+
+Para explorar, ``Fronteira`` mantém as casas ainda não visitadas vizinhas
+de casas visitadas e acha a mais próxima com uma BFS que só anda pelo que
+o agente já visitou.
+"""
+import heapq
+from array import array
+from collections import OrderedDict, deque
+
+from ocupacao import MapaOcupacao
+
+# Direções na mesma ordem usada pela BFS original do AgenteBDI
+DIRECOES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# Acima desta área nunca se calcula o campo inteiro, só A*
+AREA_MAXIMA_CAMPO = 64 * 64
+# Consultas ao mesmo destino, com os mesmos obstáculos, a partir das quais vale calcular o campo
+CONSULTAS_PARA_CAMPO = 3
+# Destinos recentes cujas consultas são contadas
+DESTINOS_CONTADOS = 256
+
+
+class CampoDistancias:
+    """Distâncias e próximos passos de todas as casas até um destino"""
+
+    __slots__ = ("largura", "altura", "destino", "distancias", "proximo")
+
+    def __init__(self, largura, altura, obstaculos, destino):
+        self.largura = largura
+        self.altura = altura
+        self.destino = destino
+        # -1 = inalcançável; proximo guarda o índice em DIRECOES
+        self.distancias = array("i", [-1]) * (largura * altura)
+        self.proximo = array("b", [-1]) * (largura * altura)
+
+        bloqueado = obstaculos.dados
+        dx_, dy_ = destino
+        self.distancias[dy_ * largura + dx_] = 0
+        fila = deque([destino])
+        while fila:
+            x, y = fila.popleft()
+            distancia = self.distancias[y * largura + x] + 1
+            for i, (dx, dy) in enumerate(DIRECOES):
+                # Vizinho (nx, ny) chega em (x, y) andando na direção oposta
+                nx, ny = x - dx, y - dy
+                if 0 <= nx < largura and 0 <= ny < altura:
+                    indice = ny * largura + nx
+                    if self.distancias[indice] < 0 and not bloqueado[indice]:
+                        self.distancias[indice] = distancia
+                        self.proximo[indice] = i
+                        fila.append((nx, ny))
+
+    def tamanho(self):
+        """Bytes dos arrays do campo"""
+        return (len(self.distancias) * self.distancias.itemsize
+                + len(self.proximo) * self.proximo.itemsize)
+
+    def distancia(self, x, y):
+        """Distância do caminho mais curto até o destino, ou None"""
+        d = self.distancias[y * self.largura + x]
+        return d if d >= 0 else None
+
+    def proximo_passo(self, x, y):
+        """Direção (dx, dy) do primeiro passo até o destino, ou None"""
+        i = self.proximo[y * self.largura + x]
+        return DIRECOES[i] if i >= 0 else None
+
+    def caminho(self, x, y):
+        """Lista de direções de (x, y) até o destino (vazia se inalcançável)"""
+        passos = []
+        i = self.proximo[y * self.largura + x]
+        while i >= 0:
+            dx, dy = DIRECOES[i]
+            passos.append((dx, dy))
+            x, y = x + dx, y + dy
+            i = self.proximo[y * self.largura + x]
+        return passos
+
+
+class CacheCampos:
+    """Cache LRU de campos de distância, limitado a ``capacidade`` bytes.
+
+    ``obstaculos`` é um ``MapaOcupacao``. A chave usa a impressão dele, que
+    só muda quando o agente descobre um obstáculo, o que invalida
+    naturalmente as entradas antigas. O tamanho de uma entrada conta os
+    arrays do campo e a impressão da chave. Mapas maiores que
+    ``AREA_MAXIMA_CAMPO`` nunca têm campo, e nem são consultados.
+    """
+
+    def __init__(self, capacidade=8 * 1024 * 1024):
+        self.capacidade = capacidade
+        self.campos = OrderedDict()
+        self.bytes = 0
+        # (dimensões, destino) -> [impressão dos obstáculos, consultas sem campo]
+        self.pedidos = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def consultar(self, largura, altura, obstaculos, destino):
+        """Campo já calculado, ou None (não calcula nada)"""
+        if largura * altura > AREA_MAXIMA_CAMPO:
+            return None
+        chave = (largura, altura, obstaculos.impressao(), destino)
+        campo = self.campos.get(chave)
+        if campo is not None:
+            self.acertos += 1
+            self.campos.move_to_end(chave)
+        return campo
+
+    def repetido(self, largura, altura, obstaculos, destino):
+        """Conta uma consulta sem campo; True quando o destino já foi pedido
+        ``CONSULTAS_PARA_CAMPO`` vezes com estes obstáculos"""
+        if largura * altura > AREA_MAXIMA_CAMPO:
+            return False
+        chave = (largura, altura, destino)
+        impressao = obstaculos.impressao()
+        pedido = self.pedidos.get(chave)
+        if pedido is None or pedido[0] is not impressao and pedido[0] != impressao:
+            pedido = self.pedidos[chave] = [impressao, 0]
+            if len(self.pedidos) > DESTINOS_CONTADOS:
+                self.pedidos.popitem(last=False)
+        else:
+            self.pedidos.move_to_end(chave)
+        pedido[1] += 1
+        return pedido[1] >= CONSULTAS_PARA_CAMPO
+
+    def campo(self, largura, altura, obstaculos, destino):
+        """Campo do cache, calculando-o se ainda não existir"""
+        campo = self.consultar(largura, altura, obstaculos, destino)
+        if campo is not None:
+            return campo
+
+        self.falhas += 1
+        campo = CampoDistancias(largura, altura, obstaculos, destino)
+        if largura * altura <= AREA_MAXIMA_CAMPO:
+            self.campos[(largura, altura, obstaculos.impressao(), destino)] = campo
+            self.bytes += self._tamanho(campo)
+            while self.bytes > self.capacidade and self.campos:
+                _, antigo = self.campos.popitem(last=False)
+                self.bytes -= self._tamanho(antigo)
+        return campo
+
+    @staticmethod
+    def _tamanho(campo):
+        return campo.tamanho() + campo.largura * campo.altura
+
+    def limpar(self):
+        self.campos.clear()
+        self.pedidos.clear()
+        self.bytes = 0
+
+
+# Cache compartilhado por todos os agentes do processo
+cache_campos = CacheCampos()
+
+
+class PlanejadorAEstrela:
+    """A* com heurística de Manhattan e reconstrução por ponteiros para o pai.
+
+    Os arrays de custo, pai e marcas são alocados uma vez por tamanho de
+    mapa. Cada busca usa uma geração nova, então nada precisa ser limpo
+    entre as chamadas.
+    """
+
+    def __init__(self, largura, altura):
+        self.largura = largura
+        self.altura = altura
+        n = largura * altura
+        self.custo = array("i", bytes(4 * n))
+        self.pai = array("i", bytes(4 * n))
+        # Casa aberta/fechada se a marca for igual à geração atual
+        self.aberto = array("I", bytes(4 * n))
+        self.fechado = array("I", bytes(4 * n))
+        self.geracao = 0
+        self.fila = []
+        self.expansoes = 0
+
+    def buscar(self, inicio, destino, obstaculos, limite_expansoes=None):
+        """Lista de direções de ``inicio`` até ``destino``.
+
+        Retorna lista vazia se o destino for inalcançável ou se o limite
+        de expansões acabar antes de chegar nele.
+        """
+        if inicio == destino:
+            return []
+        self.geracao += 1
+        geracao = self.geracao
+        largura, altura = self.largura, self.altura
+        custo, pai, aberto, fechado = self.custo, self.pai, self.aberto, self.fechado
+        bloqueado = obstaculos.dados
+        xd, yd = destino
+        alvo = yd * largura + xd
+
+        fila = self.fila
+        fila.clear()
+        xi, yi = inicio
+        origem = yi * largura + xi
+        custo[origem] = 0
+        pai[origem] = -1
+        aberto[origem] = geracao
+        # (f, h, índice): no empate de f, prefere a casa mais perto do destino
+        h = abs(xi - xd) + abs(yi - yd)
+        heapq.heappush(fila, (h, h, origem))
+
+        expansoes = 0
+        while fila:
+            _, _, atual = heapq.heappop(fila)
+            if fechado[atual] == geracao:
+                continue
+            if atual == alvo:
+                self.expansoes = expansoes
+                return self._reconstruir(atual)
+            fechado[atual] = geracao
+            expansoes += 1
+            if limite_expansoes is not None and expansoes > limite_expansoes:
+                break
+
+            y, x = divmod(atual, largura)
+            g = custo[atual] + 1
+            for dx, dy in DIRECOES:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < largura and 0 <= ny < altura):
+                    continue
+                vizinho = ny * largura + nx
+                if bloqueado[vizinho] or fechado[vizinho] == geracao:
+                    continue
+                if aberto[vizinho] != geracao or g < custo[vizinho]:
+                    aberto[vizinho] = geracao
+                    custo[vizinho] = g
+                    pai[vizinho] = atual
+                    h = abs(nx - xd) + abs(ny - yd)
+                    heapq.heappush(fila, (g + h, h, vizinho))
+
+        self.expansoes = expansoes
+        return []
+
+    def _reconstruir(self, indice):
+        """Segue os ponteiros para o pai e devolve as direções na ordem"""
+        largura = self.largura
+        passos = []
+        anterior = self.pai[indice]
+        while anterior >= 0:
+            passos.append((indice % largura - anterior % largura, indice // largura - anterior // largura))
+            indice = anterior
+            anterior = self.pai[indice]
+        passos.reverse()
+        return passos
+
+
+# Um planejador A* reaproveitado por tamanho de mapa
+_planejadores = {}
+
+
+def planejador_para(largura, altura):
+    """Planejador A* compartilhado para mapas deste tamanho"""
+    planejador = _planejadores.get((largura, altura))
+    if planejador is None:
+        planejador = _planejadores[(largura, altura)] = PlanejadorAEstrela(largura, altura)
+    return planejador
+
+
+def planejar_caminho(largura, altura, obstaculos, inicio, destino, limite_expansoes=None):
+    """Caminho mais curto de ``inicio`` até ``destino`` como lista de direções.
+
+    Usa o campo de distâncias se ele já estiver no cache, calcula o campo
+    se o destino está sendo pedido repetidamente, e senão roda um A*.
+    """
+    campo = cache_campos.consultar(largura, altura, obstaculos, destino)
+    if campo is None and cache_campos.repetido(largura, altura, obstaculos, destino):
+        campo = cache_campos.campo(largura, altura, obstaculos, destino)
+    if campo is not None:
+        return campo.caminho(*inicio)
+    return planejador_para(largura, altura).buscar(inicio, destino, obstaculos, limite_expansoes)
+
+
+class _Marcas:
+    """Casas já alcançadas numa busca; valem as marcas iguais à geração atual"""
+
+    __slots__ = ("dados", "geracao")
+
+    def __init__(self, tamanho):
+        self.dados = array("I", bytes(4 * tamanho))
+        self.geracao = 0
+
+
+# Marcas reaproveitadas por tamanho de mapa (as buscas não se intercalam)
+_marcas = {}
+
+
+def _marcas_para(largura, altura):
+    marcas = _marcas.get((largura, altura))
+    if marcas is None:
+        marcas = _marcas[(largura, altura)] = _Marcas(largura * altura)
+    return marcas
+
+
+class Fronteira:
+    """Casas não visitadas e sem obstáculo conhecido vizinhas de uma casa visitada.
+
+    ``visitadas`` e ``obstaculos`` são os ``MapaOcupacao`` do agente, e só
+    mudam por ``visitar`` e ``bloquear``, que atualizam a fronteira em volta
+    da casa percebida. ``mais_proxima`` faz uma BFS a partir do agente pelas
+    casas visitadas e para na primeira camada que toca a fronteira: o custo
+    depende da região explorada e da distância até a fronteira, não do
+    tamanho do mapa, e paredes conhecidas são contornadas.
+    """
+
+    __slots__ = ("largura", "altura", "visitadas", "obstaculos", "casas")
+
+    def __init__(self, visitadas, obstaculos):
+        self.largura = visitadas.largura
+        self.altura = visitadas.altura
+        self.visitadas = visitadas
+        self.obstaculos = obstaculos
+        self.casas = MapaOcupacao(self.largura, self.altura)
+        for x, y in visitadas:
+            self._expandir(x, y)
+
+    def __len__(self):
+        return len(self.casas)
+
+    def __contains__(self, casa):
+        return casa in self.casas
+
+    def visitar(self, x, y):
+        """Marca (x, y) como visitada; retorna True se ela ainda não era"""
+        if not self.visitadas.add((x, y)):
+            return False
+        self.casas.discard((x, y))
+        self._expandir(x, y)
+        return True
+
+    def bloquear(self, x, y):
+        """Registra um obstáculo em (x, y), que deixa de ser fronteira"""
+        self.obstaculos.add((x, y))
+        self.casas.discard((x, y))
+
+    def _expandir(self, x, y):
+        for dx, dy in DIRECOES:
+            casa = (x + dx, y + dy)
+            if (0 <= casa[0] < self.largura and 0 <= casa[1] < self.altura
+                    and casa not in self.visitadas and casa not in self.obstaculos):
+                self.casas.add(casa)
+
+    def mais_proxima(self, x, y, limite=None):
+        """Casa da fronteira mais perto de (x, y) andando pelas casas visitadas.
+
+        Retorna ``(x, y, distancia)``, com empate resolvido pela primeira em
+        ordem de linha, ou None se não houver fronteira alcançável a no
+        máximo ``limite`` passos.
+        """
+        if not self.casas or (limite is not None and limite < 0):
+            return None
+        largura, altura = self.largura, self.altura
+        origem = y * largura + x
+        fronteira = self.casas.dados
+        if fronteira[origem]:
+            return x, y, 0
+        visitadas = self.visitadas.dados
+        marcas = _marcas_para(largura, altura)
+        marcas.geracao += 1
+        geracao = marcas.geracao
+        vistas = marcas.dados
+        vistas[origem] = geracao
+
+        camada = [origem]
+        distancia = 0
+        while camada and (limite is None or distancia < limite):
+            distancia += 1
+            proxima = []
+            achadas = []
+            for indice in camada:
+                cy, cx = divmod(indice, largura)
+                for dx, dy in DIRECOES:
+                    nx, ny = cx + dx, cy + dy
+                    if not (0 <= nx < largura and 0 <= ny < altura):
+                        continue
+                    vizinho = ny * largura + nx
+                    if vistas[vizinho] == geracao:
+                        continue
+                    vistas[vizinho] = geracao
+                    if fronteira[vizinho]:
+                        achadas.append(vizinho)
+                    elif visitadas[vizinho]:
+                        proxima.append(vizinho)
+            if achadas:
+                indice = min(achadas)
+                return indice % largura, indice // largura, distancia
+            camada = proxima
+        return None
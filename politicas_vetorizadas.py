@@ -0,0 +1,55 @@
+"""Políticas vetorizadas compartilhadas por ``AmbienteVetorizado`` e ``Enxame``.
+
+Uma política recebe o ambiente e um ``np.random.Generator`` e devolve um
+código de ação por agente. Os dois ambientes expõem a mesma interface:
+
+- ``movimentos_validos()``: máscara (N, 4) na ordem de ``MOVIMENTOS``;
+- ``sujeira_atual()`` e ``sujeira_vizinha()``: sujeira sob cada agente e
+  nas quatro casas vizinhas (N, 4);
+- ``direcao_gulosa(validos)``: direção que aproxima cada agente da
+  sujeira escolhida e a máscara dos agentes que podem segui-la. Cada
+  ambiente escolhe o alvo do seu jeito (a sujeira mais próxima do mundo,
+  ou o campo de distâncias do modelo compartilhado do enxame).
+"""
+import numpy as np
+
+# Códigos de ação: índices 0-3 de MOVIMENTOS, depois aspirar e ficar parado
+MOVIMENTOS = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)], dtype=np.int64)
+ACAO_ASPIRAR = 4
+ACAO_PARADO = 5
+
+
+def movimento_aleatorio(validos, rng):
+    """Primeiro movimento válido numa ordem aleatória (ou parado se nenhum)"""
+    prioridade = np.where(validos, rng.random(validos.shape), -1.0)
+    escolha = np.argmax(prioridade, axis=1)
+    return np.where(validos.any(axis=1), escolha, ACAO_PARADO)
+
+
+def politica_reativa(ambiente, rng):
+    """Regra do ``SimpleAgent``: aspira, vai para um vizinho sujo ou anda ao acaso"""
+    validos = ambiente.movimentos_validos()
+    acoes = movimento_aleatorio(validos, rng)
+
+    # Vizinho sujo, na ordem de MOVIMENTOS
+    vizinho_sujo = validos & (ambiente.sujeira_vizinha() > 0)
+    acoes = np.where(vizinho_sujo.any(axis=1), np.argmax(vizinho_sujo, axis=1), acoes)
+
+    return np.where(ambiente.sujeira_atual() > 0, ACAO_ASPIRAR, acoes)
+
+
+def politica_gulosa(ambiente, rng):
+    """Segue ``direcao_gulosa`` do ambiente; sem alvo, ou com o passo bloqueado, anda ao acaso"""
+    validos = ambiente.movimentos_validos()
+    acoes = movimento_aleatorio(validos, rng)
+
+    direcao, pode_ir = ambiente.direcao_gulosa(validos)
+    acoes = np.where(pode_ir, direcao, acoes)
+
+    return np.where(ambiente.sujeira_atual() > 0, ACAO_ASPIRAR, acoes)
+
+
+POLITICAS = {
+    "reativa": politica_reativa,
+    "gulosa": politica_gulosa,
+}
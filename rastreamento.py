@@ -0,0 +1,89 @@
+"""Rastreamento estruturado de eventos dos agentes.
+
+Substitui os ``print`` espalhados pelos agentes. Cada tipo de evento tem
+um nível (INFO ou DEBUG) e é registrado se o nível configurado para ele
+for suficiente. Os eventos vão para um buffer circular em memória e,
+opcionalmente, para um arquivo JSONL ou para a saída padrão.
+
+Para custar quase nada quando desligado, o rastreador expõe um booleano
+por tipo de evento, e os agentes só montam o evento se ele estiver ligado:
+
+    if rastro.mover:
+        rastro.emitir("mover", self, x=self.x, y=self.y)
+"""
+import json
+from collections import deque, namedtuple
+
+DESLIGADO, INFO, DEBUG = 0, 1, 2
+
+NOMES_NIVEIS = {"desligado": DESLIGADO, "info": INFO, "debug": DEBUG}
+
+# Tipo de evento -> nível a partir do qual ele é registrado
+TIPOS = {
+    "intencao": INFO,     # AgenteBDI formou uma intenção
+    "replanejar": INFO,   # AgenteBDI refez o plano depois de um movimento falhar
+    "parar": INFO,        # agente parou
+    "aspirar": INFO,      # agente aspirou uma casa
+    "mover": DEBUG,       # agente andou uma casa
+    "alvo": DEBUG,        # sujeira escolhida como alvo
+}
+
+Evento = namedtuple("Evento", "sequencia tipo agente dados")
+
+
+class Rastreador:
+    """Coleta os eventos ligados; tudo desligado por padrão"""
+
+    __slots__ = tuple(TIPOS) + ("niveis", "buffer", "arquivo", "eco", "sequencia")
+
+    def __init__(self):
+        self.buffer = deque(maxlen=10000)
+        self.arquivo = None
+        self.eco = False
+        self.sequencia = 0
+        self.configurar()
+
+    def configurar(self, nivel=DESLIGADO, niveis=None, capacidade=None, jsonl=None, eco=False):
+        """Define o nível geral e, se preciso, níveis por tipo de evento.
+
+        ``niveis`` sobrescreve o nível de tipos específicos, por exemplo
+        ``{"mover": DEBUG}``. ``jsonl`` é o caminho de um arquivo que recebe
+        um evento por linha; ``eco`` também imprime os eventos.
+        """
+        self.niveis = {tipo: nivel for tipo in TIPOS}
+        self.niveis.update(niveis or {})
+        for tipo, minimo in TIPOS.items():
+            setattr(self, tipo, self.niveis[tipo] >= minimo)
+
+        if capacidade is not None:
+            self.buffer = deque(self.buffer, maxlen=capacidade)
+        self.fechar()
+        if jsonl is not None:
+            self.arquivo = open(jsonl, "a", encoding="utf-8")
+        self.eco = eco
+
+    def emitir(self, tipo, agente, **dados):
+        """Registra um evento (quem chama já conferiu que o tipo está ligado)"""
+        self.sequencia += 1
+        evento = Evento(self.sequencia, tipo, agente.nome, dados)
+        self.buffer.append(evento)
+        if self.arquivo is not None:
+            self.arquivo.write(json.dumps(evento._asdict(), ensure_ascii=False) + "\n")
+        if self.eco:
+            print(f"[{tipo}] {agente.nome}: {dados}")
+
+    def eventos(self, tipo=None):
+        """Eventos do buffer, opcionalmente só de um tipo"""
+        return [evento for evento in self.buffer if tipo is None or evento.tipo == tipo]
+
+    def limpar(self):
+        self.buffer.clear()
+
+    def fechar(self):
+        if self.arquivo is not None:
+            self.arquivo.close()
+            self.arquivo = None
+
+
+# Rastreador compartilhado pelo processo
+rastro = Rastreador()
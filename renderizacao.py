@@ -0,0 +1,281 @@
+"""Desenho da simulação com cache.
+
+``pygame.font.SysFont`` percorre a lista de fontes do sistema a cada
+chamada, então as fontes e os textos renderizados ficam em cache. O
+``Renderizador`` desenha uma vez, numa superfície de fundo, tudo o que não
+muda durante uma simulação (grade, obstáculos e moldura do painel). A cada
+quadro ele só restaura e redesenha as casas cuja sujeira mudou, as casas
+por onde os agentes passaram e as linhas do painel que mudaram, e devolve
+os retângulos alterados para ``pygame.display.update``.
+
+Com o perfil ligado, uma sobreposição no pé do painel mostra o tempo das
+fases mais caras (veja ``perfil.py``).
+"""
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+import constantes
+
+MARGEM = 10
+
+CORES_SUJEIRA = {
+    1: (220, 220, 220),   # Poeira - cinza claro
+    2: (100, 150, 255),   # Líquido - azul
+    3: (160, 82, 45),     # Detritos - marrom
+}
+
+# Acima disso é mais barato atualizar um único retângulo que os envolva
+MAX_RETANGULOS = 64
+
+# Limite de textos renderizados guardados antes de esvaziar o cache
+MAX_TEXTOS = 4096
+
+_textos = {}
+
+
+@lru_cache(maxsize=None)
+def fonte(tamanho, bold=False, nome="arial"):
+    """Fonte do sistema, criada só na primeira vez"""
+    return pygame.font.SysFont(nome, tamanho, bold=bold)
+
+
+def texto(conteudo, tamanho, cor, bold=False, nome="arial"):
+    """Superfície com o texto renderizado, reaproveitada entre os quadros"""
+    chave = (conteudo, tamanho, cor, bold, nome)
+    superficie = _textos.get(chave)
+    if superficie is None:
+        if len(_textos) >= MAX_TEXTOS:
+            _textos.clear()
+        superficie = _textos[chave] = fonte(tamanho, bold, nome).render(conteudo, True, cor)
+    return superficie
+
+
+def tamanho_celula(grid):
+    """Tamanho da célula para o mapa caber na altura da janela"""
+    area_util = constantes.WINDOW_HEIGHT - 20
+    return max(1, min(constantes.CELL_SIZE, area_util // grid.altura, area_util // grid.largura))
+
+
+def cor_agente(agente):
+    """Cor do painel; agentes de replay informam a classe original em ``classe``"""
+    return {
+        'SimpleAgent': constantes.BLUE,
+        'ModelBasedAgent': constantes.GREEN,
+        'GoalBasedAgent': constantes.ORANGE,
+        'UtilityBasedAgent': constantes.PURPLE,
+        'AgenteBDI': (255, 0, 255)
+    }.get(getattr(agente, 'classe', agente.__class__.__name__), (255, 255, 255))
+
+
+class Renderizador:
+    """Desenha uma simulação (um mapa e seus agentes) de forma incremental"""
+
+    # Métodos cronometrados quando o perfil (perfil.py) está ligado
+    FASES = ("desenhar", "_desenhar_linhas")
+
+    def __init__(self, tela, grid, agentes):
+        self.tela = tela
+        self.grid = grid
+        self.agentes = agentes
+        self.cell_size = tamanho_celula(grid)
+        # Em mapas grandes as células ficam pequenas demais para sombra e borda
+        self.detalhes = self.cell_size >= 8
+        self.painel_x = grid.largura * self.cell_size + 30
+        self.painel_width = constantes.WINDOW_WIDTH - self.painel_x - 10
+
+        self.fundo = pygame.Surface(tela.get_size())
+        self._desenhar_fundo()
+        self.sujeira_anterior = None
+        self.posicoes = [None] * len(agentes)
+        self.linhas = [None] * len(agentes)
+        # Superfície com o texto do perfil, desenhada por cima do painel
+        self.sobreposicao = None
+
+    def rect_celula(self, x, y):
+        return pygame.Rect(MARGEM + x * self.cell_size, MARGEM + y * self.cell_size,
+                           self.cell_size, self.cell_size)
+
+    # Camada estática
+
+    def _desenhar_fundo(self):
+        fundo = self.fundo
+        cell_size = self.cell_size
+        fundo.fill((240, 240, 240))  # Cinza claro
+
+        # Grade com sombra para profundidade
+        if not self.detalhes:
+            # Sem bordas o mapa inteiro é um único retângulo branco
+            pygame.draw.rect(fundo, (255, 255, 255),
+                             (MARGEM, MARGEM, self.grid.largura * cell_size, self.grid.altura * cell_size))
+        else:
+            for x in range(self.grid.largura):
+                for y in range(self.grid.altura):
+                    rect = self.rect_celula(x, y)
+                    pygame.draw.rect(fundo, (180, 180, 180), rect.move(2, 2))
+                    pygame.draw.rect(fundo, (255, 255, 255), rect)
+                    pygame.draw.rect(fundo, (150, 150, 150), rect, 2)
+
+        # Obstáculos
+        for x, y in self.grid.lista_obstaculos():
+            rect = self.rect_celula(x, y)
+            pygame.draw.rect(fundo, (80, 80, 80), rect)
+            if self.detalhes:
+                pygame.draw.rect(fundo, (50, 50, 50), rect, 3)
+
+        self._desenhar_moldura_painel()
+
+    def _desenhar_moldura_painel(self):
+        """Partes do painel que não mudam: fundo, título e nome de cada agente"""
+        fundo = self.fundo
+        painel_x, painel_width = self.painel_x, self.painel_width
+
+        painel_rect = pygame.Rect(painel_x, 10, painel_width, constantes.WINDOW_HEIGHT - 20)
+        pygame.draw.rect(fundo, (45, 52, 70), painel_rect, border_radius=15)
+        pygame.draw.rect(fundo, (80, 90, 120), painel_rect, 3, border_radius=15)
+
+        titulo = texto("STATUS", 26, (255, 255, 255), bold=True)
+        fundo.blit(titulo, (painel_x + painel_width // 2 - titulo.get_width() // 2, 25))
+        pygame.draw.line(fundo, (100, 110, 140),
+                         (painel_x + 15, 60), (painel_x + painel_width - 15, 60), 3)
+
+        for i, agente in enumerate(self.agentes):
+            y_pos = self._y_linha(i)
+            container_rect = pygame.Rect(painel_x + 10, y_pos - 5, painel_width - 20, 95)
+            pygame.draw.rect(fundo, (55, 62, 80), container_rect, border_radius=8)
+
+            circulo = (painel_x + 32, y_pos + 22)
+            pygame.draw.circle(fundo, cor_agente(agente), circulo, 18)
+            pygame.draw.circle(fundo, (255, 255, 255), circulo, 18, 3)
+            letra = texto(agente.get_letra(), 14, (255, 255, 255), bold=True)
+            fundo.blit(letra, (circulo[0] - letra.get_width() // 2, circulo[1] - letra.get_height() // 2))
+
+            nome = texto(agente.nome, 18, (255, 255, 255), bold=True)
+            fundo.blit(nome, (painel_x + 58, y_pos))
+
+    @staticmethod
+    def _y_linha(i):
+        return 75 + i * 105
+
+    # Quadros
+
+    def desenhar(self):
+        """Atualiza a tela e retorna os retângulos que mudaram"""
+        if self.sujeira_anterior is None:
+            return self._desenhar_tudo()
+
+        sujas = set()
+        mudou = self.grid.sujeira != self.sujeira_anterior
+        if mudou.any():
+            ys, xs = np.nonzero(mudou)
+            sujas.update(zip(xs.tolist(), ys.tolist()))
+            np.copyto(self.sujeira_anterior, self.grid.sujeira)
+        for i, agente in enumerate(self.agentes):
+            atual = (agente.x, agente.y)
+            if atual != self.posicoes[i]:
+                sujas.add(self.posicoes[i])
+                sujas.add(atual)
+                self.posicoes[i] = atual
+
+        retangulos = []
+        for x, y in sujas:
+            rect = self.rect_celula(x, y)
+            self.tela.blit(self.fundo, rect, rect)
+            self._desenhar_sujeira(x, y)
+            retangulos.append(rect)
+        for agente in self.agentes:
+            if (agente.x, agente.y) in sujas:
+                self._desenhar_agente(agente)
+
+        retangulos.extend(self._desenhar_linhas())
+        if self.sobreposicao is not None:
+            retangulos.append(self._desenhar_sobreposicao())
+        if len(retangulos) > MAX_RETANGULOS:
+            return [retangulos[0].unionall(retangulos[1:])]
+        return retangulos
+
+    def _desenhar_tudo(self):
+        self.tela.blit(self.fundo, (0, 0))
+        xs, ys, _ = self.grid.sujeiras()
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            self._desenhar_sujeira(x, y)
+        for i, agente in enumerate(self.agentes):
+            self._desenhar_agente(agente)
+            self.posicoes[i] = (agente.x, agente.y)
+        self._desenhar_linhas()
+        if self.sobreposicao is not None:
+            self._desenhar_sobreposicao()
+        self.sujeira_anterior = self.grid.sujeira.copy()
+        return [self.tela.get_rect()]
+
+    def _desenhar_sujeira(self, x, y):
+        valor = self.grid.sujeira.item(y, x)
+        if not valor:
+            return
+        cell_size = self.cell_size
+        centro = (MARGEM + x * cell_size + cell_size // 2, MARGEM + y * cell_size + cell_size // 2)
+        raio = max(1, min(12, cell_size // 4))
+
+        # Sujeira com borda
+        pygame.draw.circle(self.tela, CORES_SUJEIRA.get(valor, (0, 0, 0)), centro, raio)
+        if not self.detalhes:
+            return
+        pygame.draw.circle(self.tela, (0, 0, 0), centro, raio, 2)
+
+        # Valor da sujeira centralizado
+        if cell_size >= 40:
+            rotulo = texto(str(valor), 16, (0, 0, 0), bold=True)
+            self.tela.blit(rotulo, (centro[0] - rotulo.get_width() // 2, centro[1] - rotulo.get_height() // 2))
+
+    def _desenhar_agente(self, agente):
+        # A sombra do agente não pode vazar para uma casa que não será restaurada
+        self.tela.set_clip(self.rect_celula(agente.x, agente.y))
+        agente.desenhar(self.tela, MARGEM, self.cell_size)
+        self.tela.set_clip(None)
+
+    def _desenhar_linhas(self):
+        """Redesenha pontos, bateria e posição dos agentes que mudaram"""
+        retangulos = []
+        x_info = self.painel_x + 58
+        largura_info = self.painel_width - 70
+        for i, agente in enumerate(self.agentes):
+            estado = (agente.pontuacao, agente.bateria, agente.x, agente.y)
+            if estado == self.linhas[i]:
+                continue
+            self.linhas[i] = estado
+
+            info_y = self._y_linha(i) + 26
+            rect = pygame.Rect(x_info, info_y, largura_info, 64)
+            self.tela.blit(self.fundo, rect, rect)
+
+            self.tela.blit(texto(f"⭐ {agente.pontuacao}", 15, (255, 215, 0)), (x_info, info_y))
+            # Bateria com cor dinâmica
+            bat_cor = (0, 255, 0) if agente.bateria > 15 else (255, 100, 0) if agente.bateria > 5 else (255, 0, 0)
+            self.tela.blit(texto(f"🔋 {agente.bateria}", 15, bat_cor), (x_info, info_y + 22))
+            self.tela.blit(texto(f"📍 ({agente.x},{agente.y})", 15, (200, 200, 255)), (x_info, info_y + 44))
+            retangulos.append(rect)
+        return retangulos
+
+    # Sobreposição do perfil
+
+    def definir_sobreposicao(self, linhas):
+        """Mostra ``linhas`` no pé do painel; ``None`` remove a sobreposição"""
+        if linhas is None:
+            if self.sobreposicao is not None:
+                self.sobreposicao = None
+                # O que estava embaixo precisa ser desenhado de novo
+                self.sujeira_anterior = None
+            return
+        altura_linha = 15
+        superficie = pygame.Surface((self.painel_width - 20, 10 + altura_linha * max(1, len(linhas))))
+        # Opaca: é redesenhada a cada quadro sem restaurar o que há embaixo
+        superficie.fill((20, 24, 32))
+        for i, linha in enumerate(linhas):
+            superficie.blit(texto(linha, 12, (180, 255, 180)), (6, 5 + i * altura_linha))
+        self.sobreposicao = superficie
+
+    def _desenhar_sobreposicao(self):
+        rect = self.sobreposicao.get_rect(bottomleft=(self.painel_x + 10, constantes.WINDOW_HEIGHT - 20))
+        self.tela.blit(self.sobreposicao, rect)
+        return rect
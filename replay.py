@@ -0,0 +1,346 @@
+"""Gravação e reprodução de episódios em formato binário compacto.
+
+O arquivo guarda o mapa inicial e, a cada passo da simulação, as ações
+dos agentes (andar, aspirar, parar). A cada ``intervalo`` passos vem um
+quadro-chave com o estado completo (agentes e sujeira comprimida), e um
+índice no fim do arquivo aponta para eles. Para ir a um passo qualquer, o
+``Replay`` carrega o quadro-chave anterior e aplica no máximo ``intervalo``
+passos, sem rodar a lógica dos agentes.
+
+Formato (little-endian):
+
+    cabeçalho   magica, versao, largura, altura, intervalo, n_agentes
+    agentes     nome, classe e letra (tamanho + UTF-8) e cor RGB de cada um
+    obstáculos  máscara com um bit por casa
+    quadro 0    estado inicial
+    passos      n_eventos (u16) + eventos (agente u16, ação u8 [, valor u8]);
+                depois do passo ``k`` múltiplo de ``intervalo`` vem o quadro k
+    índice      n_quadros + (passo u32, posição u64) de cada quadro
+    rodapé      posição do índice (u64), total de passos (u32), magica final
+
+Uso pela linha de comando:
+
+    python simulacao.py --agentes AgenteBDI --replay bdi.rpl
+    python replay.py bdi.rpl --passo 40000
+"""
+import argparse
+import struct
+import zlib
+
+import numpy as np
+
+import constantes
+from agents.base_agent import BaseAgent
+from grid import Grid
+from planejamento import DIRECOES
+
+MAGICA = b"ASPR"
+MAGICA_FIM = b"RPL!"
+VERSAO = 1
+INTERVALO_QUADROS = 256
+
+# Ações: 0-3 são movimentos na ordem de DIRECOES
+ACAO_ASPIRAR = 4
+ACAO_PARAR = 5
+
+_CABECALHO = struct.Struct("<4sBHHHI")
+_COR = struct.Struct("<BBB")
+_AGENTE = struct.Struct("<HHhiB")  # x, y, bateria, pontuacao, executando
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_EVENTO = struct.Struct("<HB")
+_ENTRADA_INDICE = struct.Struct("<IQ")
+_RODAPE = struct.Struct("<QI4s")
+
+_CODIGO_DIRECAO = {direcao: i for i, direcao in enumerate(DIRECOES)}
+
+
+def _texto(conteudo):
+    dados = conteudo.encode("utf-8")
+    return bytes([len(dados)]) + dados
+
+
+class GravadorReplay:
+    """Grava um episódio enquanto ele roda.
+
+    Os agentes avisam o gravador de cada ação (``BaseAgent.gravador``);
+    quem roda a simulação chama ``fim_passo`` depois de cada
+    instante e ``fechar`` no fim.
+    """
+
+    def __init__(self, caminho, grid, agentes, intervalo=INTERVALO_QUADROS):
+        self.arquivo = open(caminho, "wb")
+        self.grid = grid
+        self.agentes = agentes
+        self.intervalo = intervalo
+        self.passo = 0
+        self.eventos = bytearray()
+        self.n_eventos = 0
+        self.indice = []
+        self.indices_agentes = {id(agente): i for i, agente in enumerate(agentes)}
+
+        cabecalho = bytearray(_CABECALHO.pack(MAGICA, VERSAO, grid.largura, grid.altura,
+                                              intervalo, len(agentes)))
+        for agente in agentes:
+            cabecalho += _texto(agente.nome)
+            cabecalho += _texto(agente.__class__.__name__)
+            cabecalho += _texto(agente.get_letra())
+            cabecalho += _COR.pack(*agente.get_cor())
+        cabecalho += np.packbits(grid.obstaculos, axis=None).tobytes()
+        self.arquivo.write(cabecalho)
+        self._gravar_quadro()
+
+        for agente in agentes:
+            agente.gravador = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # Avisos dos agentes
+
+    def _evento(self, agente, acao):
+        self.eventos += _EVENTO.pack(self.indices_agentes[id(agente)], acao)
+        self.n_eventos += 1
+
+    def mover(self, agente, dx, dy):
+        self._evento(agente, _CODIGO_DIRECAO[(dx, dy)])
+
+    def aspirar(self, agente, valor):
+        self._evento(agente, ACAO_ASPIRAR)
+        self.eventos.append(valor)
+
+    def parar(self, agente):
+        self._evento(agente, ACAO_PARAR)
+
+    # Passos
+
+    def fim_passo(self):
+        """Grava as ações do passo que terminou"""
+        self.arquivo.write(_U16.pack(self.n_eventos))
+        self.arquivo.write(self.eventos)
+        self.eventos.clear()
+        self.n_eventos = 0
+        self.passo += 1
+        if self.passo % self.intervalo == 0:
+            self._gravar_quadro()
+
+    def _gravar_quadro(self):
+        self.indice.append((self.passo, self.arquivo.tell()))
+        dados = bytearray(_U32.pack(self.passo))
+        for agente in self.agentes:
+            dados += _AGENTE.pack(agente.x, agente.y, agente.bateria, agente.pontuacao,
+                                  agente.executando)
+        sujeira = zlib.compress(self.grid.sujeira.tobytes())
+        dados += _U32.pack(len(sujeira)) + sujeira
+        self.arquivo.write(dados)
+
+    def fechar(self):
+        if self.arquivo.closed:
+            return
+        for agente in self.agentes:
+            agente.gravador = None
+        posicao_indice = self.arquivo.tell()
+        self.arquivo.write(_U32.pack(len(self.indice)))
+        for entrada in self.indice:
+            self.arquivo.write(_ENTRADA_INDICE.pack(*entrada))
+        self.arquivo.write(_RODAPE.pack(posicao_indice, self.passo, MAGICA_FIM))
+        self.arquivo.close()
+
+
+class AgenteReplay:
+    """Estado de um agente reconstruído a partir do replay.
+
+    Tem os atributos que o ``Renderizador`` usa, então pode ser desenhado
+    como um agente de verdade.
+    """
+
+    __slots__ = ("nome", "classe", "letra", "cor", "x", "y", "bateria", "pontuacao", "executando")
+
+    def __init__(self, nome, classe, letra, cor):
+        self.nome = nome
+        self.classe = classe
+        self.letra = letra
+        self.cor = cor
+        self.x = self.y = self.bateria = self.pontuacao = 0
+        self.executando = True
+
+    def get_cor(self):
+        return self.cor
+
+    def get_letra(self):
+        return self.letra
+
+    desenhar = BaseAgent.desenhar
+
+
+class Replay:
+    """Lê um replay e reconstrói o estado em qualquer passo.
+
+    ``grid`` e ``agentes`` são atualizados no lugar, então quem os desenha
+    não precisa ser avisado das mudanças.
+    """
+
+    def __init__(self, caminho):
+        with open(caminho, "rb") as arquivo:
+            self.dados = dados = arquivo.read()
+
+        magica, versao, largura, altura, self.intervalo, n_agentes = _CABECALHO.unpack_from(dados, 0)
+        if magica != MAGICA or dados[-4:] != MAGICA_FIM:
+            raise ValueError(f"{caminho} não é um replay")
+        if versao != VERSAO:
+            raise ValueError(f"versão de replay não suportada: {versao}")
+
+        posicao = _CABECALHO.size
+        self.agentes = []
+        for _ in range(n_agentes):
+            campos = []
+            for _ in range(3):
+                tamanho = dados[posicao]
+                campos.append(dados[posicao + 1:posicao + 1 + tamanho].decode("utf-8"))
+                posicao += 1 + tamanho
+            self.agentes.append(AgenteReplay(*campos, _COR.unpack_from(dados, posicao)))
+            posicao += _COR.size
+
+        self.grid = Grid(largura, altura)
+        bits = (largura * altura + 7) // 8
+        mascara = np.unpackbits(np.frombuffer(dados, np.uint8, bits, posicao), count=largura * altura)
+        self.grid.obstaculos[:] = mascara.reshape(altura, largura).astype(bool)
+
+        posicao_indice, self.total_passos, _ = _RODAPE.unpack_from(dados, len(dados) - _RODAPE.size)
+        n_quadros, = _U32.unpack_from(dados, posicao_indice)
+        self.quadros = [_ENTRADA_INDICE.unpack_from(dados, posicao_indice + _U32.size + i * _ENTRADA_INDICE.size)
+                        for i in range(n_quadros)]
+
+        self.passo = 0
+        self.posicao = 0
+        self._carregar_quadro(0)
+
+    def _carregar_quadro(self, i):
+        """Restaura o estado do i-ésimo quadro-chave"""
+        passo, posicao = self.quadros[i]
+        posicao += _U32.size
+        for agente in self.agentes:
+            agente.x, agente.y, agente.bateria, agente.pontuacao, executando = \
+                _AGENTE.unpack_from(self.dados, posicao)
+            agente.executando = bool(executando)
+            posicao += _AGENTE.size
+        tamanho, = _U32.unpack_from(self.dados, posicao)
+        posicao += _U32.size
+        sujeira = zlib.decompress(self.dados[posicao:posicao + tamanho])
+        self.grid.definir_sujeira(np.frombuffer(sujeira, np.uint8).reshape(self.grid.altura, self.grid.largura))
+        self.passo = passo
+        self.posicao = posicao + tamanho
+
+    def _pular_quadro(self):
+        posicao = self.posicao + _U32.size + len(self.agentes) * _AGENTE.size
+        tamanho, = _U32.unpack_from(self.dados, posicao)
+        self.posicao = posicao + _U32.size + tamanho
+
+    def avancar(self):
+        """Aplica o próximo passo; retorna False se o replay acabou"""
+        if self.passo >= self.total_passos:
+            return False
+        dados, grid, agentes = self.dados, self.grid, self.agentes
+        n_eventos, = _U16.unpack_from(dados, self.posicao)
+        posicao = self.posicao + _U16.size
+        for _ in range(n_eventos):
+            i, acao = _EVENTO.unpack_from(dados, posicao)
+            posicao += _EVENTO.size
+            agente = agentes[i]
+            if acao < ACAO_ASPIRAR:
+                dx, dy = DIRECOES[acao]
+                agente.x += dx
+                agente.y += dy
+                agente.bateria -= 1
+            elif acao == ACAO_ASPIRAR:
+                agente.pontuacao += dados[posicao]
+                agente.bateria -= 2
+                grid.limpar(agente.x, agente.y)
+                posicao += 1
+            else:
+                agente.executando = False
+        self.posicao = posicao
+        self.passo += 1
+        if self.passo % self.intervalo == 0:
+            self._pular_quadro()
+        return True
+
+    def ir_para(self, passo):
+        """Reconstrói o estado depois de ``passo`` passos"""
+        passo = max(0, min(passo, self.total_passos))
+        # Só volta ao quadro-chave se o destino estiver atrás ou depois do próximo quadro
+        if passo < self.passo or passo // self.intervalo > self.passo // self.intervalo:
+            self._carregar_quadro(min(passo // self.intervalo, len(self.quadros) - 1))
+        while self.passo < passo:
+            self.avancar()
+        return self.passo
+
+
+def main(argv=None):
+    """Visualizador: espaço toca/pausa, ←/→ um passo, PgUp/PgDn um quadro-chave"""
+    parser = argparse.ArgumentParser(description="Reproduz um replay gravado")
+    parser.add_argument("arquivo")
+    parser.add_argument("--passo", type=int, default=0, help="passo inicial")
+    args = parser.parse_args(argv)
+
+    import pygame
+    from agendador import Agendador
+    from renderizacao import Renderizador
+
+    replay = Replay(args.arquivo)
+    replay.ir_para(args.passo)
+
+    pygame.init()
+    tela = pygame.display.set_mode((constantes.WINDOW_WIDTH, constantes.WINDOW_HEIGHT))
+    renderizador = Renderizador(tela, replay.grid, replay.agentes)
+    agendador = Agendador(replay.total_passos)
+    agendador.instante = replay.passo
+    agendador.pausado = True
+    relogio = pygame.time.Clock()
+
+    while True:
+        destino = None
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if evento.type != pygame.KEYDOWN:
+                continue
+            if evento.key == pygame.K_SPACE:
+                agendador.alternar_pausa()
+            elif evento.key == pygame.K_RIGHT:
+                destino = replay.passo + 1
+            elif evento.key == pygame.K_LEFT:
+                destino = replay.passo - 1
+            elif evento.key == pygame.K_PAGEDOWN:
+                destino = replay.passo + replay.intervalo
+            elif evento.key == pygame.K_PAGEUP:
+                destino = replay.passo - replay.intervalo
+            elif evento.key == pygame.K_HOME:
+                destino = 0
+            elif evento.key == pygame.K_END:
+                destino = replay.total_passos
+            elif pygame.K_1 <= evento.key <= pygame.K_4:
+                agendador.definir_velocidade(evento.key - pygame.K_1)
+
+        if destino is not None:
+            agendador.pausado = True
+            agendador.instante = replay.ir_para(destino)
+
+        dt = min(relogio.tick(constantes.FPS) / 1000, 0.25)
+        agendador.avancar(dt, replay.avancar)
+        pygame.display.set_caption(f"Replay {args.arquivo} - passo {replay.passo}/{replay.total_passos} "
+                                   f"[{agendador.descricao()}]")
+        pygame.display.update(renderizador.desenhar())
+
+
+if __name__ == "__main__":
+    # Mesma janela do simulador
+    constantes.WINDOW_WIDTH = 900
+    constantes.WINDOW_HEIGHT = 600
+    constantes.CELL_SIZE = 110
+    constantes.FPS = 60
+    main()
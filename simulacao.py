@@ -0,0 +1,241 @@
+"""Motor de simulação sem interface gráfica (headless).
+
+Executa os mesmos geradores ``BaseAgent.executar`` usados em ``main.py``,
+mas sem janela do pygame e sem limitador de FPS.
+
+Uso pela linha de comando:
+
+    python simulacao.py --agentes SimpleAgent AgenteBDI --episodios 1000 --semente 42
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+import simpy
+
+from agents.simple_agent import SimpleAgent
+from agents.model_based_agent import ModelBasedAgent
+from agents.goal_based_agent import GoalBasedAgent
+from agents.utility_based_agent import UtilityBasedAgent
+from agents.agente_bdi import AgenteBDI
+from ambiente import gerar_ambiente, copiar_grid, posicao_inicial
+from rastreamento import NOMES_NIVEIS, rastro
+from replay import GravadorReplay
+from historico import CAMINHO_PADRAO, Historico, descrever_mapa
+from mapas import carregar_mapa
+from perfil import perfil
+from piso import Piso
+from planejamento import cache_campos
+from simulador_tempo import AgendaVazia, SimuladorTempo
+
+# Classes de agentes e o nome exibido de cada uma
+AGENTES = {
+    "SimpleAgent": (SimpleAgent, "Simples"),
+    "ModelBasedAgent": (ModelBasedAgent, "Modelo"),
+    "GoalBasedAgent": (GoalBasedAgent, "Objetivo"),
+    "UtilityBasedAgent": (UtilityBasedAgent, "Utilidade"),
+    "AgenteBDI": (AgenteBDI, "BDI"),
+}
+
+# Limite de instantes de um episódio, também usado pelo modo visual
+# (120 segundos a 2 instantes por segundo na velocidade 1x)
+PASSOS_PADRAO = 240
+
+# Motores de eventos: o núcleo próprio (padrão) e o SimPy, para comparação
+MOTORES = {
+    "nativo": SimuladorTempo,
+    "simpy": simpy.Environment,
+}
+MOTOR_PADRAO = "nativo"
+
+# Exceções que os motores levantam quando não há mais eventos
+AGENDA_VAZIA = (AgendaVazia, simpy.core.EmptySchedule)
+
+
+def criar_ambiente(motor=MOTOR_PADRAO):
+    """Ambiente de eventos do motor escolhido (veja ``MOTORES``)"""
+    return MOTORES[motor]()
+
+
+def resolver_classe(agente):
+    """Aceita uma classe de agente ou o nome dela ("SimpleAgent", ...)"""
+    if isinstance(agente, str):
+        if agente not in AGENTES:
+            raise ValueError(f"Agente desconhecido: {agente}")
+        return AGENTES[agente][0]
+    return agente
+
+
+def nome_agente(classe):
+    """Nome exibido do agente (o mesmo usado na interface)"""
+    return AGENTES.get(classe.__name__, (classe, classe.__name__))[1]
+
+
+def criar_agentes(agent_classes, ambiente, x, y, grid, obstacles):
+    """Instancia os agentes na posição inicial, compartilhando o grid.
+
+    Com mais de um agente, eles dividem um ``Piso``: não atravessam uns
+    aos outros e não disputam a mesma sujeira. Os campos de distância de
+    episódios anteriores não servem mais e saem do cache.
+    """
+    cache_campos.limpar()
+    agentes = []
+    for agente in agent_classes:
+        classe = resolver_classe(agente)
+        agentes.append(classe(nome_agente(classe), ambiente, x, y, grid, obstacles))
+    if len(agentes) > 1:
+        piso = Piso(grid.largura, grid.altura, ambiente)
+        for agente in agentes:
+            piso.adicionar(agente)
+    return agentes
+
+
+def montar_resultado(agentes, passos=None):
+    """Monta o registro de uma simulação no formato do histórico"""
+    timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+
+    resultados = []
+    for agente in agentes:
+        resultados.append({
+            'nome': agente.nome,
+            'pontuacao': agente.pontuacao,
+            'bateria': agente.bateria,
+        })
+
+    return {
+        'timestamp': timestamp,
+        'passos': passos,
+        'resultados': resultados
+    }
+
+
+def run_episode(agent_classes, grid, obstacles, seed=None, max_steps=PASSOS_PADRAO, replay=None,
+                motor=MOTOR_PADRAO):
+    """Executa um episódio completo sem desenhar nada.
+
+    O grid recebido não é alterado: os agentes trabalham sobre uma cópia,
+    como em ``executar_simulacao``. Retorna o mesmo dicionário que é
+    gravado no histórico. Se ``replay`` for um caminho, o
+    episódio é gravado nele (veja ``replay.py``). ``motor`` escolhe o
+    núcleo de eventos; os dois dão o mesmo resultado.
+
+    ``max_steps`` é em instantes da simulação: em cada instante rodam
+    todos os eventos agendados até ele (``peek()``), então cada agente age
+    uma vez por instante qualquer que seja o número de agentes. O
+    ``'passos'`` do resultado é o número de instantes rodados.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    ambiente = criar_ambiente(motor)
+    grid_simulacao = copiar_grid(grid)
+
+    # Todos começam no centro do mapa
+    x, y = posicao_inicial(grid_simulacao)
+    agentes = criar_agentes(agent_classes, ambiente, x, y, grid_simulacao, obstacles)
+    gravador = GravadorReplay(replay, grid_simulacao, agentes) if replay is not None else None
+
+    instante = 0
+    try:
+        while instante < max_steps and ambiente.peek() != float("inf"):
+            while ambiente.peek() <= instante:
+                if perfil.ativo:
+                    inicio = time.perf_counter_ns()
+                ambiente.step()
+                if perfil.ativo:
+                    perfil.registrar("ambiente.step", time.perf_counter_ns() - inicio)
+            instante += 1
+            if gravador is not None:
+                gravador.fim_passo()
+
+            if not any(agente.executando and agente.bateria > 0 for agente in agentes):
+                break
+    finally:
+        # Mesmo se o episódio falhar, o replay sai com o índice e o arquivo fechado
+        if gravador is not None:
+            gravador.fechar()
+    return montar_resultado(agentes, instante)
+
+
+def main(argv=None):
+    """Linha de comando: roda vários episódios e mostra a média por agente"""
+    parser = argparse.ArgumentParser(description="Simulação headless do robô aspirador")
+    parser.add_argument("--agentes", nargs="+", default=list(AGENTES),
+                        choices=list(AGENTES), help="classes de agentes (padrão: todas)")
+    parser.add_argument("--episodios", type=int, default=1)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--passos", type=int, default=PASSOS_PADRAO)
+    parser.add_argument("--largura", type=int, default=None)
+    parser.add_argument("--altura", type=int, default=None)
+    parser.add_argument("--mapa", default=None,
+                        help="arquivo de mapa (veja mapas.py) usado em todos os episódios")
+    parser.add_argument("--conectado", action="store_true",
+                        help="gera mapas em que toda casa livre é alcançável do início")
+    parser.add_argument("--juntos", action="store_true",
+                        help="todos os agentes no mesmo mapa (modo \"Todos\")")
+    parser.add_argument("--rastro", choices=list(NOMES_NIVEIS), default="desligado",
+                        help="nível do rastreamento de eventos dos agentes")
+    parser.add_argument("--rastro-jsonl", default=None,
+                        help="arquivo que recebe os eventos, um JSON por linha")
+    parser.add_argument("--replay", default=None,
+                        help="grava o primeiro episódio neste arquivo; aceita {episodio} e {agente} "
+                             "para gravar todos")
+    parser.add_argument("--historico", nargs="?", const=CAMINHO_PADRAO, default=None,
+                        help="grava os episódios no banco de histórico (padrão: historico.db)")
+    parser.add_argument("--perfil", default=None,
+                        help="cronometra as fases dos agentes e grava os histogramas neste arquivo JSON")
+    parser.add_argument("--motor", choices=list(MOTORES), default=MOTOR_PADRAO,
+                        help="núcleo de eventos (padrão: %(default)s)")
+    args = parser.parse_args(argv)
+
+    rastro.configurar(NOMES_NIVEIS[args.rastro], jsonl=args.rastro_jsonl)
+    if args.perfil:
+        perfil.configurar(True, [resolver_classe(agente) for agente in args.agentes])
+
+    grupos = [args.agentes] if args.juntos else [[agente] for agente in args.agentes]
+    totais = {}
+    historico = Historico(args.historico) if args.historico else None
+    mapa_arquivo = carregar_mapa(args.mapa) if args.mapa else None
+    registros = []
+
+    inicio = time.perf_counter()
+    for episodio in range(args.episodios):
+        semente = args.semente + episodio
+        if args.mapa:
+            grid, obstacles = mapa_arquivo
+        else:
+            grid, obstacles = gerar_ambiente(args.largura, args.altura, semente=semente,
+                                             conectado=args.conectado)
+        mapa = descrever_mapa(grid) if historico is not None else None
+        for grupo in grupos:
+            replay = None
+            if args.replay and ("{" in args.replay or (episodio == 0 and grupo is grupos[0])):
+                replay = args.replay.format(episodio=episodio, agente="-".join(grupo))
+            resultado = run_episode(grupo, grid, obstacles, seed=semente, max_steps=args.passos,
+                                    replay=replay, motor=args.motor)
+            for r in resultado['resultados']:
+                totais.setdefault(r['nome'], []).append(r['pontuacao'])
+            if historico is not None:
+                registros.append((resultado, mapa, semente))
+        # Grava em lotes: uma transação por episódio deixaria tudo lento
+        if historico is not None and (len(registros) >= 1000 or episodio == args.episodios - 1):
+            historico.registrar_lote(registros)
+            registros.clear()
+    duracao = time.perf_counter() - inicio
+    rastro.fechar()
+    if args.perfil:
+        perfil.configurar(False)
+        perfil.salvar(args.perfil)
+    if historico is not None:
+        historico.fechar()
+
+    total_episodios = args.episodios * len(grupos)
+    print(f"{total_episodios} episódios em {duracao:.2f}s "
+          f"({total_episodios / max(duracao, 1e-9):.0f} episódios/s)")
+    for nome, pontos in sorted(totais.items(), key=lambda item: -sum(item[1])):
+        print(f"{nome}: média {sum(pontos) / len(pontos):.2f} pts em {len(pontos)} episódios")
+
+
+if __name__ == "__main__":
+    main()
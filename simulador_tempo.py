@@ -1,28 +1,140 @@
+"""Núcleo de eventos discretos próprio, alternativa leve ao SimPy.
+
+Implementa só o que os agentes usam do ``simpy.Environment``:
+``process(gerador)``, ``timeout(atraso)``, ``step()`` e ``now``. Cada
+processo é um gerador que faz ``yield ambiente.timeout(n)`` para dormir
+``n`` unidades de tempo, então agentes com períodos diferentes convivem
+na mesma agenda.
+
+A agenda é um heap com os instantes em que algum processo acorda e, para
+cada instante, uma fila dos processos que acordam nele. ``timeout``
+devolve o próprio atraso, sem criar objeto de evento, e as filas
+esvaziadas são reaproveitadas, então um passo não aloca nada.
+
+A ordem dos eventos é a mesma do SimPy (por tempo; no mesmo instante,
+inícios de processo antes dos demais e depois a ordem de criação), e o fim
+de um processo também conta como um passo, como no SimPy. Com isso um
+episódio dá o mesmo resultado nos dois motores.
+
+Uso pela linha de comando (benchmark contra o SimPy):
+
+    python simulador_tempo.py --agentes 1 100 10000
+"""
+import argparse
+import heapq
+import time
+from collections import deque
+
+
+class AgendaVazia(Exception):
+    """Não há mais eventos agendados (equivale a ``simpy.core.EmptySchedule``)"""
+
+
+class _Fim:
+    """Marca, na fila de um instante, o evento de término de um processo"""
+
+    __slots__ = ()
+
+
+_FIM = _Fim()
+
+
 class SimuladorTempo:
-    """Classe simples para simular o tempo sem SimPy"""
+    """Agenda de processos com tempo discreto e a interface usada do SimPy"""
+
+    __slots__ = ("now", "instantes", "filas", "iniciando", "filas_livres")
+
     def __init__(self):
-        self.tempo = 0
-        self.processos = []
-    
-    def process(self, generator):
-        """Adiciona um processo ao simulador"""
-        self.processos.append(generator)
-    
+        self.now = 0
+        # Heap dos instantes que têm fila; cada instante aparece uma vez
+        self.instantes = []
+        self.filas = {}
+        # Processos registrados e ainda não iniciados (rodam antes dos demais)
+        self.iniciando = deque()
+        self.filas_livres = []
+
+    def process(self, gerador):
+        """Registra um processo; ele roda pela primeira vez no instante atual"""
+        self.iniciando.append(gerador)
+        return gerador
+
+    def timeout(self, atraso=1):
+        """Valor para ``yield``: o processo dorme ``atraso`` unidades de tempo"""
+        return atraso
+
+    def _agendar(self, instante, item):
+        fila = self.filas.get(instante)
+        if fila is None:
+            fila = self.filas_livres.pop() if self.filas_livres else deque()
+            self.filas[instante] = fila
+            heapq.heappush(self.instantes, instante)
+        fila.append(item)
+
     def step(self):
-        """Executa um passo de todos os processos"""
-        self.tempo += 1
-        processos_ativos = []
-        
-        for processo in self.processos:
-            try:
-                next(processo)
-                processos_ativos.append(processo)
-            except StopIteration:
-                pass  # Processo terminou
-        
-        self.processos = processos_ativos
-
-    def timeout(self, delay):
-        """Simula um timeout (para compatibilidade com SimPy)"""
-        for _ in range(delay):
-            yield None
\ No newline at end of file
+        """Processa um único evento: acorda um processo ou encerra um"""
+        if self.iniciando:
+            gerador = self.iniciando.popleft()
+        else:
+            if not self.instantes:
+                raise AgendaVazia()
+            instante = self.instantes[0]
+            fila = self.filas[instante]
+            self.now = instante
+            gerador = fila.popleft()
+            if not fila:
+                heapq.heappop(self.instantes)
+                del self.filas[instante]
+                self.filas_livres.append(fila)
+            if gerador is _FIM:
+                return
+
+        try:
+            atraso = next(gerador)
+        except StopIteration:
+            self._agendar(self.now, _FIM)
+            return
+        self._agendar(self.now + atraso, gerador)
+
+    def peek(self):
+        """Instante do próximo evento (infinito se não houver)"""
+        if self.iniciando:
+            return self.now
+        return self.instantes[0] if self.instantes else float("inf")
+
+
+def _processo_benchmark(ambiente, periodo, passos):
+    """Processo mínimo: só dorme ``periodo`` a cada ação"""
+    for _ in range(passos):
+        yield ambiente.timeout(periodo)
+
+
+def medir(criar_ambiente, n_agentes, passos_totais):
+    """Passos por segundo de um motor com ``n_agentes`` de períodos 1, 2 e 3"""
+    ambiente = criar_ambiente()
+    passos_por_agente = passos_totais // n_agentes + 1
+    for i in range(n_agentes):
+        ambiente.process(_processo_benchmark(ambiente, 1 + i % 3, passos_por_agente))
+    inicio = time.perf_counter()
+    for _ in range(passos_totais):
+        ambiente.step()
+    return passos_totais / (time.perf_counter() - inicio)
+
+
+def main(argv=None):
+    """Compara o núcleo próprio com o SimPy em passos (eventos) por segundo"""
+    parser = argparse.ArgumentParser(description="Benchmark do núcleo de eventos")
+    parser.add_argument("--agentes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--passos", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    import simpy
+    motores = {"nativo": SimuladorTempo, "simpy": simpy.Environment}
+    for n_agentes in args.agentes:
+        resultados = {nome: medir(criar, n_agentes, args.passos) for nome, criar in motores.items()}
+        print(f"{n_agentes:>6} agentes: "
+              + ", ".join(f"{nome} {valor:,.0f} passos/s" for nome, valor in resultados.items())
+              + f" ({resultados['nativo'] / resultados['simpy']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
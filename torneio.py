@@ -0,0 +1,162 @@
+"""Torneio entre classes de agentes, distribuído em vários processos.
+
+Cada mapa é gerado por ``gerar_ambiente`` a partir de uma semente própria,
+e todas as classes jogam numa cópia idêntica desse mapa. Os processos
+recebem apenas intervalos de sementes e devolvem as pontuações, então o
+tráfego entre processos é mínimo e o torneio escala com o número de núcleos.
+
+Uso pela linha de comando:
+
+    python torneio.py --mapas 100000 --processos 64
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+from array import array
+from itertools import combinations
+
+from ambiente import gerar_ambiente
+from mapas import carregar_mapa
+from simulacao import AGENTES, PASSOS_PADRAO, nome_agente, resolver_classe, run_episode
+
+
+def _rodar_lote(tarefa):
+    """Roda todas as classes em cada mapa de um intervalo de sementes.
+
+    Com um arquivo de mapa, todas as sementes usam esse mapa (mapeado em
+    memória, então os processos compartilham os dados) e só a aleatoriedade
+    dos agentes muda. Retorna as pontuações achatadas: para cada mapa, uma
+    por classe.
+    """
+    inicio, fim, nomes_classes, max_steps, largura, altura, caminho_mapa = tarefa
+    classes = [resolver_classe(nome) for nome in nomes_classes]
+    pontuacoes = array("i")
+    if caminho_mapa is not None:
+        grid, obstacles = carregar_mapa(caminho_mapa)
+
+    for semente in range(inicio, fim):
+        if caminho_mapa is None:
+            grid, obstacles = gerar_ambiente(largura, altura, semente=semente)
+        for classe in classes:
+            resultado = run_episode([classe], grid, obstacles, seed=semente, max_steps=max_steps)
+            pontuacoes.append(resultado['resultados'][0]['pontuacao'])
+
+    return inicio, pontuacoes
+
+
+def _dividir(num_mapas, semente, processos, tamanho_lote):
+    """Divide os mapas em lotes de sementes consecutivas"""
+    if tamanho_lote is None:
+        # Alguns lotes por processo para balancear a carga sem excesso de mensagens
+        tamanho_lote = max(1, min(1000, num_mapas // (processos * 8) or 1))
+    for inicio in range(semente, semente + num_mapas, tamanho_lote):
+        yield inicio, min(inicio + tamanho_lote, semente + num_mapas)
+
+
+def executar_torneio(num_mapas, agent_classes=None, semente=0, processos=None,
+                     max_steps=PASSOS_PADRAO, tamanho_lote=None, largura=None, altura=None,
+                     caminho_mapa=None):
+    """Executa o torneio e retorna distribuições e confrontos diretos.
+
+    O resultado é um dicionário com:
+      - ``distribuicoes``: nome do agente -> lista de pontuações (uma por mapa)
+      - ``resumo``: nome -> média, desvio padrão, mínimo e máximo
+      - ``confrontos``: (nome_a, nome_b) -> vitórias, empates, derrotas e
+        taxa de vitória de ``nome_a`` contra ``nome_b`` no mesmo mapa
+    """
+    if agent_classes is None:
+        agent_classes = list(AGENTES)
+    nomes_classes = [resolver_classe(agente).__name__ for agente in agent_classes]
+    nomes = [nome_agente(resolver_classe(agente)) for agente in agent_classes]
+    processos = processos or os.cpu_count() or 1
+
+    tarefas = [(inicio, fim, nomes_classes, max_steps, largura, altura, caminho_mapa)
+               for inicio, fim in _dividir(num_mapas, semente, processos, tamanho_lote)]
+
+    if processos == 1:
+        lotes = [_rodar_lote(tarefa) for tarefa in tarefas]
+    else:
+        with multiprocessing.Pool(processos) as pool:
+            lotes = list(pool.imap_unordered(_rodar_lote, tarefas))
+
+    # Ordena pelos intervalos de sementes para o resultado ser determinístico
+    lotes.sort(key=lambda lote: lote[0])
+    n = len(nomes)
+    distribuicoes = {nome: [] for nome in nomes}
+    confrontos = {(a, b): {'vitorias': 0, 'empates': 0, 'derrotas': 0}
+                  for a, b in combinations(nomes, 2)}
+
+    for _, pontuacoes in lotes:
+        for i in range(0, len(pontuacoes), n):
+            mapa = pontuacoes[i:i + n]
+            for nome, pontos in zip(nomes, mapa):
+                distribuicoes[nome].append(pontos)
+            for (ia, a), (ib, b) in combinations(enumerate(nomes), 2):
+                if mapa[ia] > mapa[ib]:
+                    confrontos[(a, b)]['vitorias'] += 1
+                elif mapa[ia] < mapa[ib]:
+                    confrontos[(a, b)]['derrotas'] += 1
+                else:
+                    confrontos[(a, b)]['empates'] += 1
+
+    for contagem in confrontos.values():
+        total = contagem['vitorias'] + contagem['empates'] + contagem['derrotas']
+        # Empate vale meia vitória
+        contagem['taxa'] = (contagem['vitorias'] + contagem['empates'] / 2) / total if total else 0.0
+
+    resumo = {}
+    for nome, pontos in distribuicoes.items():
+        if not pontos:
+            continue
+        resumo[nome] = {
+            'media': statistics.fmean(pontos),
+            'desvio': statistics.pstdev(pontos),
+            'minimo': min(pontos),
+            'maximo': max(pontos),
+        }
+
+    return {
+        'mapas': num_mapas,
+        'distribuicoes': distribuicoes,
+        'resumo': resumo,
+        'confrontos': confrontos,
+    }
+
+
+def main(argv=None):
+    """Linha de comando do torneio"""
+    parser = argparse.ArgumentParser(description="Torneio entre agentes aspiradores")
+    parser.add_argument("--mapas", type=int, default=1000)
+    parser.add_argument("--agentes", nargs="+", default=list(AGENTES), choices=list(AGENTES))
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--processos", type=int, default=None,
+                        help="padrão: todos os núcleos")
+    parser.add_argument("--passos", type=int, default=PASSOS_PADRAO)
+    parser.add_argument("--largura", type=int, default=None)
+    parser.add_argument("--altura", type=int, default=None)
+    parser.add_argument("--mapa", default=None,
+                        help="arquivo de mapa usado em todas as rodadas no lugar dos mapas gerados")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultado = executar_torneio(args.mapas, args.agentes, semente=args.semente,
+                                 processos=args.processos, max_steps=args.passos,
+                                 largura=args.largura, altura=args.altura, caminho_mapa=args.mapa)
+    duracao = time.perf_counter() - inicio
+
+    episodios = args.mapas * len(args.agentes)
+    print(f"{episodios} episódios em {duracao:.2f}s ({episodios / max(duracao, 1e-9):.0f} episódios/s)")
+    print("\n=== PONTUAÇÕES ===")
+    for nome, stats in sorted(resultado['resumo'].items(), key=lambda item: -item[1]['media']):
+        print(f"{nome}: média {stats['media']:.2f} ± {stats['desvio']:.2f} "
+              f"(mín {stats['minimo']}, máx {stats['maximo']})")
+    print("\n=== CONFRONTOS DIRETOS ===")
+    for (a, b), contagem in resultado['confrontos'].items():
+        print(f"{a} x {b}: {contagem['vitorias']}V {contagem['empates']}E {contagem['derrotas']}D "
+              f"(taxa {contagem['taxa']:.1%})")
+
+
+if __name__ == "__main__":
+    main()